@@ -10,6 +10,22 @@ class ManPageGenerator(BuildHookInterface):
     PLUGIN_NAME = "ManPageGenerator"
 
     def initialize(self, version, build_data):
+        self.generate_hut_cache(build_data)
+        self.generate_man_pages()
+
+    def generate_hut_cache(self, build_data):
+        # Precompile the HID Usage Tables so hidtools.hut doesn't have to
+        # parse all .hut files at import time
+        sys.path.insert(0, self.root)
+        try:
+            from hidtools.hut import HidUsageTable, HUT_CACHE
+        finally:
+            sys.path.pop(0)
+
+        HidUsageTable._from_hut_files()._write_cache(HUT_CACHE)
+        build_data["artifacts"].append(os.path.relpath(HUT_CACHE, self.root))
+
+    def generate_man_pages(self):
         try:
             import pypandoc
         except ModuleNotFoundError:
@@ -19,11 +19,16 @@
 
 
 import click
+import collections
+import concurrent.futures
 import os
 import re
 import sys
+import time
 import hidtools.hid
 import hidtools.hidraw
+import hidtools.hut
+import hidtools.recording
 import logging
 import yaml
 from hidtools.hid import ReportDescriptor
@@ -41,7 +46,7 @@ def open_sysfs_rdesc(path):
     logger.debug(f"Reading sysfs file {path}")
     with open(path, "rb") as fd:
         data = fd.read()
-        return [hidtools.hid.ReportDescriptor.from_bytes(data)]
+        return [hidtools.hid.ReportDescriptor.from_bytes(data, cached=True)]
 
 
 def open_devnode_rdesc(path):
@@ -71,9 +76,26 @@ def open_binary(path):
     # inputs we need to accept it doesn't matter
     with open(path, "rb") as fd:
         data = fd.read(4096)
+        if ReportDescriptor.is_snapshot(data):
+            logger.debug(f"{path} is a report descriptor snapshot")
+            try:
+                return [ReportDescriptor.load(path)]
+            except ValueError as e:
+                raise Oops(f"Unable to load {path}: {e}")
+        if hidtools.recording.is_binary_recording(data):
+            logger.debug(f"{path} is a binary recording")
+            fd.seek(0)
+            try:
+                devices = hidtools.recording.BinaryRecordingReader(fd).devices
+            except ValueError as e:
+                raise Oops(f"Unable to load {path}: {e}")
+            return [
+                ReportDescriptor.from_bytes(d.rdesc, cached=True)
+                for d in devices.values()
+            ]
         if b"\0" in data:
             logger.debug(f"{path} is a binary file")
-            return [hidtools.hid.ReportDescriptor.from_bytes(data)]
+            return [hidtools.hid.ReportDescriptor.from_bytes(data, cached=True)]
     return None
 
 
@@ -81,7 +103,7 @@ def interpret_file_hidrecorder(fd):
     data = fd.read()
     # The proper (machine-readable) hid-recorder output
     rdescs = [
-        ReportDescriptor.from_string(line[3:])
+        ReportDescriptor.from_string(line[3:], cached=True)
         for line in data.splitlines()
         if line.startswith("R: ")
     ]
@@ -109,7 +131,9 @@ def interpret_file_libinput_record(fd):
 
     rdescs_data = [dev["hid"] for dev in libinput_data["devices"]]
 
-    rdescs = [hidtools.hid.ReportDescriptor.from_bytes(r) for r in rdescs_data]
+    rdescs = [
+        hidtools.hid.ReportDescriptor.from_bytes(r, cached=True) for r in rdescs_data
+    ]
 
     return rdescs
 
@@ -145,12 +169,151 @@ def open_report_descriptor(path):
     raise Oops(f"Unable to detect file type for {path}")
 
 
+def iter_corpus(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for f in sorted(files):
+            yield os.path.join(root, f)
+
+
+def analyze_file(path):
+    """
+    Parse the report descriptors in the given file for --corpus. This runs
+    in a worker process, so only plain data is returned.
+
+    Snapshots written by ReportDescriptor.save() are skipped, a corpus is
+    usually collected from untrusted sources and loading them gains
+    nothing over parsing the descriptor.
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as fd:
+            if ReportDescriptor.is_snapshot(fd.read(16)):
+                return {"path": path, "skipped": "report descriptor snapshot"}
+        rdescs = open_report_descriptor(path)
+    except Oops as e:
+        return {"path": path, "error": f"{e}"}
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    elapsed = time.perf_counter() - start
+
+    descriptors = []
+    for rdesc in rdescs:
+        usage_pages = collections.Counter()
+        fields = 0
+        for reports in (
+            rdesc.input_reports,
+            rdesc.output_reports,
+            rdesc.feature_reports,
+        ):
+            for report in reports.values():
+                fields += len(report.fields)
+                usage_pages.update(
+                    f.usage_page >> 16 for f in report.fields if not f.is_const
+                )
+        descriptors.append(
+            {
+                "fingerprint": rdesc.fingerprint(),
+                "reports": {
+                    "input": len(rdesc.input_reports),
+                    "output": len(rdesc.output_reports),
+                    "feature": len(rdesc.feature_reports),
+                },
+                "fields": fields,
+                "win8": rdesc.win8,
+                "usage_pages": usage_pages,
+            }
+        )
+    return {"path": path, "time": elapsed, "descriptors": descriptors}
+
+
+def analyze_corpus(paths, jobs):
+    """
+    Parse all files in paths across jobs worker processes and return the
+    aggregate statistics.
+    """
+    if jobs == 1:
+        results = map(analyze_file, paths)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(analyze_file, paths, chunksize=16)
+
+    files = 0
+    times = []
+    fingerprints = set()
+    reports = collections.Counter()
+    fields = []
+    win8 = 0
+    usage_pages = collections.Counter()
+    failures = {}
+    skipped = {}
+    try:
+        for result in results:
+            files += 1
+            if "error" in result:
+                failures[result["path"]] = result["error"]
+                continue
+            if "skipped" in result:
+                skipped[result["path"]] = result["skipped"]
+                continue
+            times.append((result["time"], result["path"]))
+            for d in result["descriptors"]:
+                fingerprints.add(d["fingerprint"])
+                reports.update(d["reports"])
+                fields.append(d["fields"])
+                win8 += d["win8"]
+                usage_pages.update(d["usage_pages"])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    def page_name(page_id):
+        try:
+            name = hidtools.hut.HUT[page_id].page_name
+        except KeyError:
+            name = "Unknown"
+        return f"{name} (0x{page_id:04x})"
+
+    stats = {
+        "files": files,
+        "descriptors": len(fields),
+        "unique layouts": len(fingerprints),
+        "parse failures": len(failures),
+        "skipped files": len(skipped),
+        "win8 certified": win8,
+        "reports": {t: reports[t] for t in ("input", "output", "feature")},
+        "fields": {
+            "total": sum(fields),
+            "mean": round(sum(fields) / len(fields), 1) if fields else 0,
+            "max": max(fields, default=0),
+        },
+    }
+    if times:
+        slowest, slowest_path = max(times)
+        total = sum(t for t, _ in times)
+        stats["parse time"] = {
+            "total": f"{total:.3f}s",
+            "mean": f"{total / len(times) * 1000:.3f}ms",
+            "max": f"{slowest * 1000:.3f}ms",
+            "slowest": slowest_path,
+        }
+    stats["usage pages"] = {
+        page_name(page_id): count for page_id, count in usage_pages.most_common()
+    }
+    if failures:
+        stats["failures"] = failures
+    if skipped:
+        stats["skipped"] = skipped
+    return stats
+
+
 class FakeHidraw(hidtools.hidraw.HidrawDevice):
     def __init__(self, name, rdesc):
         self.name = name
         self.bustype, self.vendor_id, self.product_id = 3, 1, 1
         self.report_descriptor = rdesc
-        self.events = []
+        self._init_state()
 
 
 @click.command()
@@ -168,10 +331,25 @@ class FakeHidraw(hidtools.hidraw.HidrawDevice):
     type=click.File("w"),
     help="The file to record to (default: stdout)",
 )
+@click.option(
+    "--corpus",
+    metavar="DIR",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False, readable=True),
+    help="Print statistics about all report descriptors in this directory "
+    "instead of decoding them, may be given multiple times",
+)
+@click.option(
+    "--jobs",
+    metavar="N",
+    default=None,
+    type=click.IntRange(min=1),
+    help="The number of processes used with --corpus (default: one per CPU)",
+)
 @click.option(
     "--verbose", default=False, is_flag=True, help="Show debugging information"
 )
-def main(report_descriptor, output, verbose):
+def main(report_descriptor, output, corpus, jobs, verbose):
     """Decode a HID report descriptor to human-readable format.
 
     \b
@@ -181,11 +359,22 @@ def main(report_descriptor, output, verbose):
     - a hidraw node, e.g. /dev/hidraw2
     - a recording produced by hid-recorder
     - a recording produced by libinput record
+    - a snapshot written by hidtools.hid.ReportDescriptor.save()
+
+    With --corpus, all files in the given directories and any files given
+    are parsed in parallel and only aggregate statistics are printed.
     """
     try:
         if verbose:
             base_logger.setLevel(logging.DEBUG)
 
+        if corpus:
+            paths = [p for d in corpus for p in iter_corpus(d)]
+            paths.extend(report_descriptor)
+            stats = analyze_corpus(paths, jobs or os.cpu_count() or 1)
+            yaml.safe_dump(stats, output, sort_keys=False)
+            return
+
         for d, path in enumerate(report_descriptor):
             rdescs = open_report_descriptor(path)
             for r, rdesc in enumerate(rdescs):
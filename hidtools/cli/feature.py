@@ -29,7 +29,10 @@ def make_id(ridx, idx):
 
 
 def feature_report_fields(device, report_id=None):
-    """Return a flat list of Feature Report fields for this device"""
+    """
+    Return a flat list of ``(unique_id, field)`` tuples for the Feature
+    Report fields of this device
+    """
     rdesc = device.report_descriptor
     fields = []
     for report in rdesc.feature_reports.values():
@@ -37,8 +40,7 @@ def feature_report_fields(device, report_id=None):
             continue
 
         for idx, field in enumerate(report.fields):
-            field._unique_id = make_id(report.report_ID, idx)
-            fields.append(field)
+            fields.append((make_id(report.report_ID, idx), field))
     return fields
 
 
@@ -111,14 +113,14 @@ def list(device, fetch_values, report_id, classic):
     raw_fileds = feature_report_fields(d, report_id)
 
     all_fields = []
-    for f in raw_fileds:
+    for uid, f in raw_fileds:
         r = f.report_ID
         if r >= 0 and r <= 255:
-            all_fields.append(f)
+            all_fields.append((uid, f))
         else:
             print(f"Invalid report id: {r}. It will be skipped.")
 
-    for f in all_fields:
+    for uid, f in all_fields:
         if fetch_values:
             if f.report_ID not in reports:
                 try:
@@ -135,7 +137,7 @@ def list(device, fetch_values, report_id, classic):
         else:
             vstring = ""
 
-        report_str += f"{f._unique_id:7x} | {f.report_ID:6d} | {f.usage_page_name:25s} | {str(f.usage_name):42s} | [{f.logical_min:2d}, {f.logical_max:3d}] | {f.count:5d} | {f.size:3d} {vstring}\n"
+        report_str += f"{uid:7x} | {f.report_ID:6d} | {f.usage_page_name:25s} | {str(f.usage_name):42s} | [{f.logical_min:2d}, {f.logical_max:3d}] | {f.count:5d} | {f.size:3d} {vstring}\n"
 
     for rid, rep in reports.items():
         print(f"{rid:04x}: {bytes(rep).hex()}")
@@ -175,7 +177,7 @@ def set(device, feature_ids):
         print("Invalid Feature ID format(s)", file=sys.stderr)
         sys.exit(1)
 
-    allowed_ids = [f._unique_id for f in all_fields]
+    allowed_ids = [uid for uid, _ in all_fields]
     for fid in fids:
         if fid not in allowed_ids:
             print(f"Invalid feature index: {fid}", file=sys.stderr)
@@ -183,8 +185,8 @@ def set(device, feature_ids):
 
     fields = []
     report_id = None
-    for f in all_fields:
-        if f._unique_id not in fids:
+    for uid, f in all_fields:
+        if uid not in fids:
             continue
 
         if report_id is None:
@@ -0,0 +1,84 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Generates the FingerprintIndex of the device models shipped with
+# hid-tools, hidtools/data/known-devices.json. Importing the device models
+# requires libevdev, so this is run by the maintainers whenever a model or
+# the fingerprint changes rather than at build time:
+#
+#   python -m hidtools.cli.known_devices
+
+import click
+import importlib
+import inspect
+import pkgutil
+import sys
+
+import hidtools.device
+from hidtools.cli.replay import HIDReplay
+from hidtools.hid import KNOWN_DEVICES_INDEX, FingerprintIndex, ReportDescriptor
+
+
+def iter_known_devices():
+    """
+    Yield the device models in hidtools.device and the devices known to
+    hid-replay.
+    """
+    yield from HIDReplay._known_devices.values()
+    for info in pkgutil.iter_modules(hidtools.device.__path__, "hidtools.device."):
+        module = importlib.import_module(info.name)
+        for obj in vars(module).values():
+            if inspect.isclass(obj) and obj.__module__ == module.__name__:
+                yield obj
+
+
+def build_index(devices=None):
+    """
+    Return a FingerprintIndex of the device classes that define their own
+    report_descriptor, each named module.ClassName. By default these are
+    the classes from iter_known_devices().
+    """
+    if devices is None:
+        devices = iter_known_devices()
+
+    index = FingerprintIndex()
+    for device in devices:
+        # subclasses only count if they define their own descriptor
+        rdesc = vars(device).get("report_descriptor")
+        if rdesc is not None:
+            name = f"{device.__module__}.{device.__qualname__}"
+            index.add(ReportDescriptor.from_bytes(rdesc), name)
+    return index
+
+
+@click.command()
+@click.argument(
+    "output",
+    default=KNOWN_DEVICES_INDEX,
+    type=click.Path(dir_okay=False, writable=True),
+)
+def main(output):
+    """Write the fingerprint index of the known device models"""
+    index = build_index()
+    index.save(output)
+    print(f"{len(index)} device layouts written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,10 @@
 #
 
 import click
+import io
 import sys
 import hidtools.hid
+import hidtools.recording
 from parse import parse as _parse
 
 
@@ -58,6 +60,14 @@ def parse_event(line, rdesc_object):
     e, time, size, report = line.split(" ", 3)
     report = [int(item, 16) for item in report.split(" ")]
     assert int(size) == len(report)
+    return format_event(time, report, rdesc_object)
+
+
+def format_event(time, report, rdesc_object):
+    """
+    Translate the given report to a human readable format, or return None
+    if the report descriptor has no matching report.
+    """
     rdesc = rdesc_object.get(report[0], len(report))
     if rdesc is None:
         return None
@@ -74,14 +84,67 @@ def dump_report(line, rdesc_object, f_out):
         f_out.write(f"{event}\n")
 
 
-def parse_hid(f_in, f_out, print_events=True):
+def get_changes(time, report, changes):
+    """
+    Translate the fields returned by DeltaDecoder.decode() to a human
+    readable format, or return None if no field changed.
+    """
+    output = []
+    for field, old, new in changes:
+        if field.is_const:
+            continue
+        if field.is_array:
+            name = field.logical_name or field.usage_page_name or "Array"
+            output.append(f"{name} [{', '.join(str(v) for v in new)}]")
+        else:
+            output.append(f"{field.usage_name}: {new[0]}")
+    if not output:
+        return None
+
+    prefix = f"ReportID: {report.report_ID} / " if report.numbered else ""
+    return f"{time:>10s} {prefix}{' | '.join(output)}"
+
+
+def dump_changes(line, rdesc_object, decoders, f_out):
+    """
+    Print only the fields of the given report that changed since the
+    previous report with the same Report ID.
+    """
+    e, time, size, report = line.split(" ", 3)
+    report = bytes(int(item, 16) for item in report.split(" "))
+    assert int(size) == len(report)
+    dump_event_changes(time, report, rdesc_object, decoders, f_out)
+
+
+def dump_event_changes(time, report, rdesc_object, decoders, f_out):
+    """
+    Like :func:`dump_changes` for an already parsed report.
+    """
+    rdesc = rdesc_object.get(report[0], len(report))
+    if rdesc is None:
+        return
+
+    try:
+        decoder = decoders[rdesc]
+    except KeyError:
+        decoder = decoders[rdesc] = hidtools.hid.DeltaDecoder(rdesc)
+    event = get_changes(time, rdesc, decoder.decode(report))
+    if event:
+        f_out.write(f"{event}\n")
+
+
+def parse_hid(f_in, f_out, print_events=True, changes_only=False):
     rdesc_dict = {}
+    # one DeltaDecoder per HidReport, per device
+    decoders = {}
     device_index = 0
     for line in f_in:
         if line.startswith("#"):
             continue
         elif line.startswith("R:"):
-            rdesc_object = hidtools.hid.ReportDescriptor.from_string(line.lstrip("R: "))
+            rdesc_object = hidtools.hid.ReportDescriptor.from_string(
+                line.lstrip("R: "), cached=True
+            )
             rdesc_object.dump(f_out)
 
             rdesc_dict[device_index] = rdesc_object
@@ -94,7 +157,16 @@ def parse_hid(f_in, f_out, print_events=True):
             assert r is not None
             device_index = r["d"]
         elif line.startswith("E:"):
-            if print_events:
+            if not print_events:
+                continue
+            if changes_only:
+                dump_changes(
+                    line,
+                    rdesc_dict[device_index],
+                    decoders.setdefault(device_index, {}),
+                    f_out,
+                )
+            else:
                 dump_report(line, rdesc_dict[device_index], f_out)
         elif line == "":
             # End of file
@@ -105,6 +177,45 @@ def parse_hid(f_in, f_out, print_events=True):
             f_out.write(line)
 
 
+def parse_binary_hid(recording, f_out, print_events=True, changes_only=False):
+    """
+    Like :func:`parse_hid` for a
+    :class:`hidtools.recording.BinaryRecordingReader`.
+    """
+    rdesc_dict = {}
+    for index, device in recording.devices.items():
+        rdesc_object = hidtools.hid.ReportDescriptor.from_bytes(
+            device.rdesc, cached=True
+        )
+        rdesc_object.dump(f_out)
+
+        rdesc_dict[index] = rdesc_object
+
+        if rdesc_object.win8:
+            f_out.write("**** win 8 certified ****\n")
+
+    if not print_events:
+        return
+
+    # one DeltaDecoder per HidReport, per device
+    decoders = {}
+    for index, timestamp, report in recording:
+        sec, usec = divmod(timestamp // 1000, 1000000)
+        time = f"{sec:06d}.{usec:06d}"
+        if changes_only:
+            dump_event_changes(
+                time,
+                report,
+                rdesc_dict[index],
+                decoders.setdefault(index, {}),
+                f_out,
+            )
+        else:
+            event = format_event(time, report, rdesc_dict[index])
+            if event:
+                f_out.write(f"{event}\n")
+
+
 @click.command()
 @click.option(
     "--report-descriptor-only",
@@ -112,17 +223,44 @@ def parse_hid(f_in, f_out, print_events=True):
     is_flag=True,
     help="Only print the Report Descriptor",
 )
+@click.option(
+    "--changes-only",
+    default=False,
+    is_flag=True,
+    help="Only print the fields that changed since the previous report",
+)
 @click.argument(
     "recording",
     metavar="<Path to device recording (stdin if missing)>",
-    default=sys.stdin,
-    type=click.File("r"),
+    default="-",
+    type=click.File("rb"),
 )
-def main(recording, report_descriptor_only):
+def main(recording, report_descriptor_only, changes_only):
     """Parse a HID recording and display it in human-readable format"""
     with recording as f:
+        reader = None
+        try:
+            if hidtools.recording.is_binary_recording(f.peek(8)):
+                reader = hidtools.recording.BinaryRecordingReader(f)
+        except ValueError as e:
+            print(f"Invalid recording {f.name}: {e}", file=sys.stderr)
+            sys.exit(1)
+
         try:
-            parse_hid(f, sys.stdout, not report_descriptor_only)
+            if reader is not None:
+                parse_binary_hid(
+                    reader,
+                    sys.stdout,
+                    not report_descriptor_only,
+                    changes_only,
+                )
+            else:
+                parse_hid(
+                    io.TextIOWrapper(f),
+                    sys.stdout,
+                    not report_descriptor_only,
+                    changes_only,
+                )
         except KeyboardInterrupt:
             pass
         except BrokenPipeError:
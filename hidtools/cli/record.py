@@ -22,8 +22,13 @@ import select
 import sys
 import os
 
+import hidtools.recording
 from hidtools.hidraw import HidrawDevice
 
+# The events are dumped right after each read, only keep the last few in
+# memory so long recordings don't grow without bounds
+MAX_EVENTS = 1024
+
 
 def list_devices():
     outfile = sys.stdout if os.isatty(sys.stdout.fileno()) else sys.stderr
@@ -63,6 +68,40 @@ def list_devices():
         sys.exit(1)
 
 
+class FlushInterval(click.ParamType):
+    """
+    A number of milliseconds or ``exit`` to only flush when the output is
+    closed, the latter is converted to ``None``.
+    """
+
+    name = "ms"
+
+    def convert(self, value, param, ctx):
+        if value is None or value == "exit":
+            return None
+        try:
+            interval = int(value)
+        except ValueError:
+            interval = -1
+        if interval < 0:
+            self.fail(
+                f"{value!r} is not a number of milliseconds or 'exit'", param, ctx
+            )
+        return interval
+
+
+def read_new_events(device):
+    """
+    Read events from the device and return the new ones, see
+    :meth:`HidrawDevice.read_events`.
+    """
+    events = device.events
+    total = events.evicted + len(events)
+    device.read_events()
+    count = min(events.evicted + len(events) - total, len(events))
+    return events[len(events) - count :]
+
+
 @click.command()
 @click.option(
     "--output",
@@ -86,9 +125,46 @@ def list_devices():
     default=False,
     help="Uses the old printing version, which was not useful for emulating devices with vendor-specific descriptors",
 )
-def main(device_list, output, strip_desc):
+@click.option(
+    "--flush-interval",
+    metavar="ms|exit",
+    default=0,
+    type=FlushInterval(),
+    help="Flush the output at most every ms milliseconds or only on exit (default: 0, after every batch of events)",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="text",
+    type=click.Choice(["text", "binary"]),
+    help="The output format (default: text)",
+)
+@click.option(
+    "--convert",
+    metavar="recording",
+    type=click.File("rb"),
+    help="Convert the given recording to the output format instead of recording",
+)
+def main(device_list, output, strip_desc, flush_interval, output_format, convert):
     """Record a HID device"""
 
+    binary = output_format == "binary"
+    if strip_desc and (binary or convert is not None):
+        # only the text recording has the per-event comments -s strips
+        raise click.UsageError("--strip-desc only applies to recording in text format")
+
+    if convert is not None:
+        with convert:
+            try:
+                recording = hidtools.recording.open_recording(convert)
+                hidtools.recording.convert(
+                    recording, output.buffer if binary else output, binary
+                )
+            except ValueError as e:
+                print(f"Invalid recording {convert.name}: {e}", file=sys.stderr)
+                sys.exit(1)
+        return
+
     devices = {}
     last_index = -1
     poll = select.poll()
@@ -99,25 +175,59 @@ def main(device_list, output, strip_desc):
             device_list = [open(list_devices())]
 
         for idx, fd in enumerate(device_list):
-            device = HidrawDevice(fd)
-            if len(device_list) > 1:
-                print(f"D: {idx}", file=output)
-            device.dump(output)
+            device = HidrawDevice(
+                fd, max_events=MAX_EVENTS, flush_interval=flush_interval
+            )
+            if not binary:
+                if len(device_list) > 1:
+                    print(f"D: {idx}", file=output)
+                device.dump(output)
             poll.register(fd, select.POLLIN)
             devices[fd.fileno()] = (idx, device)
 
+        if binary:
+            writer = hidtools.recording.BinaryRecordingWriter(
+                output.buffer,
+                [
+                    hidtools.recording.RecordedDevice.from_hidraw(idx, d)
+                    for idx, d in devices.values()
+                ],
+                flush_interval,
+            )
+
         if len(devices) == 1:
             last_index = 0
 
         while True:
-            events = poll.poll()
+            # wake up in time to flush the output not flushed after the
+            # last batch of events
+            if binary:
+                timeout = writer.flush_timeout()
+            else:
+                timeouts = [d.flush_timeout() for _, d in devices.values()]
+                timeout = min((t for t in timeouts if t is not None), default=None)
+            events = poll.poll(timeout)
+            if not events:
+                if binary:
+                    writer.write_events([])
+                else:
+                    for _, device in devices.values():
+                        device.dump(output)
+                continue
+
             for fd, event in events:
                 idx, device = devices[fd]
-                device.read_events()
-                if last_index != idx:
-                    print(f"D: {idx}", file=output)
-                    last_index = idx
-                device.dump(output, classic=not strip_desc)
+                if binary:
+                    writer.write_events(
+                        (idx, e.sec * 1000000000 + e.usec * 1000, e.bytes)
+                        for e in read_new_events(device)
+                    )
+                else:
+                    device.read_events()
+                    if last_index != idx:
+                        print(f"D: {idx}", file=output)
+                        last_index = idx
+                    device.dump(output, classic=not strip_desc)
 
                 if is_first_event:
                     is_first_event = False
@@ -22,8 +22,8 @@ from datetime import datetime, timedelta
 import click
 import sys
 import time
+import hidtools.recording
 import hidtools.uhid
-from parse import parse, findall
 
 from hidtools.device.base_device import BaseDevice
 from hidtools.device.sony_gamepad import PS3Controller
@@ -46,57 +46,20 @@ class HIDReplay(object):
         self.filename = filename
         self.replayed_count = 0
 
-        devices = {}
-        dev = None
-        with open(filename) as f:
-
-            class DeviceInfo(object):
-                def __init__(self):
-                    self.name = None
-                    self.info = None
-                    self.phys = ""
-                    self.rdesc = None
-                    self.rdesc_length = None
-
-            idx = 0
-            for line in f:
-                line = line.strip()
-                if line.startswith("D:"):
-                    r = parse("D: {idx:d}", line)
-                    assert r is not None
-                    idx = r["idx"]
-                    continue
-                if idx not in devices:
-                    devices[idx] = DeviceInfo()
-                dev = devices[idx]
-                if line.startswith("N:"):
-                    r = parse("N: {name}", line)
-                    assert r is not None
-                    dev.name = r["name"]
-                elif line.startswith("I:"):
-                    r = parse("I: {bus:x} {vid:x} {pid:x}", line)
-                    assert r is not None
-                    dev.info = r
-                elif line.startswith("P:"):
-                    r = parse("P: {phys}", line)
-                    if r is not None:
-                        dev.phys = r["phys"]
-                elif line.startswith("R:"):
-                    r = parse("R: {length:d} {desc}", line)
-                    assert r is not None
-                    dev.rdesc = r
+        with open(filename, "rb") as f:
+            devices = hidtools.recording.open_recording(f).devices
 
         for idx, dev in devices.items():
-            uhid_dev_class = self.determine_device_type_by_info(dev.info)
+            uhid_dev_class = self.determine_device_type_by_info(dev)
             uhid_dev = uhid_dev_class(
                 name=dev.name,
                 application=None,
-                input_info=tuple([dev.info["bus"], dev.info["vid"], dev.info["pid"]]),
-                rdesc=dev.rdesc["desc"],
+                input_info=(dev.bustype, dev.vendor_id, dev.product_id),
+                rdesc=dev.rdesc,
             )
             uhid_dev.phys = dev.phys
             assert uhid_dev.rdesc is not None
-            assert len(uhid_dev.rdesc) == dev.rdesc["length"]
+            assert len(uhid_dev.rdesc) == len(dev.rdesc)
 
             self._devices[idx] = uhid_dev
 
@@ -106,7 +69,7 @@ class HIDReplay(object):
             hidtools.uhid.UHIDDevice.dispatch(10)
 
     def determine_device_type_by_info(self, info) -> Type[BaseDevice]:
-        device_id = (info["vid"], info["pid"])
+        device_id = (info.vendor_id, info.product_id)
         if device_id in self._known_devices:
             return self._known_devices[device_id]
         return BaseDevice
@@ -129,42 +92,28 @@ class HIDReplay(object):
         t = None
         timestamp_offset = 0
         assert len(self._devices) > 0
-        with open(self.filename) as f:
-            idx = 0
-            dev = self._devices[idx]
-            if idx in self._devices:
+        with open(self.filename, "rb") as f:
+            for idx, ns, data in hidtools.recording.open_recording(f):
                 dev = self._devices[idx]
-            for line in f:
-                if line.startswith("D:"):
-                    r = parse("D: {idx:d}", line)
-                    assert r is not None
-                    dev = self._devices[r["idx"]]
-                elif line.startswith("E:"):
-                    r = parse("E: {sec:d}.{usec:d} {len:2d}{data}", line)
-                    assert r is not None
-                    length = r["len"]
-                    timestamp = r["sec"] + r["usec"] / 1000000
-                    r_ = findall(" {:S}", r["data"])
-                    data = [int(x[0], 16) for x in r_]
-                    assert len(data) == int(length)
-                    now = datetime.today()
-                    if t is None:
-                        t = now
-                        timestamp_offset = timestamp
-                    target_time = t + timedelta(seconds=timestamp - timestamp_offset)
-                    sleep = 0
-                    if target_time > now:
-                        sleep = target_time - now
-                        sleep = sleep.seconds + sleep.microseconds / 1000000
-                    if sleep < 0.01:
-                        pass
-                    elif sleep < wait_max_seconds:
-                        time.sleep(sleep)
-                    else:
-                        t = now
-                        timestamp_offset = timestamp
-                        time.sleep(wait_max_seconds)
-                    dev.call_input_event(data)
+                timestamp = ns / 1000000000
+                now = datetime.today()
+                if t is None:
+                    t = now
+                    timestamp_offset = timestamp
+                target_time = t + timedelta(seconds=timestamp - timestamp_offset)
+                sleep = 0
+                if target_time > now:
+                    sleep = target_time - now
+                    sleep = sleep.seconds + sleep.microseconds / 1000000
+                if sleep < 0.01:
+                    pass
+                elif sleep < wait_max_seconds:
+                    time.sleep(sleep)
+                else:
+                    t = now
+                    timestamp_offset = timestamp
+                    time.sleep(wait_max_seconds)
+                dev.call_input_event(list(data))
         self.replayed_count += 1
 
     def replay_one_sequence(self):
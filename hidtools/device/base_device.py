@@ -294,7 +294,7 @@ class BaseDevice(UHIDDevice):
         self._input_nodes: Optional[list[EvdevDevice]] = None
         if rdesc is None:
             assert rdesc_str is not None
-            self.rdesc = hid.ReportDescriptor.from_human_descr(rdesc_str)  # type: ignore
+            self.rdesc = hid.ReportDescriptor.from_human_descr(rdesc_str, cached=True)  # type: ignore
         else:
             self.rdesc = rdesc  # type: ignore
 
@@ -18,23 +18,36 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import copy
+import array
+import bisect
+import collections
 import enum
+import hashlib
 import itertools
+import json
+import os
 import re
+import struct
 import sys
-from hidtools.hut import HUT, U8, U16, U32
+import zlib
+from hidtools import _version
+from hidtools.hut import DATA_DIR, HUT, U8, U16, U32
 from hidtools.util import twos_comp, to_twos_comp
 import logging
 
 from typing import (
     Any,
+    Callable,
+    ClassVar,
     Dict,
     Final,
+    Hashable,
     IO,
+    Iterable,
     Iterator,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type as _Type,
     Union,
@@ -46,6 +59,11 @@ try:
 except ImportError:
     from typing_extensions import TypeAlias
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
 
 logger = logging.getLogger("hidtools.hid")
 
@@ -190,6 +208,21 @@ for type, items in hid_items.items():
         hid_type[k] = type
 
 
+# The payload size in bytes for the two lowest bits of an item header
+_item_payload_size: Final = (0, 1, 2, 4)
+
+# Items whose payload is a two's complement value
+_signed_items: Final = frozenset(
+    (
+        hid_items["Global"]["Logical Minimum"],
+        hid_items["Global"]["Physical Minimum"],
+        # hid_items["Global"]["Logical Maximum"],
+        # hid_items["Global"]["Physical Maximum"],
+    )
+)
+_unit_exponent: Final = hid_items["Global"]["Unit Exponent"]
+
+
 class ParseError(Exception):
     """Exception thrown during report descriptor parsing"""
 
@@ -235,6 +268,9 @@ class _HidRDescItem(object):
         The 8, 16, or 32 bit value
     :param list raw_values:
         The payload bytes' raw values, LSB first
+    :param dict names:
+        The item names by numerical hid type, defaults to the HID items
+        defined in the HID specification
 
 
     These items are usually parsed from a report descriptor, see
@@ -280,12 +316,15 @@ class _HidRDescItem(object):
 
     """
 
+    __slots__ = ("index_in_report", "raw_value", "hid", "value", "usage_page", "item")
+
     def __init__(
         self: "_HidRDescItem",
         index_in_report: int,
         hid: U16,
         value: int,
         raw_values: List[U8],
+        names: Optional[Dict[U16, str]] = None,
     ) -> None:
         self.index_in_report = index_in_report
         self.raw_value = raw_values
@@ -293,19 +332,14 @@ class _HidRDescItem(object):
         self.value = value
         self.usage_page: U16 = 0
         try:
-            self.item = inv_hid[self.hid]
+            self.item = (inv_hid if names is None else names)[self.hid]
         except KeyError:
             error = f"error while parsing {hid:02x}"
             raise KeyError(error)
 
-        if self.item in (
-            "Logical Minimum",
-            "Physical Minimum",
-            # "Logical Maximum",
-            # "Physical Maximum",
-        ):
+        if hid in _signed_items:
             self._twos_comp()
-        if self.item == "Unit Exponent" and self.value > 7:
+        elif hid == _unit_exponent and self.value > 7:
             self.value -= 16
 
     def _twos_comp(self: "_HidRDescItem") -> int:
@@ -445,45 +479,59 @@ class _HidRDescItem(object):
 
         .. note:: ``item.index_in_report`` is always 0 when using this function
         """
+        return next(cls.iter_bytes(rdesc), None)
+
+    @classmethod
+    def iter_bytes(
+        cls: _Type["_HidRDescItem"],
+        rdesc: Union[Bytes, bytearray, memoryview, List[U8]],
+        names: Optional[Dict[U16, str]] = None,
+    ) -> Iterator["_HidRDescItem"]:
+        """
+        Lazily parses a series of bytes into items. The descriptor is walked
+        exactly once and each item is only created when the caller asks
+        for it.
+
+        :param rdesc: a series of bytes that are a HID report descriptor
+        :param dict names: the item names by numerical hid type, see
+            :class:`_HidRDescItem`
+
+        :returns: an iterator over the items of this report descriptor
+        """
+        # One copy into an immutable bytes object, indexing and slicing it
+        # is cheaper than going through a memoryview for every item
+        data = rdesc if isinstance(rdesc, bytes) else bytes(rdesc)
+        length = len(data)
+        from_bytes = int.from_bytes
+
         idx = 0
-        header = rdesc[idx]
-        if header == 0 and idx == len(rdesc) - 1:
-            # some devices present a trailing 0, skipping it
-            return None
+        while idx < length:
+            header = data[idx]
+            if header == 0 and idx == length - 1:
+                # some devices present a trailing 0, skipping it
+                return
+
+            hid = header & 0xFC
+            if hid == 0:
+                raise ParseError(f"Unexpected HID type 0 in {header:02x}")
+
+            size = _item_payload_size[header & 0x3]
+            end = idx + 1 + size
+            if end > length:
+                raise ParseError(
+                    f"Truncated item {header:02x} at offset {idx}, expected {size} bytes"
+                )
 
-        index_in_report = 0  # always zero, oh well
-        size = header & 0x3
-        if size == 3:
-            size = 4
-        hid = header & 0xFC
-        if hid == 0:
-            raise ParseError(f"Unexpected HID type 0 in {header:02x}")
-
-        value = 0
-        raw_values = []
-
-        idx += 1
-        if size >= 1:
-            v = rdesc[idx]
-            idx += 1
-            raw_values.append(v)
-            value |= v
-        if size >= 2:
-            v = rdesc[idx]
-            idx += 1
-            raw_values.append(v)
-            value |= v << 8
-        if size >= 4:
-            v = rdesc[idx]
-            idx += 1
-            raw_values.append(v)
-            value |= v << 16
-            v = rdesc[idx]
-            idx += 1
-            raw_values.append(v)
-            value |= v << 24
-
-        return _HidRDescItem(index_in_report, hid, value, raw_values)
+            if size == 0:
+                yield cls(idx, hid, 0, [], names)
+            elif size == 1:
+                value = data[idx + 1]
+                yield cls(idx, hid, value, [value], names)
+            else:
+                payload = data[idx + 1 : end]
+                value = from_bytes(payload, "little")
+                yield cls(idx, hid, value, list(payload), names)
+            idx = end
 
     @classmethod
     def from_bytes(
@@ -501,17 +549,7 @@ class _HidRDescItem(object):
 
         :returns: a list of items representing this report descriptor
         """
-        items = []
-        idx = 0
-        while idx < len(rdesc):
-            item = _HidRDescItem._one_item_from_bytes(rdesc[idx:])
-            if item is None:
-                break
-            item.index_in_report = idx
-            items.append(item)
-            idx += item.size
-
-        return items
+        return list(cls.iter_bytes(rdesc))
 
     @classmethod
     def from_human_descr(
@@ -573,14 +611,12 @@ class _HidRDescItem(object):
                     assert data.startswith(prefix)
                     value = hex_value(data, prefix)
                 else:
-                    page = HUT.usage_page_from_name(data)
-                    if page is not None:
-                        value = page.page_id
+                    value = up.page_id
                 if value is not None:
                     usage_page = value
             elif name == "Usage":
                 try:
-                    value = HUT[usage_page].from_name[data].usage
+                    value = HUT.usage_from_name(usage_page, data) & 0xFFFF
                 except KeyError:
                     value = hex_value(data, "Vendor Usage ")
                     if value is None:
@@ -998,6 +1034,120 @@ class HidUnit(object):
         return v
 
 
+# A tuple of (first_byte, last_byte, shift, mask, sign_bit) for each value
+# of a HidField, see HidField.decode_plan
+_DecodePlanEntry: TypeAlias = Tuple[int, int, int, int, int]
+_DecodePlan: TypeAlias = Tuple[_DecodePlanEntry, ...]
+
+# A tuple of (field, attribute, data_index, is_array) for each non-const
+# field of a HidReport, see HidReport.create_report
+_Binding: TypeAlias = Tuple["HidField", str, int, bool]
+
+# A (prefix, field_index, field, value_format, vendor) tuple for each field
+# of a HidReport, see HidReport.format_report. The field is None for fields
+# that are printed as just the prefix, the value format is None for arrays.
+_FormatEntry: TypeAlias = Tuple[str, int, Optional["HidField"], Optional[str], bool]
+
+_missing: Final = object()
+
+# The header of a ReportDescriptor snapshot, see ReportDescriptor.save():
+# the magic, the version of the snapshot format and the length of the
+# hid-tools version string that follows. Snapshots are only loaded by the
+# same version of hid-tools, bump the format version whenever the
+# contents change anyway.
+_SNAPSHOT_MAGIC: Final = b"HIDRDSNP"
+_SNAPSHOT_VERSION: Final = 2
+_snapshot_header: Final = struct.Struct("<8sHB")
+
+# Part of the hashed data of ReportDescriptor.fingerprint(). Bump this
+# whenever the hashed layout changes, all fingerprints change with it.
+_FINGERPRINT_VERSION: Final = 1
+
+# The FingerprintIndex of the device models shipped with hid-tools,
+# regenerate it with "python -m hidtools.cli.known_devices" whenever a
+# model or the fingerprint changes
+KNOWN_DEVICES_INDEX: Final = os.path.join(DATA_DIR, "known-devices.json")
+
+
+def _decode_values(
+    plan: _DecodePlan, report: Union[Bytes, List[U8]], bits: Optional[int] = None
+) -> List[Union[U32, str]]:
+    """
+    Extract the values described by ``plan`` from ``report``. Values that
+    start beyond the end of the report are returned as ``"<.>"``.
+
+    ``bits`` is the whole report as one little-endian integer, callers
+    decoding several fields of the same report convert it once and pass
+    it in. Otherwise only the bytes covered by ``plan`` are converted.
+    """
+    values: List[Union[U32, str]] = []
+    if not plan:
+        return values
+    length = len(report)
+    offset = 0
+    if bits is None:
+        offset = plan[0][0]
+        bits = int.from_bytes(report[offset : plan[-1][1]], "little")
+        offset <<= 3
+    for first, _, shift, mask, sign in plan:
+        if first >= length:
+            values.append("<.>")
+            continue
+        value = (bits >> ((first << 3) + shift - offset)) & mask
+        if sign:
+            value = (value ^ sign) - sign
+        values.append(value)
+    return values
+
+
+def _decode_column(
+    view: memoryview,
+    count: int,
+    stride: int,
+    first: int,
+    last: int,
+    shift: int,
+    mask: int,
+    sign: int,
+) -> Any:
+    """
+    Extract one value from each of the ``count`` reports of ``stride``
+    bytes in ``view``, see :meth:`HidReport.decode_many`.
+    """
+    # a malformed descriptor may have fields that exceed the report size,
+    # truncate those the same way get_values() does for short reports
+    nbytes = max(0, min(last, stride) - first)
+
+    if numpy is not None and nbytes <= 8:
+        reports = numpy.frombuffer(view, dtype=numpy.uint8, count=count * stride)
+        reports = reports.reshape(count, stride)
+        column = numpy.zeros(count, dtype=numpy.uint64)
+        for i in range(nbytes):
+            column |= reports[:, first + i].astype(numpy.uint64) << numpy.uint64(8 * i)
+        column = (column >> numpy.uint64(shift)) & numpy.uint64(mask)
+        if sign:
+            return (column.astype(numpy.int64) ^ sign) - sign
+        return column
+
+    values: Any
+    if nbytes == 0:
+        values = [0] * count
+    elif nbytes == 1:
+        values = view[first::stride]
+        if shift or mask != 0xFF:
+            values = [(v >> shift) & mask for v in values]
+    else:
+        values = [
+            (int.from_bytes(view[o : o + nbytes], "little") >> shift) & mask
+            for o in range(first, count * stride, stride)
+        ]
+    if sign:
+        values = [(v ^ sign) - sign for v in values]
+    if nbytes > 8:
+        return list(values)
+    return array.array("q" if sign else "Q", values)
+
+
 class HidField(object):
     """
     Represents one field in a HID report. A field is one element of a HID
@@ -1050,6 +1200,31 @@ class HidField(object):
         Report Count for this HID field
     """
 
+    __slots__ = (
+        "report_ID",
+        "logical",
+        "physical",
+        "application",
+        "collection",
+        "type",
+        "usage_page",
+        "usage",
+        "usages",
+        "logical_min",
+        "logical_max",
+        "physical_min",
+        "physical_max",
+        "unit",
+        "unit_exp",
+        "size",
+        "count",
+        "start",
+        "_decode_plan",
+        "_usage_names",
+        "_names",
+        "_usage_indexes",
+    )
+
     def __init__(
         self: "HidField",
         report_ID: U8,
@@ -1077,7 +1252,7 @@ class HidField(object):
         self.type = value
         self.usage_page = usage_page
         self.usage = usage
-        self.usages: Optional[List[U32]] = None
+        self.usages: Optional[Sequence[U32]] = None
         self.logical_min = logical_min
         self.logical_max = logical_max
         self.physical_min = physical_min
@@ -1087,20 +1262,35 @@ class HidField(object):
         self.size = item_size
         self.count = count
         self.start = 0
+        self._decode_plan: Optional[_DecodePlan] = None
+        # Resolved names are keyed by the value they were resolved from, so
+        # reassigning usage, usages, etc. never returns a stale name. The
+        # copies made by getHidFields() share these.
+        self._usage_names: Dict[U32, str] = {}
+        self._names: Dict[Tuple[str, U32], Optional[str]] = {}
+        # (usages, len(usages), {usage: index}), see _usage_index()
+        self._usage_indexes: Optional[Tuple[Sequence[U32], int, Dict[U32, int]]] = None
 
     def copy(self: "HidField") -> "HidField":
         """
         Return a full copy of this :class:`HIDField`.
         """
-        c = copy.copy(self)
+        c = HidField.__new__(self.__class__)
+        for attr in HidField.__slots__:
+            setattr(c, attr, getattr(self, attr))
         if self.usages is not None:
             c.usages = self.usages[:]
         return c
 
     def _usage_name(self: "HidField", usage: U32) -> str:
+        try:
+            return self._usage_names[usage]
+        except KeyError:
+            pass
+
         usage_page: U16 = usage >> 16
         value: U16 = usage & 0x0000FFFF
-        if usage_page in HUT:  # type: ignore ### Operator "in" not supported for types "int" and "HidUsageTable"
+        if usage_page in HUT:
             if HUT[usage_page].page_name == "Button":
                 name = f"B{str(value)}"
             else:
@@ -1110,6 +1300,7 @@ class HidField(object):
                     name = f"0x{usage:04x}"
         else:
             name = f"0x{usage:04x}"
+        self._usage_names[usage] = name
         return name
 
     @property
@@ -1137,6 +1328,12 @@ class HidField(object):
         if phys is None:
             return phys
 
+        key = ("physical", phys)
+        try:
+            return self._names[key]
+        except KeyError:
+            pass
+
         _phys = ""
         try:
             page_id = phys >> 16
@@ -1147,6 +1344,7 @@ class HidField(object):
                 _phys = f"0x{phys:04x}"
             except ValueError:
                 pass
+        self._names[key] = _phys
         return _phys
 
     @property
@@ -1158,6 +1356,12 @@ class HidField(object):
         if logical is None:
             return None
 
+        key = ("logical", logical)
+        try:
+            return self._names[key]
+        except KeyError:
+            pass
+
         _logical = ""
 
         try:
@@ -1169,8 +1373,43 @@ class HidField(object):
                 _logical = f"0x{logical:04x}"
             except ValueError:
                 pass
+        self._names[key] = _logical
         return _logical
 
+    def _compile_decode_plan(self: "HidField") -> "_DecodePlan":
+        """
+        Precompute where each value of this field lives in a report: the
+        first and last byte to read, the bit shift within the first byte,
+        the value mask and the sign bit (``0`` for unsigned fields).
+
+        The plan depends on :attr:`start`, :attr:`size`, :attr:`count` and
+        :attr:`logical_min`, it is reset whenever the field is added to a
+        :class:`HidReport`.
+        """
+        mask = (1 << self.size) - 1
+        sign = 0
+        if self.logical_min < 0 and self.size > 1:
+            sign = 1 << (self.size - 1)
+        plan = []
+        for idx in range(self.count):
+            start_bit = self.start + self.size * idx
+            first = start_bit >> 3
+            last = (start_bit + self.size + 7) >> 3
+            plan.append((first, last, start_bit & 0x7, mask, sign))
+        self._decode_plan = tuple(plan)
+        return self._decode_plan
+
+    @property
+    def decode_plan(self: "HidField") -> "_DecodePlan":
+        """
+        The precomputed ``(first_byte, last_byte, shift, mask, sign_bit)``
+        tuples for each of the :attr:`count` values of this field.
+        """
+        plan = self._decode_plan
+        if plan is None:
+            plan = self._compile_decode_plan()
+        return plan
+
     def _get_value(self: "HidField", report: List[U8], idx: int) -> Union[U32, str]:
         """
         Extract the bits that are this HID field in the list of bytes
@@ -1180,22 +1419,7 @@ class HidField(object):
         :param int idx: which field index to fetch, only greater than 0 if
             :attr:`count` is larger than 1
         """
-        value = 0
-        start_bit = self.start + self.size * idx
-        end_bit = start_bit + self.size * (idx + 1)
-        data = report[int(start_bit / 8) : int(end_bit / 8 + 1)]
-        if len(data) == 0:
-            return "<.>"
-        for d in range(len(data)):
-            value |= data[d] << (8 * d)
-
-        bit_offset = start_bit % 8
-        value = value >> bit_offset
-        garbage = (value >> self.size) << self.size
-        value = value - garbage
-        if self.logical_min < 0 and self.size > 1:
-            value = twos_comp(value, self.size)
-        return value
+        return _decode_values(self.decode_plan[idx : idx + 1], report)[0]
 
     def get_values(self: "HidField", report: List[U8]) -> List[Union[U32, str]]:
         """
@@ -1212,36 +1436,45 @@ class HidField(object):
         :param list report: a list of bytes that are a HID report
         :returns: a list of integer values of len :attr:`count`
         """
-        return [self._get_value(report, i) for i in range(self.count)]
+        return _decode_values(self.decode_plan, report)
 
-    def _fill_value(self: "HidField", report: List[U8], value: U32, idx: int) -> None:
-        start_bit = self.start + self.size * idx
-        n = self.size
+    def _write_bits(self: "HidField", report: List[U8], bits: int) -> None:
+        """
+        Replace the bits of this field in ``report`` with ``bits``, an
+        integer with the first value of this field in its lowest bits. The
+        bytes covered by this field are read and written back once.
+        """
+        first = self.start >> 3
+        last = (self.start + self.size * self.count + 7) >> 3
+        if last > len(report):
+            raise IndexError("list index out of range")
 
-        max = (1 << n) - 1
-        if value > max:
-            raise Exception(
-                f"_set_value(): value {value} is larger than size {self.size}"
-            )
+        shift = self.start & 0x7
+        mask = ((1 << (self.size * self.count)) - 1) << shift
+        current = int.from_bytes(bytes(report[first:last]), "little")
+        current = (current & ~mask) | (bits << shift)
+        report[first:last] = current.to_bytes(last - first, "little")
+
+    def _usage_index(self: "HidField", usage: U32) -> Optional[int]:
+        """
+        The index of ``usage`` in :attr:`usages` or ``None``. Usage ranges
+        are :class:`range` objects and answer this directly, explicit
+        usage lists are indexed on first use and re-indexed whenever
+        :attr:`usages` is reassigned or changes size.
+        """
+        usages = self.usages
+        if usages is None:
+            return None
+        if isinstance(usages, range):
+            return usages.index(usage) if usage in usages else None
 
-        byte_idx = int(start_bit / 8)
-        bit_shift = start_bit % 8
-        bits_to_set = 8 - bit_shift
-
-        while n - bits_to_set >= 0:
-            report[byte_idx] &= ~(0xFF << bit_shift)
-            report[byte_idx] |= (value << bit_shift) & 0xFF
-            value >>= bits_to_set
-            n -= bits_to_set
-            bits_to_set = 8
-            bit_shift = 0
-            byte_idx += 1
-
-        # last nibble
-        if n:
-            bit_mask = (1 << n) - 1
-            report[byte_idx] &= ~(bit_mask << bit_shift)
-            report[byte_idx] |= value << bit_shift
+        indexes = self._usage_indexes
+        if indexes is None or indexes[0] is not usages or indexes[1] != len(usages):
+            index: Dict[U32, int] = {}
+            for i, u in enumerate(usages):
+                index.setdefault(u, i)
+            indexes = self._usage_indexes = (usages, len(usages), index)
+        return indexes[2].get(usage)
 
     def fill_values_array(self: "HidField", report: List[U8], data: List[Any]) -> None:
         """
@@ -1264,6 +1497,13 @@ class HidField(object):
         :param list data: the data for this hid field with one element for
             each Usage.
         """
+        self._write_bits(report, self._pack_values_array(data))
+
+    def _pack_values_array(self: "HidField", data: List[Any]) -> int:
+        """
+        The bits of :meth:`fill_values_array`, with the first value of this
+        field in the lowest bits.
+        """
         if len(data) > self.count:
             raise Exception("-EINVAL")
 
@@ -1271,16 +1511,16 @@ class HidField(object):
 
         for usage_name in data:
             try:
-                usage = HUT[self.usage_page].from_name[usage_name]
+                full_usage = HUT.usage_from_name(self.usage_page, usage_name)
             except KeyError:
                 continue
 
-            full_usage = usage.usage_page.page_id << 16 | usage.usage
-
-            if self.usages is not None and full_usage in self.usages:
-                idx = self.usages.index(full_usage)
+            idx = self._usage_index(full_usage)
+            if idx is not None:
                 array.append(idx)
 
+        mask = (1 << self.size) - 1
+        bits = 0
         for idx in range(self.count):
             try:
                 v = array[idx]
@@ -1289,7 +1529,13 @@ class HidField(object):
 
             v += self.logical_min
 
-            self._fill_value(report, v, idx)
+            if v > mask:
+                raise Exception(
+                    f"_set_value(): value {v} is larger than size {self.size}"
+                )
+            bits |= (v & mask) << (self.size * idx)
+
+        return bits
 
     def fill_values(self: "HidField", report: List[U8], data: List[U32]) -> None:
         """
@@ -1314,22 +1560,38 @@ class HidField(object):
         :param list data: the data for this hid field with one element for
             each Usage.
         """
+        self._write_bits(report, self._pack_values(data))
+
+    def _pack_values(self: "HidField", data: List[U32]) -> int:
+        """
+        The bits of :meth:`fill_values`, with the first value of this
+        field in the lowest bits.
+        """
         if len(data) != self.count:
             raise Exception("-EINVAL")
 
+        is_null = self.is_null
+        contact_usages = ["Contact Id", "Contact Max", "Contact Count"]
+        logical_min, logical_max = self.logical_min, self.logical_max
+        size = self.size
+        mask = (1 << size) - 1
+        bits = 0
         for idx in range(self.count):
             v = data[idx]
 
-            if self.is_null:
+            if is_null:
                 # FIXME: handle the signed case too
-                if v >= (1 << self.size):
+                if v > mask:
                     raise RangeError(self, v)
-            elif self.usage_name not in ["Contact Id", "Contact Max", "Contact Count"]:
-                if v and not (self.logical_min <= v <= self.logical_max):
+            elif v and not (logical_min <= v <= logical_max):
+                if self.usage_name not in contact_usages:
                     raise RangeError(self, v)
-            if self.logical_min < 0:
-                v = to_twos_comp(v, self.size)
-            self._fill_value(report, v, idx)
+            # negative values are stored in two's complement
+            if v > mask and logical_min >= 0:
+                raise Exception(f"_set_value(): value {v} is larger than size {size}")
+            bits |= (v & mask) << (size * idx)
+
+        return bits
 
     @property
     def is_array(self: "HidField") -> bool:
@@ -1357,12 +1619,19 @@ class HidField(object):
         """
         The Usage Page name for this field, e.g. "Generic Desktop"
         """
+        key = ("usage_page", self.usage_page)
+        try:
+            return cast(str, self._names[key])
+        except KeyError:
+            pass
+
         usage_page_name = ""
         usage_page = self.usage_page >> 16
         try:
             usage_page_name = HUT[usage_page].page_name
         except KeyError:
             pass
+        self._names[key] = usage_page_name
         return usage_page_name
 
     @classmethod
@@ -1429,37 +1698,249 @@ class HidField(object):
             item_size,
             1,
         )
-        items = []
+
+        def variable_field(usage: U32) -> "HidField":
+            # Constructing the fields of a long run of variable values is
+            # much cheaper than copying item for each of them
+            field = cls(
+                report_ID,
+                logical,
+                physical,
+                application,
+                collection,
+                value,
+                usage_page,
+                usage,
+                logical_min,
+                logical_max,
+                physical_min,
+                physical_max,
+                unit,
+                unit_exp,
+                item_size,
+                1,
+            )
+            field._usage_names = item._usage_names
+            field._names = item._names
+            return field
 
         if value & 0x3:  # Const or Variable item
+            # one field per value, the last usage repeats if there are
+            # more values than usages
             if usage_min and usage_max:
-                usage = usage_min
-                for i in range(count):
-                    item = item.copy()
-                    item.usage = usage
-                    items.append(item)
-                    if usage < usage_max:
-                        usage += 1
+                last = max(usage_max - usage_min, 0)
+                return [variable_field(usage_min + min(i, last)) for i in range(count)]
             elif usages:
-                for i in range(count):
-                    if i < len(usages):
-                        usage = usages[i]
-                    else:
-                        usage = usages[-1]
-                    item = item.copy()
-                    item.usage = usage
-                    items.append(item)
+                last = len(usages) - 1
+                return [variable_field(usages[min(i, last)]) for i in range(count)]
             # A const field used for padding may not have any usages
             else:
                 item.size *= count
                 return [item]
         else:  # Array item
             if usage_min and usage_max:
-                usages = list(range(usage_min, usage_max + 1))
-            item.usages = usages
+                # Usage Minimum/Maximum may span a whole usage page, keep
+                # that as a range rather than a list of up to 65536 usages
+                item.usages = range(usage_min, usage_max + 1)
+            else:
+                item.usages = usages
             item.count = count
             return [item]
-        return items
+
+
+class _ReportCodec(object):
+    """
+    Generates specialized decode and encode functions for the layout of one
+    :class:`HidReport`, see :meth:`HidReport.compile`.
+
+    Byte-aligned 8, 16, 32 and 64 bit values are read and written with a
+    single :class:`struct.Struct`, all other values with straight-line
+    shifts and masks. The generated source is available through
+    :meth:`decode_source` and :meth:`encode_source` for debugging.
+    """
+
+    _struct_formats: Final = {8: "B", 16: "H", 32: "I", 64: "Q"}
+    _contact_usages: Final = ("Contact Id", "Contact Max", "Contact Count")
+
+    @classmethod
+    def _layout(
+        cls: _Type["_ReportCodec"], report: "HidReport"
+    ) -> Tuple[struct.Struct, int, List[List[Union[int, _DecodePlanEntry]]]]:
+        """
+        Split the values of ``report`` into those handled by a
+        :class:`struct.Struct` and the rest. Returns the struct, the number
+        of values in the struct and, for each field, a list with either the
+        index into the struct's values or the decode plan entry for each
+        value.
+        """
+        fmt = "<"
+        offset = 0
+        nstruct = 0
+        layout: List[List[Union[int, _DecodePlanEntry]]] = []
+        for f in report.fields:
+            values: List[Union[int, _DecodePlanEntry]] = []
+            code = cls._struct_formats.get(f.size)
+            for entry in f.decode_plan:
+                first, last, shift, mask, sign = entry
+                if code is not None and shift == 0 and first >= offset:
+                    fmt += "x" * (first - offset) + (code.lower() if sign else code)
+                    offset = last
+                    values.append(nstruct)
+                    nstruct += 1
+                else:
+                    values.append(entry)
+            layout.append(values)
+        return struct.Struct(fmt), nstruct, layout
+
+    @classmethod
+    def decode_source(cls: _Type["_ReportCodec"], report: "HidReport") -> str:
+        """
+        The source of the ``decode(report)`` function for ``report``
+        """
+        s, nstruct, layout = cls._layout(report)
+        need = s.size
+        fields = []
+        for values in layout:
+            exprs = []
+            for v in values:
+                if isinstance(v, int):
+                    exprs.append(f"s{v}")
+                    continue
+                first, last, shift, mask, sign = v
+                need = max(need, first + 1)
+                if last - first == 1:
+                    expr = f"buf[{first}]"
+                else:
+                    expr = f'int.from_bytes(buf[{first}:{last}], "little")'
+                if shift:
+                    expr = f"({expr} >> {shift})"
+                if shift or mask != (1 << (8 * (last - first))) - 1:
+                    expr = f"({expr} & {mask:#x})"
+                if sign:
+                    expr = f"(({expr} ^ {sign:#x}) - {sign:#x})"
+                exprs.append(expr)
+            fields.append(f"        [{', '.join(exprs)}],")
+
+        lines = [
+            "def decode(report):",
+            f"    if len(report) < {need}:",
+            "        return _generic(report)",
+            "    buf = bytes(report)",
+        ]
+        if nstruct:
+            targets = ", ".join(f"s{i}" for i in range(nstruct))
+            lines.append(f"    {targets}, = _struct.unpack_from(buf)")
+        return "\n".join(lines + ["    return ["] + fields + ["    ]"]) + "\n"
+
+    @classmethod
+    def encode_source(cls: _Type["_ReportCodec"], report: "HidReport") -> str:
+        """
+        The source of the ``encode(values)`` function for ``report``
+        """
+        _, nstruct, layout = cls._layout(report)
+        if report.bitsize > report.size * 8:
+            # a field extends past the last full byte, the generic path
+            # raises an IndexError for those
+            return "def encode(values):\n    return _encode_generic(values)\n"
+
+        body = [f"r = {report.report_ID & 0xFF if report.numbered else 0}"]
+        if nstruct:
+            body.append(f"{' = '.join(f's{i}' for i in range(nstruct))} = 0")
+        for i, (f, values) in enumerate(zip(report.fields, layout)):
+            names = [
+                f"s{v}" if isinstance(v, int) else f"v{j}" for j, v in enumerate(values)
+            ]
+            body += [
+                f"vals = values[{i}]",
+                "if vals is not None:",
+                f"    {', '.join(names)}, = vals",
+            ]
+            mask = (1 << f.size) - 1
+            sign = 1 << (f.size - 1) if f.logical_min < 0 else 0
+            full_range = (f.logical_min, f.logical_max) == (-sign, mask - sign)
+            for name, v in zip(names, values):
+                if isinstance(v, int) and full_range and not f.is_null:
+                    # struct.pack() rejects exactly the out-of-range values
+                    continue
+                if f.is_null:
+                    check = f"{name} > {mask:#x}"
+                elif f.usage_name not in cls._contact_usages:
+                    lmin, lmax = f.logical_min, f.logical_max
+                    check = f"{name} and not {lmin} <= {name} <= {lmax}"
+                else:
+                    check = ""
+                if check:
+                    body += [
+                        f"    if {check}:",
+                        f"        raise RangeError(_fields[{i}], {name})",
+                    ]
+                # unsigned values in the logical range always fit the field
+                if f.logical_min >= 0 and (
+                    not check or (not f.is_null and f.logical_max > mask)
+                ):
+                    error = (
+                        f"_set_value(): value {{{name}}} is larger than size {f.size}"
+                    )
+                    body += [
+                        f"    if {name} > {mask:#x}:",
+                        f'        raise Exception(f"{error}")',
+                    ]
+                if not isinstance(v, int):
+                    start = v[0] * 8 + v[2]
+                    body.append(f"    r |= ({name} & {mask:#x}) << {start}")
+        if nstruct:
+            args = ", ".join(f"s{i}" for i in range(nstruct))
+            body.append(f'r |= int.from_bytes(_struct.pack({args}), "little")')
+
+        # Values packed with the struct are only checked at the end, so on
+        # any error the generic path runs to raise the exception for the
+        # first invalid value
+        lines = [
+            "def encode(values):",
+            f"    if len(values) != {len(layout)}:",
+            '        raise Exception("-EINVAL")',
+            "    try:",
+        ]
+        lines += [f"        {line}" for line in body]
+        lines += [
+            "    except Exception:",
+            "        return _encode_generic(values)",
+            f'    return list(r.to_bytes({report.size}, "little"))',
+        ]
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _compile(
+        cls: _Type["_ReportCodec"], report: "HidReport", name: str, source: str
+    ) -> Callable:
+        namespace: Dict[str, Any] = {
+            "_fields": tuple(report.fields),
+            "_generic": report._decode_generic,
+            "_encode_generic": report._encode_generic,
+            "_struct": cls._layout(report)[0],
+            "RangeError": RangeError,
+        }
+        filename = f"<HidReport {report.type.name} {report.report_ID} {name}>"
+        exec(compile(source, filename, "exec"), namespace)
+        return namespace[name]
+
+    @classmethod
+    def decoder(
+        cls: _Type["_ReportCodec"], report: "HidReport"
+    ) -> Callable[[Union[Bytes, List[U8]]], List[List[Any]]]:
+        """
+        Return the compiled ``decode(report)`` function for ``report``
+        """
+        return cls._compile(report, "decode", cls.decode_source(report))
+
+    @classmethod
+    def encoder(
+        cls: _Type["_ReportCodec"], report: "HidReport"
+    ) -> Callable[[List[Optional[List[int]]]], List[U8]]:
+        """
+        Return the compiled ``encode(values)`` function for ``report``
+        """
+        return cls._compile(report, "encode", cls.encode_source(report))
 
 
 class HidReport(object):
@@ -1500,7 +1981,14 @@ class HidReport(object):
         if self.numbered:
             self._bitsize = 8
         self._type = type
-        self.prev_collection: Optional[Tuple[U32, U32, U32]] = None
+        self._decode_plan: Optional[List[Tuple[HidField, _DecodePlan]]] = None
+        self._compiled = False
+        self._decoder: Optional[Callable[[Union[Bytes, List[U8]]], List[List[Any]]]]
+        self._decoder = None
+        self._encoder: Optional[Callable[[List[Optional[List[int]]]], List[U8]]]
+        self._encoder = None
+        self._bindings: Optional[Tuple[_Binding, ...]] = None
+        self._format_templates: Dict[bool, List[_FormatEntry]] = {}
 
     def append(self: "HidReport", field: HidField) -> None:
         """
@@ -1510,7 +1998,12 @@ class HidReport(object):
         """
         self.fields.append(field)
         field.start = self._bitsize
+        field._decode_plan = None
         self._bitsize += field.size
+        self._decode_plan = None
+        self._decoder = self._encoder = None
+        self._bindings = None
+        self._format_templates = {}
 
     def extend(self: "HidReport", fields: List[HidField]) -> None:
         """
@@ -1522,19 +2015,46 @@ class HidReport(object):
         self.fields.extend(fields)
         for f in fields:
             f.start = self._bitsize
+            f._decode_plan = None
             self._bitsize += f.size * f.count
+        self._decode_plan = None
+        self._decoder = self._encoder = None
+        self._bindings = None
+        self._format_templates = {}
+
+    def _compile_decode_plan(
+        self: "HidReport",
+    ) -> List[Tuple[HidField, _DecodePlan]]:
+        self._decode_plan = [(f, f._compile_decode_plan()) for f in self.fields]
+        return self._decode_plan
+
+    @property
+    def decode_plan(self: "HidReport") -> List[Tuple[HidField, _DecodePlan]]:
+        """
+        The decode plan for this report: a list of ``(field, plan)`` tuples
+        in report order, see :attr:`HidField.decode_plan`. The plan is
+        computed once after parsing and reused for every report decoded.
+        """
+        plan = self._decode_plan
+        if plan is None:
+            plan = self._compile_decode_plan()
+        return plan
 
     @property
     def application_name(self: "HidReport") -> str:
-        if self.application is None:
-            return "Vendor"
+        if self._application_name is not None:
+            return self._application_name
 
-        try:
-            page_id = self.application >> 16
-            value = self.application & 0xFF
-            return HUT[page_id][value].name
-        except KeyError:
-            return "Vendor"
+        name = "Vendor"
+        if self.application is not None:
+            try:
+                page_id = self.application >> 16
+                value = self.application & 0xFF
+                name = HUT[page_id][value].name
+            except KeyError:
+                pass
+        self._application_name = name
+        return name
 
     @property
     def type(self: "HidReport") -> "HidReport.Type":
@@ -1567,88 +2087,220 @@ class HidReport(object):
     def __iter__(self: "HidReport") -> Iterator[HidField]:
         return iter(self.fields)
 
-    def _fix_xy_usage_for_mt_devices(self: "HidReport", usage: str) -> str:
-        if usage not in self.prev_seen_usages:
+    def compile(self: "HidReport") -> None:
+        """
+        Opt in to code-generated :meth:`decode` and :meth:`encode`
+        functions. The Python source for this report's layout is generated
+        and compiled on the first call to either function and reused
+        afterwards, it is regenerated if fields are added to this report.
+        Compiling takes longer than parsing the report descriptor, so this
+        only pays off for reports that are decoded or encoded many times.
+        """
+        self._compiled = True
+
+    @property
+    def compiled(self: "HidReport") -> bool:
+        """
+        ``True`` if :meth:`compile` was called on this report
+        """
+        return self._compiled
+
+    def _decode_generic(
+        self: "HidReport", report: Union[Bytes, List[U8]]
+    ) -> List[List[Any]]:
+        # convert the report to one integer once, except for reports so large
+        # that shifting that integer costs more than converting each field
+        bits = int.from_bytes(report, "little") if len(report) <= 1024 else None
+        return [_decode_values(plan, report, bits) for _, plan in self.decode_plan]
+
+    def decode(self: "HidReport", report: Union[Bytes, List[U8]]) -> List[List[Any]]:
+        """
+        Extract the values of all fields from ``report``, this is the same
+        as calling :meth:`HidField.get_values` on each field in
+        :attr:`fields`. ::
+
+            for field, values in zip(report.fields, report.decode(data)):
+                print(field.usage_name, values)
+
+        :param report: the bytes of one HID report
+        :returns: a list with one list of values per field
+        """
+        if self._compiled:
+            decoder = self._decoder
+            if decoder is None:
+                decoder = self._decoder = _ReportCodec.decoder(self)
+            return decoder(report)
+        return self._decode_generic(report)
+
+    def encode(self: "HidReport", values: List[Optional[List[int]]]) -> List[U8]:
+        """
+        The inverse of :meth:`decode`: build the bytes of this report from
+        the raw values of its fields, this is the same as calling
+        :meth:`HidField.fill_values` on each field in :attr:`fields`.
+        The Report ID, if any, is filled in.
+
+        :param list values: one list of :attr:`HidField.count` values per
+            field, or ``None`` for fields that should be left as zero
+        :returns: the report as a list of bytes
+        :raises RangeError: if a value is outside its field's logical
+            range
+        """
+        if self._compiled:
+            encoder = self._encoder
+            if encoder is None:
+                encoder = self._encoder = _ReportCodec.encoder(self)
+            return encoder(values)
+        return self._encode_generic(values)
+
+    def _encode_generic(
+        self: "HidReport", values: List[Optional[List[int]]]
+    ) -> List[U8]:
+        if len(values) != len(self.fields):
+            raise Exception("-EINVAL")
+        bits = self.report_ID if self.numbered else 0
+        for field, vals in zip(self.fields, values):
+            if vals is not None:
+                bits |= self._place(field, field._pack_values(vals))
+        return list(bits.to_bytes(self.size, "little"))
+
+    def decode_many(
+        self: "HidReport",
+        buffer: Union[Bytes, bytearray, memoryview],
+        count: Optional[int] = None,
+    ) -> List[List[Any]]:
+        """
+        Decode ``count`` same-sized reports stored back-to-back in
+        ``buffer`` in one go. This is the batch equivalent of calling
+        :meth:`HidField.get_values` on each report for each field.
+
+        The data is returned column-wise: one entry per field in
+        :attr:`fields`, each a list of :attr:`HidField.count` columns with
+        one value per report. Where NumPy is available, the columns are
+        ``numpy.ndarray`` objects, otherwise they are :class:`array.array`
+        objects (or lists for fields wider than 64 bits). ::
+
+            columns = report.decode_many(data, 1000)
+            for field, values in zip(report.fields, columns):
+                print(field.usage_name, values[0])
+
+        The Report ID of each report is not checked.
+
+        :param buffer: the report data, a bytes-like object
+        :param int count: the number of reports in ``buffer``. If ``None``,
+            ``buffer`` is assumed to contain reports of :attr:`size` bytes
+            each. Otherwise, the reports are ``len(buffer) // count``
+            bytes each, which allows for reports larger than what the
+            report descriptor specifies.
+        :returns: a list of lists of columns
+        """
+        view = memoryview(buffer).cast("B")
+        if count is None:
+            stride = self.size
+            count = len(view) // stride if stride else 0
+        else:
+            stride = len(view) // count if count else self.size
+        if stride < self.size:
+            raise ValueError(
+                f"Reports of {stride} bytes are too short for a report of {self.size} bytes"
+            )
+        view = view[: count * stride]
+
+        return [
+            [_decode_column(view, count, stride, *entry) for entry in plan]
+            for _, plan in self.decode_plan
+        ]
+
+    @staticmethod
+    def _fix_xy_usage_for_mt_devices(usage: str, prev_seen_usages: List[str]) -> str:
+        if usage not in prev_seen_usages:
             return usage
 
         # multitouch devices might have 2 X for CX, TX
-        if usage == "X" and (
-            "Y" not in self.prev_seen_usages or "CY" in self.prev_seen_usages
-        ):
+        if usage == "X" and ("Y" not in prev_seen_usages or "CY" in prev_seen_usages):
             usage = "CX"
 
         # multitouch devices might have 2 Y for CY, TY
-        if usage == "Y" and (
-            "X" not in self.prev_seen_usages or "CX" in self.prev_seen_usages
-        ):
+        if usage == "Y" and ("X" not in prev_seen_usages or "CX" in prev_seen_usages):
             usage = "CY"
 
         return usage
 
-    def _format_one_event(
-        self: "HidReport",
-        data: List[Any],
-        global_data: Any,
-        hidInputItem: HidField,
-        r_out: List[U8],
-    ) -> None:
+    def _compile_bindings(self: "HidReport") -> Tuple[_Binding, ...]:
         """
-        Fill in the report array ``r_out`` with the data for this input
-        item. ``r_out`` is modified in place with the values from ``data``
-        or ``global_data`` (as fallback) that apply to this input item.
+        Resolve, once per report, the attribute each non-const field is
+        filled from in :meth:`create_report` and the index of the data
+        object that attribute is looked up on. A usage seen again in a
+        new collection (e.g. the next touch of a multitouch report) moves
+        on to the next data object.
 
-        :param object data: an object with attributes matching the HID usage names
-            in this report. Where an attribute is undefined, the
-            `global_data` is used instead.
-        :param object global_data: an object with attributes matching the
-            HID usage names, used whenever the `data` doesn't have an
-            attribute defined.
-        :param HidField hidInputItem: the input item of this report to set
-        :param list r_out: the integer array of values for this report,
-            modified in-place.
+        The usages seen so far are local to this call, the report may be
+        shared between devices through :data:`rdesc_cache`.
         """
-        if hidInputItem.is_const:
-            return
+        prev_seen_usages: List[str] = []
+        prev_collection = None
+        index = 0
+        bindings = []
+        for field in self.fields:
+            if field.is_const:
+                continue
 
-        usage = hidInputItem.usage_name
+            usage = self._fix_xy_usage_for_mt_devices(
+                field.usage_name, prev_seen_usages
+            )
+            if (
+                prev_collection is not None
+                and prev_collection != field.collection
+                and usage in prev_seen_usages
+            ):
+                index += 1
+                prev_seen_usages.clear()
 
-        usage = self._fix_xy_usage_for_mt_devices(usage)
+            # Match the HID usage with our attributes, so
+            # Contact Count -> contactcount, etc.
+            attribute = usage.replace(" ", "").lower()
+            bindings.append((field, attribute, index, field.is_array))
 
-        if (
-            self.prev_collection is not None
-            and self.prev_collection != hidInputItem.collection
-            and usage in self.prev_seen_usages
-        ):
-            if len(data) > 0:
-                data.pop(0)
-            self.prev_seen_usages.clear()
+            prev_collection = field.collection
+            prev_seen_usages.append(usage)
 
-        value = [0]
+        self._bindings = tuple(bindings)
+        return self._bindings
 
-        # Match the HID usage with our attributes, so
-        # Contact Count -> contactcount, etc.
-        field = usage.replace(" ", "").lower()
+    @property
+    def attributes(self: "HidReport") -> List[str]:
+        """
+        The attribute names :meth:`create_report` looks up on the data
+        objects, one for each non-const field of this report in field
+        order. Names repeat for reports with several contacts, e.g.
+        ``["contactid", "x", "y", "contactid", "x", "y"]``.
+        """
+        bindings = self._bindings
+        if bindings is None:
+            bindings = self._compile_bindings()
+        return [attribute for _, attribute, _, _ in bindings]
 
-        if len(data) > 0 and hasattr(data[0], field):
-            value = getattr(data[0], field)
-        elif global_data is not None and hasattr(global_data, field):
-            value = getattr(global_data, field)
+    def _place(self: "HidReport", field: HidField, bits: int) -> int:
+        """
+        Shift ``bits``, the packed values of ``field``, to the position of
+        ``field`` in this report.
+        """
+        if field.start + field.size * field.count > self._bitsize & ~0x7:
+            # the field extends past the last full byte of this report
+            raise IndexError("list index out of range")
+        return bits << field.start
 
-        if hidInputItem.is_array:
+    def _pack_field(
+        self: "HidReport", field: HidField, value: Any, is_array: bool
+    ) -> int:
+        if is_array:
             if isinstance(value, str):
                 value = [value]
-
-            hidInputItem.fill_values_array(r_out, value)
+            return self._place(field, field._pack_values_array(value))
 
         # non arrays
-        else:
-            if not isinstance(value, list):
-                value = [value]
-
-            hidInputItem.fill_values(r_out, value)
-
-        self.prev_collection = hidInputItem.collection
-        self.prev_seen_usages.append(usage)
+        if not isinstance(value, list):
+            value = [value]
+        return self._place(field, field._pack_values(value))
 
     def create_report(self: "HidReport", data: List[Any], global_data: Any) -> List[U8]:
         """
@@ -1665,66 +2317,105 @@ class HidReport(object):
 
             data_bytes = hid_report.create_report(mouse)
 
+        The data objects and ``global_data`` may also be plain dicts, e.g.
+        ``{"b1": 1, "x": 10, "y": -3}``, where keys are used instead of
+        attributes. The names looked up are listed in :attr:`attributes`.
+
+        Where a report contains several contacts, one data object is
+        consumed from the front of ``data`` for each of them.
+
         The HidReport will create the report according to the device's
         report descriptor.
         """
-        self.prev_seen_usages: List[str] = []
-        self.prev_collection = None
-        r = [0] * self.size
+        bindings = self._bindings
+        if bindings is None:
+            bindings = self._compile_bindings()
 
-        if self.numbered:
-            r[0] = self.report_ID
+        bits = self.report_ID if self.numbered else 0
 
-        for item in self:
-            self._format_one_event(data, global_data, item, r)
+        n = len(data)
+        index = 0
+        try:
+            for field, attribute, index, is_array in bindings:
+                value: Any = _missing
+                if index < n:
+                    obj = data[index]
+                    if isinstance(obj, dict):
+                        value = obj.get(attribute, _missing)
+                    else:
+                        value = getattr(obj, attribute, _missing)
+                if value is _missing:
+                    if isinstance(global_data, dict):
+                        value = global_data.get(attribute, [0])
+                    elif global_data is not None:
+                        value = getattr(global_data, attribute, [0])
+                    else:
+                        value = [0]
 
-        if len(data) > 0:
-            # remove the last item we just processed
-            data.pop(0)
+                bits |= self._pack_field(field, value, is_array)
+        except Exception:
+            # the data objects before the failing field were consumed
+            del data[:index]
+            raise
 
-        return r
+        # remove the data objects we just processed
+        del data[: index + 1]
 
-    def format_report(
-        self: "HidReport", data: List[Any], split_lines: bool = True
-    ) -> str:
+        return list(bits.to_bytes(self.size, "little"))
+
+    def create_report_from_values(self: "HidReport", values: Sequence[Any]) -> List[U8]:
         """
-        Format the HID Report provided as a list of 8-bit integers into a
-        human-readable format.
+        Like :meth:`create_report` but with the values given in field
+        order instead of looked up by name: one value for each non-const
+        field, in the order of :attr:`attributes`. ::
 
-        :param list data: a list of 8-bit integers that are this report
-        :param boolean split_lines: ``True`` if the format can be split
-            across multiple lines. This makes for easier reading but harder
-            automated processing.
+            >>> report.attributes
+            ['b1', 'b2', 'b3', 'x', 'y']
+            >>> report.create_report_from_values((1, 0, 0, 10, -3))
+
+        :param values: a tuple or list with one value, or one list of
+            values, per non-const field
+        :returns: the report as a list of bytes
         """
+        bindings = self._bindings
+        if bindings is None:
+            bindings = self._compile_bindings()
 
-        output = ""
+        if len(values) != len(bindings):
+            raise Exception("-EINVAL")
 
-        self.prev_seen_usages = []
-        self.prev_collection = None
-        sep = ""
-        if self.numbered:
-            assert self.report_ID == data[0]
-            output += f"ReportID: {self.report_ID} "
-            sep = "/"
+        bits = self.report_ID if self.numbered else 0
+        for (field, _, _, is_array), value in zip(bindings, values):
+            bits |= self._pack_field(field, value, is_array)
+
+        return list(bits.to_bytes(self.size, "little"))
+
+    def _compile_format_template(
+        self: "HidReport", split_lines: bool
+    ) -> List[_FormatEntry]:
+        """
+        Precompute everything :meth:`format_report` prints that does not
+        depend on the report's values: the separators, line breaks and
+        labels in front of each field and the format of its value.
+        """
+        template: List[_FormatEntry] = []
+
+        # like in _compile_bindings(), keep the state of this call local
+        prev_seen_usages: List[str] = []
+        prev_collection = None
+        sep = "/" if self.numbered else ""
         prev = None
-        for report_item in self:
+        for index, report_item in enumerate(self.fields):
             if report_item.is_const and (
                 self.type != HidReport.Type.FEATURE or report_item.usage == 0
             ):
-                output += f"{sep} # "
+                template.append((f"{sep} # ", index, None, None, False))
                 continue
 
-            # get the value and consumes bits
-            values = report_item.get_values(data)
-
-            usage: Optional[str]
-
             if not report_item.is_array:
-                value_format = "{:d}"
+                value_format = "d"
                 if report_item.size > 1:
-                    value_format = f"{{:{str(len(str(1 << report_item.size)) + 1)}d}}"
-                if isinstance(values[0], str):
-                    value_format = "{}"
+                    value_format = f"{len(str(1 << report_item.size)) + 1}d"
                 if report_item.usage_page_name == "Button":
                     if report_item.usage_name == "B1":
                         usage_name = "Button"
@@ -1735,21 +2426,22 @@ class HidReport(object):
                         usage = ""
                 else:
                     usage_name = self._fix_xy_usage_for_mt_devices(
-                        report_item.usage_name
+                        report_item.usage_name, prev_seen_usages
                     )
                     usage = f" {usage_name}:"
 
                 # if we don't get a key error this is a duplicate in
                 # this report descriptor and we need a linebreak
+                newline = ""
                 if (
                     split_lines
-                    and self.prev_collection is not None
-                    and self.prev_collection != report_item.collection
+                    and prev_collection is not None
+                    and prev_collection != report_item.collection
                 ):
-                    self.prev_seen_usages = []
-                    output += "\n"
-                self.prev_collection = report_item.collection
-                self.prev_seen_usages.append(usage_name)
+                    prev_seen_usages = []
+                    newline = "\n"
+                prev_collection = report_item.collection
+                prev_seen_usages.append(usage_name)
 
                 # do not reapeat the usage name if several are in a row
                 if (
@@ -1759,42 +2451,201 @@ class HidReport(object):
                 ):
                     sep = ","
                     usage = ""
-                output += f"{sep}{usage} {value_format.format(values[0])} "
+                prefix = f"{newline}{sep}{usage} "
+                template.append((prefix, index, report_item, value_format, False))
             else:
                 logical_name = report_item.logical_name
                 if not logical_name:
                     logical_name = report_item.usage_page_name
                 if not logical_name:
                     logical_name = "Array"
-                usages = []
-                for v in values:
-                    if isinstance(v, str):  # special marker "<.>"
-                        usages.append("")
-                    elif v < report_item.logical_min or v > report_item.logical_max:
-                        usages.append("")
-                    else:
-                        usage = ""
-                        if isinstance(v, str):
-                            usage = v
-                        else:
-                            usage = f"{v:02x}"
-                        index = (
-                            v - report_item.logical_min
-                        )  # guaranteed to be > 0 with test above
-                        assert (
-                            report_item.usages is not None
-                        )  # guaranteed to be set because of the parsing
-                        if "vendor" not in logical_name.lower() and index < len(
-                            report_item.usages
-                        ):
-                            usage = report_item.get_usage_name(index)
-                            if usage is None or "no event indicated" in usage.lower():
-                                usage = ""
-                        usages.append(f"'{usage}'")
-                output += f'{sep}{logical_name} [{", ".join(usages)}] '
+                vendor = "vendor" in logical_name.lower()
+                prefix = f"{sep}{logical_name} ["
+                template.append((prefix, index, report_item, None, vendor))
             sep = "|"
             prev = report_item
-        return output
+
+        self._format_templates[split_lines] = template
+        return template
+
+    @staticmethod
+    def _format_array(report_item: HidField, values: List[Any], vendor: bool) -> str:
+        usages = []
+        for v in values:
+            if isinstance(v, str):  # special marker "<.>"
+                usages.append("")
+            elif v < report_item.logical_min or v > report_item.logical_max:
+                usages.append("")
+            else:
+                usage = f"{v:02x}"
+                index = v - report_item.logical_min  # guaranteed to be > 0 above
+                assert (
+                    report_item.usages is not None
+                )  # guaranteed to be set because of the parsing
+                if not vendor and index < len(report_item.usages):
+                    name = report_item.get_usage_name(index)
+                    if name is None or "no event indicated" in name.lower():
+                        name = ""
+                    usage = name
+                usages.append(f"'{usage}'")
+        return ", ".join(usages)
+
+    def format_report(
+        self: "HidReport", data: List[Any], split_lines: bool = True
+    ) -> str:
+        """
+        Format the HID Report provided as a list of 8-bit integers into a
+        human-readable format.
+
+        The labels and value formats of the fields are computed on the
+        first call and reused afterwards, they are recomputed if fields are
+        added to this report.
+
+        :param list data: a list of 8-bit integers that are this report
+        :param boolean split_lines: ``True`` if the format can be split
+            across multiple lines. This makes for easier reading but harder
+            automated processing.
+        """
+        template = self._format_templates.get(split_lines)
+        if template is None:
+            template = self._compile_format_template(split_lines)
+
+        output = []
+        if self.numbered:
+            assert self.report_ID == data[0]
+            output.append(f"ReportID: {self.report_ID} ")
+
+        decoded = self.decode(data)
+        for prefix, index, report_item, value_format, vendor in template:
+            output.append(prefix)
+            if report_item is None:
+                continue
+
+            values = decoded[index]
+            if value_format is not None:
+                value = values[0]
+                if not isinstance(value, str):
+                    value = format(value, value_format)
+                output.append(value)
+                output.append(" ")
+            else:
+                output.append(self._format_array(report_item, values, vendor))
+                output.append("] ")
+        return "".join(output)
+
+
+class DeltaDecoder(object):
+    """
+    Decodes a stream of reports of the same :class:`HidReport` and returns
+    only the fields whose values changed since the previous report. ::
+
+        decoder = DeltaDecoder(rdesc.input_reports[1])
+        for data in reports:
+            for field, old, new in decoder.decode(data):
+                print(field.usage_name, old, "->", new)
+
+    Each report is compared as a whole against the previous one and only
+    the fields whose bits differ are decoded. This is a lot cheaper than
+    :meth:`HidReport.decode` when few fields change from one report to the
+    next, e.g. sensors where only one or two axes move.
+
+    :param HidReport report: the report the decoded data belongs to
+
+    .. attribute:: report
+
+        The :class:`HidReport` this decoder was created for
+    """
+
+    def __init__(self: "DeltaDecoder", report: HidReport) -> None:
+        self.report = report
+        # (field, plan, mask of the field's bits in the report), fields
+        # without bits never change
+        self._fields: List[Tuple[HidField, _DecodePlan, int]] = [
+            (f, plan, ((1 << (f.size * f.count)) - 1) << f.start)
+            for f, plan in report.decode_plan
+            if f.size * f.count > 0
+        ]
+        self._starts = [f.start for f, _, _ in self._fields]
+        # all bits but the Report ID
+        self._mask = 0
+        for _, _, mask in self._fields:
+            self._mask |= mask
+        self.reset()
+
+    def reset(self: "DeltaDecoder") -> None:
+        """
+        Forget the previous report, the next call to :meth:`decode` returns
+        all fields.
+        """
+        self._previous: Optional[int] = None
+        self._length = 0
+        self._values: List[List[Any]] = [[] for _ in self._fields]
+
+    def decode(
+        self: "DeltaDecoder", report: Union[Bytes, List[U8]]
+    ) -> List[Tuple[HidField, Optional[List[Any]], List[Any]]]:
+        """
+        Decode the fields of ``report`` that changed since the previous
+        call. For the first report after creating this decoder or calling
+        :meth:`reset` all fields are returned, with ``None`` as the old
+        values.
+
+        :param report: the bytes of one HID report
+        :returns: a list of ``(field, old_values, new_values)`` tuples in
+            report order, the values are as returned by
+            :meth:`HidField.get_values`
+        """
+        bits = int.from_bytes(report, "little")
+        previous = self._previous
+        self._previous = bits
+        length = self._length
+        self._length = len(report)
+        changes: List[Tuple[HidField, Optional[List[Any]], List[Any]]] = []
+
+        if previous is None:
+            for index, (field, plan, _) in enumerate(self._fields):
+                values = _decode_values(plan, report, bits)
+                self._values[index] = values
+                changes.append((field, None, values))
+            return changes
+
+        # walk the changed bits from the lowest, decode the field they
+        # belong to and skip over the rest of that field. Values beyond
+        # the end of a short report change without their bits changing.
+        if length == len(report):
+            diff = (bits ^ previous) & self._mask
+        else:
+            diff = self._mask
+        while diff:
+            bit = (diff & -diff).bit_length() - 1
+            index = bisect.bisect_right(self._starts, bit) - 1
+            field, plan, mask = self._fields[index]
+            diff &= ~mask
+            values = _decode_values(plan, report, bits)
+            old = self._values[index]
+            if values != old:
+                self._values[index] = values
+                changes.append((field, old, values))
+        return changes
+
+
+def _usage_runs(usages: Sequence[U32]) -> List[Tuple[U32, U32]]:
+    """
+    Return the usages as a list of ``(first, last)`` runs of consecutive
+    usages, so a list of usages and the equivalent range compare equal.
+    """
+    if isinstance(usages, range) and usages.step == 1:
+        return [(usages.start, usages.stop - 1)] if usages else []
+    runs: List[Tuple[U32, U32]] = []
+    for usage in usages:
+        if runs and runs[-1][1] + 1 == usage:
+            runs[-1] = (runs[-1][0], usage)
+        else:
+            runs.append((usage, usage))
+    return runs
+
+
+_ItemHandler: TypeAlias = Callable[["ReportDescriptor", _HidRDescItem], None]
 
 
 class ReportDescriptor(object):
@@ -1876,12 +2727,12 @@ class ReportDescriptor(object):
             self.usage_max_size: U32 = 0
             self.report_ID: U8 = -1
 
-    def __init__(self: "ReportDescriptor", items: List[_HidRDescItem]) -> None:
+    def __init__(self: "ReportDescriptor", items: Iterable[_HidRDescItem]) -> None:
         self.input_reports: Dict[U8, HidReport] = {}
         self.feature_reports: Dict[U8, HidReport] = {}
         self.output_reports: Dict[U8, HidReport] = {}
         self.win8: bool = False
-        self.rdesc_items = items
+        self.rdesc_items: List[_HidRDescItem] = []
 
         # variables only used during parsing
         self.global_stack: List["ReportDescriptor._Globals"] = []
@@ -1890,12 +2741,24 @@ class ReportDescriptor(object):
         self.glob: "ReportDescriptor._Globals" = ReportDescriptor._Globals()
         self.current_item = None
 
+        # items may be a lazy iterator, tokenizing and parsing happen in the
+        # same pass over the descriptor
         index_in_report = 0
         for item in items:
             item.index_in_report = index_in_report
             index_in_report += item.size
+            self.rdesc_items.append(item)
             self._parse_item(item)
 
+        for r in itertools.chain(
+            self.input_reports.values(),
+            self.output_reports.values(),
+            self.feature_reports.values(),
+        ):
+            r._compile_decode_plan()
+
+        self._build_report_indexes()
+
         # Drop the parsing-only variables so we don't leak them later
         del self.current_item
         del self.glob
@@ -1903,19 +2766,55 @@ class ReportDescriptor(object):
         del self.local
         del self.collection
 
+    def compile(self: "ReportDescriptor") -> None:
+        """
+        Call :meth:`HidReport.compile` on all reports of this descriptor.
+        """
+        for r in itertools.chain(
+            self.input_reports.values(),
+            self.output_reports.values(),
+            self.feature_reports.values(),
+        ):
+            r.compile()
+
+    def _build_report_indexes(self: "ReportDescriptor") -> None:
+        """
+        Build the lookup tables used by :meth:`get` and
+        :meth:`get_report_from_application`: the input report for each of
+        the 256 Report IDs, falling back to the unnumbered report, and for
+        each report type the first report of each application, by usage
+        and by name.
+
+        The tables are built once after parsing, they are not updated if
+        the ``*_reports`` dicts are modified afterwards.
+        """
+        unnumbered = self.input_reports.get(-1)
+        self._input_reports_by_id: List[Optional[HidReport]] = [
+            self.input_reports.get(report_ID, unnumbered) for report_ID in range(256)
+        ]
+
+        self._reports_by_application: Dict[
+            HidReport.Type, Dict[Union[str, U32, None], HidReport]
+        ] = {}
+        for attr, report_type in self._report_types.values():
+            index: Dict[Union[str, U32, None], HidReport] = {}
+            for r in getattr(self, attr).values():
+                index.setdefault(r.application, r)
+                index.setdefault(r.application_name, r)
+            self._reports_by_application[report_type] = index
+
     def get(
         self: "ReportDescriptor", reportID: U8, reportSize: int
     ) -> Optional[HidReport]:
         """
         Return the input report with the given Report ID or ``None``
         """
-        try:
-            report = self.input_reports[reportID]
-        except KeyError:
-            try:
-                report = self.input_reports[-1]
-            except KeyError:
-                return None
+        if 0 <= reportID <= 0xFF:
+            report = self._input_reports_by_id[reportID]
+        else:
+            report = self.input_reports.get(reportID, self.input_reports.get(-1))
+        if report is None:
+            return None
 
         # if the report is larger than it should be, it's OK,
         # extra bytes will just be ignored
@@ -1925,37 +2824,36 @@ class ReportDescriptor(object):
         return None
 
     def get_report_from_application(
-        self: "ReportDescriptor", application: Union[str, U32]
+        self: "ReportDescriptor",
+        application: Union[str, U32],
+        type: HidReport.Type = HidReport.Type.INPUT,
     ) -> Optional[HidReport]:
         """
-        Return the Input report that matches the application or ``None``
+        Return the first report of the given type that matches the
+        application or ``None``
+
+        :param application: the application usage, e.g. ``0x00010005``,
+            or its name, e.g. ``"Game Pad"``
+        :param HidReport.Type type: the type of report to look up
         """
-        for r in self.input_reports.values():
-            if r.application == application or r.application_name == application:
-                return r
-        return None
+        return self._reports_by_application[type].get(application)
 
-    def _get_current_report(self: "ReportDescriptor", type: str) -> HidReport:
-        report_lists = {
-            "Input": self.input_reports,
-            "Output": self.output_reports,
-            "Feature": self.feature_reports,
-        }
-        report_type = {
-            "Input": HidReport.Type.INPUT,
-            "Output": HidReport.Type.OUTPUT,
-            "Feature": HidReport.Type.FEATURE,
-        }
+    _report_types: ClassVar[Dict[str, Tuple[str, HidReport.Type]]] = {
+        "Input": ("input_reports", HidReport.Type.INPUT),
+        "Output": ("output_reports", HidReport.Type.OUTPUT),
+        "Feature": ("feature_reports", HidReport.Type.FEATURE),
+    }
 
-        assert type in report_lists
+    def _get_current_report(self: "ReportDescriptor", type: str) -> HidReport:
+        assert type in self._report_types
 
+        attr, report_type = self._report_types[type]
+        reports: Dict[U8, HidReport] = getattr(self, attr)
         try:
-            cur = report_lists[type][self.local.report_ID]
+            cur = reports[self.local.report_ID]
         except KeyError:
-            cur = HidReport(
-                self.local.report_ID, self.glob.application, report_type[type]
-            )
-            report_lists[type][self.local.report_ID] = cur
+            cur = HidReport(self.local.report_ID, self.glob.application, report_type)
+            reports[self.local.report_ID] = cur
         return cur
 
     def _concatenate_usages(self: "ReportDescriptor") -> None:
@@ -1976,111 +2874,218 @@ class ReportDescriptor(object):
     def _parse_item(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
         # store current usage_page in rdesc_item
         rdesc_item.usage_page = self.glob.usage_page
+        handler = self.item_handlers.get(rdesc_item.hid)
+        if handler is not None:
+            handler(self, rdesc_item)
+
+    def _parse_report_id(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.local.report_ID = rdesc_item.value
+
+    def _parse_push(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.global_stack.append(self.glob)
+        self.glob = ReportDescriptor._Globals(self.glob)
+
+    def _parse_pop(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.glob = self.global_stack.pop()
+
+    def _parse_usage_page(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.glob.usage_page = rdesc_item.value << 16
+
+    def _parse_collection(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self._concatenate_usages()
+
+        c = HidCollection(rdesc_item.value)
+        try:
+            if c.type == HidCollection.Type.PHYSICAL:
+                self.collection[1] += 1
+                self.glob.physical = self.local.usages[-1]
+            elif c.type == HidCollection.Type.APPLICATION:
+                self.collection[0] += 1
+                self.glob.application = self.local.usages[-1]
+            elif c.type == HidCollection.Type.LOGICAL:
+                self.collection[2] += 1
+                self.glob.logical = self.local.usages[-1]
+        except IndexError:
+            pass
+        # reset the usage list
+        self.local.usages = []
+        self.local.usage_sizes = []
+        self.local.usage_min = 0
+        self.local.usage_max = 0
+        self.local.usage_max_size = 0
+
+    def _parse_usage_minimum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        if rdesc_item.size - 1 <= 2:
+            self.local.usage_min = rdesc_item.value | self.glob.usage_page
+        else:
+            self.local.usage_min = rdesc_item.value
+
+    def _parse_usage_maximum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        size = rdesc_item.size - 1
+        if size <= 2:
+            self.local.usage_max = rdesc_item.value | self.glob.usage_page
+        else:
+            self.local.usage_max = rdesc_item.value
+        self.local.usage_max_size = size
+
+    def _parse_logical_minimum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.logical_min = rdesc_item.value
+
+    def _parse_logical_maximum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.logical_max = rdesc_item.value
+
+    def _parse_physical_minimum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.physical_min = rdesc_item.value
+
+    def _parse_physical_maximum(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.physical_max = rdesc_item.value
+
+    def _parse_unit(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.glob.unit = rdesc_item.value
+
+    def _parse_unit_exponent(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.unit_exp = rdesc_item.value
+
+    def _parse_usage(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        size = rdesc_item.size - 1
+        if size <= 2:
+            self.local.usages.append(rdesc_item.value | self.glob.usage_page)
+        else:
+            self.local.usages.append(rdesc_item.value)
+        self.local.usage_sizes.append(size)
+
+    def _parse_report_count(
+        self: "ReportDescriptor", rdesc_item: _HidRDescItem
+    ) -> None:
+        self.glob.count = rdesc_item.value
+
+    def _parse_report_size(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
+        self.glob.item_size = rdesc_item.value
+
+    def _parse_main_item(self: "ReportDescriptor", rdesc_item: _HidRDescItem) -> None:
         item = rdesc_item.item
         value = rdesc_item.value
-        size = rdesc_item.size - 1
+        self.current_input_report = self._get_current_report(item)
 
-        if item == "Report ID":
-            self.local.report_ID = value
-        elif item == "Push":
-            self.global_stack.append(self.glob)
-            self.glob = ReportDescriptor._Globals(self.glob)
-        elif item == "Pop":
-            self.glob = self.global_stack.pop()
-        elif item == "Usage Page":
-            self.glob.usage_page = value << 16
-        elif item == "Collection":
-            self._concatenate_usages()
+        self._concatenate_usages()
 
-            c = HidCollection(value)
-            try:
-                if c.type == HidCollection.Type.PHYSICAL:
-                    self.collection[1] += 1
-                    self.glob.physical = self.local.usages[-1]
-                elif c.type == HidCollection.Type.APPLICATION:
-                    self.collection[0] += 1
-                    self.glob.application = self.local.usages[-1]
-                elif c.type == HidCollection.Type.LOGICAL:
-                    self.collection[2] += 1
-                    self.glob.logical = self.local.usages[-1]
-            except IndexError:
-                pass
-            # reset the usage list
-            self.local.usages = []
-            self.local.usage_sizes = []
-            self.local.usage_min = 0
-            self.local.usage_max = 0
-            self.local.usage_max_size = 0
-        elif item == "Usage Minimum":
-            if size <= 2:
-                self.local.usage_min = value | self.glob.usage_page
-            else:
-                self.local.usage_min = value
-        elif item == "Usage Maximum":
-            if size <= 2:
-                self.local.usage_max = value | self.glob.usage_page
-            else:
-                self.local.usage_max = value
-            self.local.usage_max_size = size
-        elif item == "Logical Minimum":
-            self.glob.logical_min = value
-        elif item == "Logical Maximum":
-            self.glob.logical_max = value
-        elif item == "Physical Minimum":
-            self.glob.physical_min = value
-        elif item == "Physical Maximum":
-            self.glob.physical_max = value
-        elif item == "Unit":
-            self.glob.unit = value
-        elif item == "Unit Exponent":
-            self.glob.unit_exp = value
-        elif item == "Usage":
-            if size <= 2:
-                self.local.usages.append(value | self.glob.usage_page)
-            else:
-                self.local.usages.append(value)
-            self.local.usage_sizes.append(size)
-        elif item == "Report Count":
-            self.glob.count = value
-        elif item == "Report Size":
-            self.glob.item_size = value
-        elif item in ("Input", "Feature", "Output"):
-            self.current_input_report = self._get_current_report(item)
-
-            self._concatenate_usages()
-
-            inputItems = HidField.getHidFields(
-                self.local.report_ID,
-                self.glob.logical,
-                self.glob.physical,
-                self.glob.application,
-                cast(Tuple[U32, U32, U32], tuple(self.collection)),
-                value,
-                self.glob.usage_page,
-                self.local.usages,
-                self.local.usage_min,
-                self.local.usage_max,
-                self.glob.logical_min,
-                self.glob.logical_max,
-                self.glob.physical_min,
-                self.glob.physical_max,
-                self.glob.unit,
-                self.glob.unit_exp,
-                self.glob.item_size,
-                self.glob.count,
-            )
-            self.current_input_report.extend(inputItems)
-            if (
-                item == "Feature"
-                and len(self.local.usages) > 0
-                and self.local.usages[-1] == 0xFF0000C5
-            ):
-                self.win8 = True
-            self.local.usages = []
-            self.local.usage_sizes = []
-            self.local.usage_min = 0
-            self.local.usage_max = 0
-            self.local.usage_max_size = 0
+        inputItems = HidField.getHidFields(
+            self.local.report_ID,
+            self.glob.logical,
+            self.glob.physical,
+            self.glob.application,
+            cast("Tuple[U32, U32, U32]", tuple(self.collection)),
+            value,
+            self.glob.usage_page,
+            self.local.usages,
+            self.local.usage_min,
+            self.local.usage_max,
+            self.glob.logical_min,
+            self.glob.logical_max,
+            self.glob.physical_min,
+            self.glob.physical_max,
+            self.glob.unit,
+            self.glob.unit_exp,
+            self.glob.item_size,
+            self.glob.count,
+        )
+        self.current_input_report.extend(inputItems)
+        if (
+            item == "Feature"
+            and len(self.local.usages) > 0
+            and self.local.usages[-1] == 0xFF0000C5
+        ):
+            self.win8 = True
+        self.local.usages = []
+        self.local.usage_sizes = []
+        self.local.usage_min = 0
+        self.local.usage_max = 0
+        self.local.usage_max_size = 0
+
+    item_handlers: ClassVar[Dict[U8, "_ItemHandler"]] = {
+        hid_items["Global"]["Report ID"]: _parse_report_id,
+        hid_items["Global"]["Push"]: _parse_push,
+        hid_items["Global"]["Pop"]: _parse_pop,
+        hid_items["Global"]["Usage Page"]: _parse_usage_page,
+        hid_items["Main"]["Collection"]: _parse_collection,
+        hid_items["Local"]["Usage Minimum"]: _parse_usage_minimum,
+        hid_items["Local"]["Usage Maximum"]: _parse_usage_maximum,
+        hid_items["Global"]["Logical Minimum"]: _parse_logical_minimum,
+        hid_items["Global"]["Logical Maximum"]: _parse_logical_maximum,
+        hid_items["Global"]["Physical Minimum"]: _parse_physical_minimum,
+        hid_items["Global"]["Physical Maximum"]: _parse_physical_maximum,
+        hid_items["Global"]["Unit"]: _parse_unit,
+        hid_items["Global"]["Unit Exponent"]: _parse_unit_exponent,
+        hid_items["Local"]["Usage"]: _parse_usage,
+        hid_items["Global"]["Report Count"]: _parse_report_count,
+        hid_items["Global"]["Report Size"]: _parse_report_size,
+        hid_items["Main"]["Input"]: _parse_main_item,
+        hid_items["Main"]["Output"]: _parse_main_item,
+        hid_items["Main"]["Feature"]: _parse_main_item,
+    }
+    """
+    The parser's dispatch table, mapping the numerical item tag (e.g.
+    ``0b00000100`` for Usage Page) to the function handling that item.
+    Each handler is called as ``handler(report_descriptor, item)`` with the
+    :class:`_HidRDescItem` to process. Items without a handler (e.g. End
+    Collection or Delimiter) are ignored.
+
+    To handle additional items, e.g. vendor-specific tags, use
+    :meth:`register_item_handler`.
+    """
+
+    item_names: ClassVar[Dict[U16, str]] = inv_hid
+    """
+    The item names by numerical item tag used while parsing, items with a
+    tag not in this table are rejected. :meth:`register_item_handler` adds
+    the names of vendor-specific items for this class and its subclasses.
+    """
+
+    @classmethod
+    def register_item_handler(
+        cls: _Type["ReportDescriptor"],
+        tag: U8,
+        handler: "_ItemHandler",
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        Register ``handler`` for the item with the numerical tag ``tag``,
+        replacing any existing handler for that tag. The registration
+        applies to this class and its subclasses only, i.e. registering a
+        handler on a subclass does not affect :class:`ReportDescriptor`.
+
+        :param int tag: the numerical item tag, without the size bits
+        :param handler: a callable invoked as ``handler(report_descriptor,
+            item)`` for every item with this tag
+        :param str name: the human-readable name for this item. Required
+            if ``tag`` is not a HID item defined in the HID specification,
+            items with unknown tags are otherwise rejected while parsing.
+        """
+        if tag & 0x3:
+            raise ValueError(f"Invalid item tag {tag:#04x}, size bits are set")
+        if tag not in cls.item_names:
+            if name is None:
+                raise ValueError(f"A name is required for unknown item tag {tag:#04x}")
+            if "item_names" not in cls.__dict__:
+                cls.item_names = dict(cls.item_names)
+            cls.item_names[tag] = name
+        if "item_handlers" not in cls.__dict__:
+            cls.item_handlers = dict(cls.item_handlers)
+        cls.item_handlers[tag] = handler
 
     def dump(
         self: "ReportDescriptor", dump_file=sys.stdout, output_type="default"
@@ -2132,21 +3137,76 @@ class ReportDescriptor(object):
             data.extend(item.bytes)
         return data
 
+    def fingerprint(self: "ReportDescriptor") -> str:
+        """
+        A hash of the layout of this report descriptor: the type and
+        Report ID of each report and the offset, size, count, flags,
+        usages and logical range of each field. Two descriptors with the
+        same fingerprint decode reports the same way even if their items
+        differ, e.g. a list of Usage items instead of Usage Minimum and
+        Maximum or redundant global items. For
+        constant fields only the offset, size, count and flags are
+        included.
+
+        The fingerprint is stable across runs and hid-tools versions
+        unless the hashed layout itself changes, use it as key for
+        :class:`FingerprintIndex`.
+
+        :returns: the fingerprint as a string of hexadecimal digits
+        """
+        layout: List[Any] = [_FINGERPRINT_VERSION]
+        for attr, report_type in self._report_types.values():
+            for report_ID, report in sorted(getattr(self, attr).items()):
+                fields: List[Tuple[Any, ...]] = []
+                for f in report.fields:
+                    if f.is_const:
+                        fields.append((f.start, f.size, f.count, f.type))
+                        continue
+                    if f.usages is not None and f.is_array:
+                        usages: Any = _usage_runs(f.usages)
+                    else:
+                        usages = f.usage
+                    fields.append(
+                        (
+                            f.start,
+                            f.size,
+                            f.count,
+                            f.type,
+                            usages,
+                            f.logical_min,
+                            f.logical_max,
+                        )
+                    )
+                layout.append((report_type.name, report_ID, report.application, fields))
+        return hashlib.sha256(repr(layout).encode("ascii")).hexdigest()
+
     @classmethod
     def from_bytes(
-        cls: _Type["ReportDescriptor"], rdesc: Union[Bytes, List[U8]]
+        cls: _Type["ReportDescriptor"],
+        rdesc: Union[Bytes, List[U8]],
+        cached: bool = False,
     ) -> "ReportDescriptor":
         """
         Parse the given list of 8-bit integers.
 
         :param list rdesc: a list of bytes that are this report descriptor
-        """
-        items = _HidRDescItem.from_bytes(rdesc)
+        :param bool cached: if ``True``, look up the descriptor in
+            :data:`rdesc_cache` first. The returned object may then be
+            shared with other callers and must not be modified.
+        """
+        if cached:
+            data = bytes(rdesc)
+            return rdesc_cache.lookup(
+                (cls, data),
+                lambda: cls(_HidRDescItem.iter_bytes(data, cls.item_names)),
+            )
 
-        return ReportDescriptor(items)
+        return cls(_HidRDescItem.iter_bytes(rdesc, cls.item_names))
 
     @classmethod
-    def from_string(cls: _Type["ReportDescriptor"], rdesc: str) -> "ReportDescriptor":
+    def from_string(
+        cls: _Type["ReportDescriptor"], rdesc: str, cached: bool = False
+    ) -> "ReportDescriptor":
         """
         Parse a string in the format of series of hex numbers::
 
@@ -2158,16 +3218,16 @@ class ReportDescriptor(object):
 
 
         :param list rdesc: a string that represents the list of bytes
+        :param bool cached: see :meth:`from_bytes`
         """
 
-        irdesc = [int(r, 16) for r in rdesc.split()[1:]]
-        items = _HidRDescItem.from_bytes(irdesc)
+        irdesc = bytes(int(r, 16) for r in rdesc.split()[1:])
 
-        return ReportDescriptor(items)
+        return cls.from_bytes(irdesc, cached=cached)
 
     @classmethod
     def from_human_descr(
-        cls: _Type["ReportDescriptor"], rdesc_str: str
+        cls: _Type["ReportDescriptor"], rdesc_str: str, cached: bool = False
     ) -> "ReportDescriptor":
         """
         Parse the given human-readable report descriptor, e.g. ::
@@ -2188,7 +3248,14 @@ class ReportDescriptor(object):
              Logical Maximum (255)
              Usage (Contact Id)
 
+        :param str rdesc_str: the human-readable report descriptor
+        :param bool cached: see :meth:`from_bytes`
         """
+        if cached:
+            return rdesc_cache.lookup(
+                (cls, rdesc_str), lambda: cls.from_human_descr(rdesc_str)
+            )
+
         usage_page = 0
         items = []
         for line in rdesc_str.splitlines():
@@ -2199,7 +3266,299 @@ class ReportDescriptor(object):
             usage_page = item.usage_page >> 16
             items.append(item)
 
-        return ReportDescriptor(items)
+        return cls(items)
+
+    @staticmethod
+    def _snapshot_fields(fields: List[HidField]) -> List[List[Any]]:
+        # Consecutive variable fields of one main item only differ in their
+        # usage and offset, store them as one entry with the usages as runs
+        # of [first usage, step, count]. The fields of one entry share their
+        # name caches like the parsed fields do.
+        entries: List[List[Any]] = []
+        prev: Optional[HidField] = None
+        prev_attrs: Optional[Tuple[Any, ...]] = None
+        for f in fields:
+            # resolve the names first, they are stored with the field and
+            # fields share their name caches
+            f.usage_name
+            f.usage_page_name
+            f.logical_name
+            f.physical_name
+        for f in fields:
+            attrs = (
+                f.report_ID,
+                f.logical,
+                f.physical,
+                f.application,
+                f.collection,
+                f.type,
+                f.usage_page,
+                f.logical_min,
+                f.logical_max,
+                f.physical_min,
+                f.physical_max,
+                f.unit,
+                f.unit_exp,
+                f.size,
+                f.count,
+            )
+            if (
+                prev is not None
+                and f.usages is None
+                and prev.usages is None
+                and f._names is prev._names
+                and f._usage_names is prev._usage_names
+                and f.start == prev.start + prev.size * prev.count
+                and attrs == prev_attrs
+            ):
+                runs = entries[-1][3]
+                run = runs[-1]
+                if run[2] == 1:
+                    run[1] = f.usage - run[0]
+                    run[2] = 2
+                elif f.usage == run[0] + run[1] * run[2]:
+                    run[2] += 1
+                else:
+                    runs.append([f.usage, 0, 1])
+            else:
+                usages: Union[None, List[U32], Dict[str, int]] = None
+                if isinstance(f.usages, range):
+                    usages = {"start": f.usages.start, "stop": f.usages.stop}
+                elif f.usages is not None:
+                    usages = list(f.usages)
+                entries.append(
+                    [
+                        attrs,
+                        usages,
+                        f.start,
+                        [[f.usage, 0, 1]],
+                        list(f._usage_names.items()),
+                        [[k, v, n] for (k, v), n in f._names.items()],
+                    ]
+                )
+            prev = f
+            prev_attrs = attrs
+        return entries
+
+    def _snapshot(self: "ReportDescriptor") -> Dict[str, Any]:
+        # The usage page of each item as runs of (count, usage page)
+        usage_pages: List[List[int]] = []
+        for item in self.rdesc_items:
+            if usage_pages and usage_pages[-1][1] == item.usage_page:
+                usage_pages[-1][0] += 1
+            else:
+                usage_pages.append([1, item.usage_page])
+
+        reports = []
+        for attr, report_type in self._report_types.values():
+            for key, r in getattr(self, attr).items():
+                reports.append(
+                    [
+                        report_type.name,
+                        key,
+                        r.report_ID,
+                        r.application,
+                        r.application_name,
+                        r._bitsize,
+                        r._compiled,
+                        self._snapshot_fields(r.fields),
+                    ]
+                )
+
+        return {
+            "rdesc": bytes(self.bytes).hex(),
+            "usage_pages": usage_pages,
+            "win8": self.win8,
+            "reports": reports,
+        }
+
+    @staticmethod
+    def _fields_from_snapshot(entries: List[List[Any]]) -> List[HidField]:
+        fields: List[HidField] = []
+        for attrs, usages, start, runs, usage_names, names in entries:
+            (
+                report_ID,
+                logical,
+                physical,
+                application,
+                collection,
+                value,
+                usage_page,
+                logical_min,
+                logical_max,
+                physical_min,
+                physical_max,
+                unit,
+                unit_exp,
+                size,
+                count,
+            ) = attrs
+            if collection is not None:
+                collection = tuple(collection)
+            if isinstance(usages, dict):
+                usages = range(usages["start"], usages["stop"])
+            shared_usage_names = dict(usage_names)
+            shared_names = {(k, v): n for k, v, n in names}
+
+            def field(usage: U32, start: int) -> HidField:
+                f = HidField(
+                    report_ID,
+                    logical,
+                    physical,
+                    application,
+                    collection,
+                    value,
+                    usage_page,
+                    usage,
+                    logical_min,
+                    logical_max,
+                    physical_min,
+                    physical_max,
+                    unit,
+                    unit_exp,
+                    size,
+                    count,
+                )
+                f.usages = usages
+                f.start = start
+                f._usage_names = shared_usage_names
+                f._names = shared_names
+                return f
+
+            values = [
+                usage
+                for first, step, n in runs
+                for usage in (
+                    range(first, first + step * n, step) if step else [first] * n
+                )
+            ]
+            bits = size * count
+            fields.extend(field(u, start + i * bits) for i, u in enumerate(values))
+        return fields
+
+    @classmethod
+    def _from_snapshot(
+        cls: _Type["ReportDescriptor"], snapshot: Dict[str, Any]
+    ) -> "ReportDescriptor":
+        rdesc = cls.__new__(cls)
+        rdesc.rdesc_items = list(
+            _HidRDescItem.iter_bytes(bytes.fromhex(snapshot["rdesc"]), cls.item_names)
+        )
+        items = iter(rdesc.rdesc_items)
+        for count, usage_page in snapshot["usage_pages"]:
+            for item in itertools.islice(items, count):
+                item.usage_page = usage_page
+        rdesc.win8 = bool(snapshot["win8"])
+        rdesc.input_reports = {}
+        rdesc.output_reports = {}
+        rdesc.feature_reports = {}
+
+        attrs = {report_type: attr for attr, report_type in cls._report_types.values()}
+        for report in snapshot["reports"]:
+            (
+                type_name,
+                key,
+                report_ID,
+                application,
+                name,
+                bitsize,
+                compiled,
+                fields,
+            ) = report
+            report_type = HidReport.Type[type_name]
+            r = HidReport(report_ID, application, report_type)
+            r._application_name = name
+            r._bitsize = bitsize
+            r._compiled = bool(compiled)
+            r.fields.extend(cls._fields_from_snapshot(fields))
+            r._compile_decode_plan()
+            getattr(rdesc, attrs[report_type])[key] = r
+
+        rdesc._build_report_indexes()
+        return rdesc
+
+    def save(
+        self: "ReportDescriptor", file: Union[str, "os.PathLike[str]", IO[Bytes]]
+    ) -> None:
+        """
+        Save this report descriptor as a snapshot that :meth:`load` restores
+        without parsing the descriptor again. The snapshot contains the
+        descriptor bytes, the reports and their fields with their offsets
+        and the names resolved from the HID Usage Tables. ::
+
+            rdesc = ReportDescriptor.from_bytes(data)
+            rdesc.save("mouse.rdesc-snapshot")
+
+            # later, possibly in another process
+            rdesc = ReportDescriptor.load("mouse.rdesc-snapshot")
+
+        The snapshot is zlib-compressed JSON behind a header with the
+        version of hid-tools that wrote it, :meth:`load` rejects snapshots
+        written by any other version. Keep the report descriptor bytes
+        around to recreate them.
+
+        :param file: a path or a file object opened in binary mode
+        """
+        version = _version.__version__.encode("ascii")
+        header = _snapshot_header.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, len(version))
+        payload = json.dumps(self._snapshot(), separators=(",", ":"))
+        data = header + version + zlib.compress(payload.encode("utf-8"), 9)
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "wb") as fd:
+                fd.write(data)
+        else:
+            file.write(data)
+
+    @staticmethod
+    def is_snapshot(data: Bytes) -> bool:
+        """
+        ``True`` if ``data`` starts with the header of a snapshot written by
+        :meth:`save`, this does not check the version of the snapshot.
+
+        :param data: the first bytes of a file
+        """
+        return data.startswith(_SNAPSHOT_MAGIC)
+
+    @classmethod
+    def load(
+        cls: _Type["ReportDescriptor"],
+        file: Union[str, "os.PathLike[str]", IO[Bytes]],
+    ) -> "ReportDescriptor":
+        """
+        Restore a report descriptor from a snapshot written by :meth:`save`.
+        The snapshot is plain data, loading it does not run any code from
+        the file. The decode plans and lookup tables are rebuilt on load.
+
+        :param file: a path or a file object opened in binary mode
+        :raises ValueError: if ``file`` is not a valid snapshot or the
+            snapshot was written by a different version of hid-tools
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "rb") as fd:
+                return cls.load(fd)
+
+        header = file.read(_snapshot_header.size)
+        if len(header) < _snapshot_header.size:
+            raise ValueError("Not a report descriptor snapshot")
+        magic, format_version, length = _snapshot_header.unpack(header)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("Not a report descriptor snapshot")
+        if format_version != _SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported report descriptor snapshot version {format_version}"
+            )
+        version = file.read(length).decode("ascii", errors="replace")
+        if version != _version.__version__:
+            raise ValueError(
+                f"Snapshot written by hid-tools {version}, "
+                f"this is hid-tools {_version.__version__}"
+            )
+
+        try:
+            snapshot = json.loads(zlib.decompress(file.read()))
+            return cls._from_snapshot(snapshot)
+        except (zlib.error, KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid report descriptor snapshot: {e}") from e
 
     def create_report(
         self: "ReportDescriptor",
@@ -2261,3 +3620,193 @@ class ReportDescriptor(object):
             return None
 
         return report.format_report(data, split_lines)
+
+
+class ReportDescriptorCache(object):
+    """
+    A bounded cache of parsed :class:`ReportDescriptor` objects, keyed by
+    the content of the report descriptor. Once the cache holds
+    :attr:`maxsize` entries, the least recently used one is evicted.
+
+    The process-wide instance is :data:`rdesc_cache`, it is used by
+    :meth:`ReportDescriptor.from_bytes` and friends when called with
+    ``cached=True``. The :class:`ReportDescriptor` objects handed out are
+    shared between all callers and must be treated as read-only. Decoding
+    and formatting reports keeps no per-stream state in the descriptor,
+    any number of devices can use the same instance at the same time;
+    state that depends on earlier reports lives in the caller, e.g. a
+    :class:`DeltaDecoder`.
+
+    .. attribute:: maxsize
+
+        The maximum number of entries in this cache
+
+    .. attribute:: hits
+
+        The number of lookups served from the cache
+
+    .. attribute:: misses
+
+        The number of lookups that required parsing the descriptor
+    """
+
+    def __init__(self: "ReportDescriptorCache", maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "collections.OrderedDict[Hashable, ReportDescriptor]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self: "ReportDescriptorCache") -> int:
+        return len(self._entries)
+
+    def lookup(
+        self: "ReportDescriptorCache",
+        key: Hashable,
+        parse: Callable[[], ReportDescriptor],
+    ) -> ReportDescriptor:
+        """
+        Return the :class:`ReportDescriptor` cached for ``key``, calling
+        ``parse()`` to create it if it is not in the cache yet.
+
+        :param key: the key for this descriptor, usually the parser class
+            and the descriptor's content
+        :param parse: a callable returning the :class:`ReportDescriptor`
+        """
+        try:
+            rdesc = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            rdesc = parse()
+            self._entries[key] = rdesc
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return rdesc
+
+    def clear(self: "ReportDescriptorCache") -> None:
+        """
+        Drop all entries and reset the :attr:`hits` and :attr:`misses`
+        counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+rdesc_cache = ReportDescriptorCache()
+"""
+The process-wide :class:`ReportDescriptorCache`
+"""
+
+
+class FingerprintIndex(object):
+    """
+    An index of :meth:`ReportDescriptor.fingerprint` values and the names
+    of the devices known to use each layout, for constant-time "have we
+    seen this layout" lookups over large collections of report
+    descriptors. ::
+
+        index = FingerprintIndex.known_devices()
+        if rdesc in index:
+            print(index.lookup(rdesc))
+
+        index = FingerprintIndex()
+        index.add(rdesc, "my mouse")
+        index.save("my-devices.json")
+
+    The index is stored as JSON, the names are free-form strings.
+    """
+
+    # Bump this whenever the layout of the JSON file changes
+    _VERSION: Final = 1
+
+    def __init__(self: "FingerprintIndex") -> None:
+        self._entries: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def _key(rdesc: Union[str, ReportDescriptor]) -> str:
+        if isinstance(rdesc, ReportDescriptor):
+            return rdesc.fingerprint()
+        return rdesc
+
+    def __len__(self: "FingerprintIndex") -> int:
+        return len(self._entries)
+
+    def __contains__(
+        self: "FingerprintIndex", rdesc: Union[str, ReportDescriptor]
+    ) -> bool:
+        return self._key(rdesc) in self._entries
+
+    def add(
+        self: "FingerprintIndex", rdesc: Union[str, ReportDescriptor], name: str
+    ) -> str:
+        """
+        Record that the device ``name`` uses the layout of ``rdesc``.
+
+        :param rdesc: a :class:`ReportDescriptor` or its fingerprint
+        :param str name: the name of the device or device class
+        :returns: the fingerprint of ``rdesc``
+        """
+        key = self._key(rdesc)
+        names = self._entries.setdefault(key, [])
+        if name not in names:
+            names.append(name)
+        return key
+
+    def lookup(
+        self: "FingerprintIndex", rdesc: Union[str, ReportDescriptor]
+    ) -> List[str]:
+        """
+        Return the names of the devices using the layout of ``rdesc``, in
+        the order they were added, or an empty list.
+
+        :param rdesc: a :class:`ReportDescriptor` or its fingerprint
+        """
+        return list(self._entries.get(self._key(rdesc), []))
+
+    def save(self: "FingerprintIndex", path: Union[str, "os.PathLike[str]"]) -> None:
+        """
+        Write this index to ``path`` in the format read by :meth:`load`.
+        """
+        data = {"version": self._VERSION, "fingerprints": self._entries}
+        tmp = f"{os.fspath(path)}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, path)
+
+    @classmethod
+    def known_devices(cls: _Type["FingerprintIndex"]) -> "FingerprintIndex":
+        """
+        Load the index of the device models shipped with hid-tools, it
+        is generated by ``python -m hidtools.cli.known_devices``.
+        """
+        return cls.load(KNOWN_DEVICES_INDEX)
+
+    @classmethod
+    def load(
+        cls: _Type["FingerprintIndex"], path: Union[str, "os.PathLike[str]"]
+    ) -> "FingerprintIndex":
+        """
+        Read an index written by :meth:`save`.
+
+        :raises ValueError: if ``path`` is not an index or was written in
+            an incompatible format
+        """
+        with open(path) as f:
+            data = json.load(f)
+        try:
+            version = data["version"]
+            entries = data["fingerprints"]
+        except (KeyError, TypeError):
+            raise ValueError(f"{path} is not a fingerprint index")
+        if version != cls._VERSION:
+            raise ValueError(f"Unsupported fingerprint index version {version}")
+
+        index = cls()
+        index._entries = {key: list(names) for key, names in entries.items()}
+        return index
@@ -18,12 +18,14 @@
 #
 
 import array
-import datetime
+import asyncio
+import collections.abc
 import fcntl
 import io
 import os
 import struct
 import sys
+import time
 from hidtools.hid import ReportDescriptor
 from hidtools.util import BusType
 
@@ -171,13 +173,209 @@ class HidrawEvent(object):
 
     .. attribute:: bytes
 
-        The data bytes read for this event
+        The data bytes read for this event, a :class:`bytes` object.
+        Indexing, iterating and :func:`len` work as before, but older
+        versions of hid-tools used a tuple of integers here: compare
+        ``list(event.bytes)`` rather than ``event.bytes`` with a list or
+        tuple.
+
+    Two events are equal if their timestamps and data are equal.
     """
 
+    __slots__ = ("sec", "usec", "bytes")
+
     def __init__(self, sec, usec, bytes):
         self.sec, self.usec = sec, usec
         self.bytes = bytes
 
+    def __eq__(self, other):
+        if not isinstance(other, HidrawEvent):
+            return NotImplemented
+        return (
+            self.sec == other.sec
+            and self.usec == other.usec
+            and bytes(self.bytes) == bytes(other.bytes)
+        )
+
+    def __repr__(self):
+        return f"HidrawEvent({self.sec}, {self.usec}, {bytes(self.bytes)!r})"
+
+
+class HidrawEventStore(collections.abc.MutableSequence):
+    """
+    A compact list of :class:`HidrawEvent`, used for
+    :attr:`HidrawDevice.events`. The timestamps are stored in one
+    :class:`array.array` and the data of all events in one
+    :class:`bytearray`, the :class:`HidrawEvent` objects are created on
+    access. ::
+
+        events = HidrawEventStore(capacity=1000)
+        events.append(HidrawEvent(0, 125, b"\\x01\\x02"))
+        print(len(events), events[-1].bytes)
+        for e in events[10:]:
+            print(e.sec, e.usec)
+
+    All :class:`list` operations are supported, slicing returns a list.
+    Appending and deleting events at either end is cheap, deleting events
+    from the front counts them as :attr:`evicted`. Any other change to
+    the events (assigning, inserting or deleting in the middle) rebuilds
+    the store.
+
+    :param int capacity: the maximum number of events kept or ``None`` for
+        no limit. Once the store is full, appending an event evicts the
+        oldest one.
+
+    .. attribute:: capacity
+
+        The maximum number of events kept or ``None``
+
+    .. attribute:: evicted
+
+        The number of events evicted so far. The index of an event in
+        this store plus :attr:`evicted` is the number of events appended
+        before it.
+    """
+
+    def __init__(self, capacity=None):
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"Invalid capacity {capacity}")
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all events, :attr:`evicted` is reset to 0.
+        """
+        self.evicted = 0
+        # microseconds since the time offset
+        self._times = array.array("q")
+        # start of each event's data in _data, plus _data_base
+        self._offsets = array.array("q")
+        self._data = bytearray()
+        # the number of bytes dropped from the front of _data
+        self._data_base = 0
+        # evicted events still in the arrays, dropped in batches
+        self._first = 0
+
+    def __len__(self):
+        return len(self._times) - self._first
+
+    def _append(self, time, data):
+        self._offsets.append(self._data_base + len(self._data))
+        self._times.append(time)
+        self._data.extend(data)
+        if self.capacity is not None and len(self) > self.capacity:
+            self._evict(1)
+
+    def _evict(self, count):
+        self._first += count
+        self.evicted += count
+        # compact once half of the arrays are evicted events, this
+        # keeps eviction O(1) amortized
+        if self._first >= len(self):
+            first = self._first
+            if first < len(self._offsets):
+                start = self._offsets[first] - self._data_base
+            else:
+                start = len(self._data)
+            del self._times[:first]
+            del self._offsets[:first]
+            del self._data[:start]
+            self._data_base += start
+            self._first = 0
+
+    def _truncate(self, length):
+        end = self._first + length
+        if end < len(self._offsets):
+            del self._data[self._offsets[end] - self._data_base :]
+            del self._times[end:]
+            del self._offsets[end:]
+
+    def _rebuild(self, events):
+        evicted = self.evicted
+        self.clear()
+        self.evicted = evicted
+        for e in events:
+            self.append(e)
+
+    def append(self, event):
+        """
+        Append a copy of the :class:`HidrawEvent` ``event``
+        """
+        self._append(event.sec * 1000000 + event.usec, event.bytes)
+
+    def insert(self, index, event):
+        """
+        Insert a copy of the :class:`HidrawEvent` ``event`` before
+        ``index``
+        """
+        if index >= len(self):
+            self.append(event)
+            return
+        events = list(self)
+        events.insert(index, event)
+        self._rebuild(events)
+
+    def reverse(self):
+        self._rebuild(self[::-1])
+
+    def _event(self, index):
+        base = self._data_base
+        start = self._offsets[index] - base
+        if index + 1 < len(self._offsets):
+            end = self._offsets[index + 1] - base
+        else:
+            end = len(self._data)
+        sec, usec = divmod(self._times[index], 1000000)
+        return HidrawEvent(sec, usec, bytes(self._data[start:end]))
+
+    def _indices(self, index):
+        if isinstance(index, slice):
+            return range(*index.indices(len(self)))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return range(index, index + 1)
+
+    def __getitem__(self, index):
+        indices = self._indices(index)
+        if isinstance(index, slice):
+            return [self._event(self._first + i) for i in indices]
+        return self._event(self._first + indices[0])
+
+    def __setitem__(self, index, value):
+        self._indices(index)
+        events = list(self)
+        events[index] = value
+        self._rebuild(events)
+
+    def __delitem__(self, index):
+        indices = self._indices(index)
+        if indices.step < 0:
+            indices = indices[::-1]
+        if not indices:
+            return
+        if indices.step == 1 and indices.start == 0:
+            self._evict(len(indices))
+        elif indices.step == 1 and indices.stop == len(self):
+            self._truncate(indices.start)
+        else:
+            events = list(self)
+            del events[index]
+            self._rebuild(events)
+
+    def __eq__(self, other):
+        if isinstance(other, (str, bytes)) or not isinstance(
+            other, collections.abc.Sequence
+        ):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __iter__(self):
+        for index in range(self._first, len(self._times)):
+            yield self._event(index)
+
 
 class HidrawDevice(object):
     """
@@ -191,6 +389,10 @@ class HidrawDevice(object):
                 print(f'We received {len(dev.events)} events so far')
 
     :param File device: a file-like object pointing to ``/dev/hidrawX``
+    :param int max_events: the maximum number of events kept in
+        :attr:`events`, the oldest events are evicted first. ``None``
+        keeps all events.
+    :param int flush_interval: see :attr:`flush_interval`
 
     .. attribute:: name
 
@@ -214,7 +416,7 @@ class HidrawDevice(object):
 
     .. attribute:: events
 
-        All events accumulated so far, a list of :class:`HidrawEvent`
+        All events accumulated so far, a :class:`HidrawEventStore`
 
     .. attribute:: time_offset
 
@@ -223,9 +425,27 @@ class HidrawDevice(object):
         This offset can be used to synchronize events from multiple devices,
         simply apply the offset of the first device to receive an event to
         all other devices to get synchronized time stamps for all devices.
+        The offset is an integer :func:`time.monotonic_ns` timestamp, older
+        versions of hid-tools used a :class:`datetime.datetime` of the wall
+        clock. Only copy it from another :class:`HidrawDevice` or set it
+        from :func:`time.monotonic_ns`, a :class:`datetime.datetime` is
+        rejected with a :class:`TypeError` by :meth:`read_events`.
+
+    .. attribute:: flush_interval
+
+        How often :meth:`dump` flushes its output file: ``0`` flushes
+        after every call, a positive value flushes when at least that
+        many milliseconds passed since the last flush and ``None`` never
+        flushes, leaving it to the file (e.g. when it is closed on exit).
+        Output that is not flushed by :meth:`dump` is due after
+        :meth:`flush_timeout` milliseconds.
     """
 
-    def __init__(self, device):
+    # hidraw returns one report per read(), HID reports are at most 4096
+    # bytes long
+    _read_size: Final = 4096
+
+    def __init__(self, device, max_events=None, flush_interval=0):
         fd = device.fileno()
         self.device = device
         self.name = _HIDIOCGRAWNAME(fd)
@@ -237,12 +457,23 @@ class HidrawDevice(object):
         rsize, desc = _HIDIOCGRDESC(fd, size)
         assert rsize == size
         assert len(desc) == rsize
-        self.report_descriptor = ReportDescriptor.from_bytes([x for x in desc])
+        self.report_descriptor = ReportDescriptor.from_bytes(
+            desc.tobytes(), cached=True
+        )
+        self._init_state(max_events, flush_interval)
 
-        self.events = []
+    def _init_state(self, max_events=None, flush_interval=0):
+        # Everything but the device information, subclasses that do not
+        # read from a hidraw node (e.g. hid-decode's) call this instead of
+        # __init__
+        self.events = HidrawEventStore(max_events)
+        self._read_buffer = bytearray(self._read_size)
 
         self._dump_offset = -1
         self.time_offset = None
+        self.flush_interval = flush_interval
+        self._flushed_at = 0
+        self._flush_pending = False
 
     def __repr__(self):
         return f"{self.name} bus: {self.bustype:02x} vendor: {self.vendor_id:04x} product: {self.product_id:04x}"
@@ -251,66 +482,66 @@ class HidrawDevice(object):
         """
         Read events from the device and append them to :attr:`events`.
 
-        This function simply calls :func:`os.read`, it is the caller's task to
-        either make sure the device is set nonblocking or to handle any
+        This function simply calls :func:`os.readv`, it is the caller's task
+        to either make sure the device is set nonblocking or to handle any
         :class:`KeyboardInterrupt` if this call does end up blocking.
 
         :returns: a tuple of ``(index, count)`` of the :attr:`events` added.
         """
 
-        index = max(0, len(self.events) - 1)
+        events = self.events
+        index = max(0, len(events) - 1)
+        evicted = events.evicted
+        if self.time_offset is not None and not isinstance(self.time_offset, int):
+            raise TypeError(
+                f"time_offset must be a time.monotonic_ns() timestamp, "
+                f"not {type(self.time_offset).__name__}"
+            )
 
-        loop = True
-        while loop:
-            data = os.read(self.device.fileno(), 4096)
-            if not data:
+        # read into the same buffer every time, only the bytes of each
+        # report are copied out of it
+        fd = self.device.fileno()
+        buffers = [self._read_buffer]
+        view = memoryview(self._read_buffer)
+        while True:
+            size = os.readv(fd, buffers)
+            if not size:
                 break
-            if len(data) < 4096:
-                loop = False
 
-            now = datetime.datetime.now()
+            now = time.monotonic_ns()
             if self.time_offset is None:
                 self.time_offset = now
-            tdelta = now - self.time_offset
-            bytes = struct.unpack("B" * len(data), data)
-
-            self.events.append(HidrawEvent(tdelta.seconds, tdelta.microseconds, bytes))
+            events._append((now - self.time_offset) // 1000, view[:size])
+            if size < self._read_size:
+                break
 
-        count = len(self.events) - index
+        # the events evicted while reading shift the index
+        index = max(0, index - (events.evicted - evicted))
+        count = len(events) - index
 
         return index, count
 
-    def _dump_event(self, event, file, classic=True):
+    def _format_event(self, event, classic=True):
+        lines = []
         report_id = event.bytes[0]
 
         rdesc = self.report_descriptor.get(report_id, len(event.bytes))
-        if rdesc is not None:
+        if rdesc is not None and classic:
             indent_2nd_line = 2
             output = rdesc.format_report(event.bytes)
-            try:
-                first_row = output.split("\n")[0]
-            except IndexError:
-                pass
-            else:
-                # we have a multi-line output, find where the fields are split
-                try:
-                    slash = first_row.index("/")
-                except ValueError:
-                    pass
-                else:
-                    # the `+1` below is to make a better visual effect
-                    indent_2nd_line = slash + 1
+            first_row = output.partition("\n")[0]
+            # we have a multi-line output, find where the fields are split
+            slash = first_row.find("/")
+            if slash >= 0:
+                # the `+1` below is to make a better visual effect
+                indent_2nd_line = slash + 1
             indent = f'\n#{" " * indent_2nd_line}'
-            output = indent.join(output.split("\n"))
-            if classic:
-                print(f"# {output}", file=file)
-
-        data = map(lambda x: f"{x:02x}", event.bytes)
-        print(
-            f'E: {event.sec:06d}.{event.usec:06d} {len(event.bytes)} {" ".join(data)}',
-            file=file,
-            flush=True,
-        )
+            output = output.replace("\n", indent)
+            lines.append(f"# {output}\n")
+
+        data = bytes(event.bytes).hex(" ")
+        lines.append(f"E: {event.sec:06d}.{event.usec:06d} {len(event.bytes)} {data}\n")
+        return "".join(lines)
 
     def dump(self, file=sys.stdout, from_the_beginning=False, classic=True):
         """
@@ -325,38 +556,70 @@ class HidrawDevice(object):
 
         This method is designed to be called repeatedly and only print the
         new events on each call. To repeat the dump from the beginning, set
-        ``from_the_beginning`` to True.
+        ``from_the_beginning`` to True, this starts at the oldest event still
+        in :attr:`events`.
+
+        All new events are formatted first and written to ``file`` with a
+        single call, ``file`` is then flushed according to
+        :attr:`flush_interval`.
 
         :param File file: the output file to write to
         :param bool from_the_beginning: if True, print everything again
              instead of continuing where we left off
         """
 
+        lines = []
         if from_the_beginning:
             self._dump_offset = -1
 
         if self._dump_offset == -1:
-            print(f"# {self.name}", file=file)
+            lines.append(f"# {self.name}\n")
             output = io.StringIO()
             self.report_descriptor.dump(output)
             for line in output.getvalue().split("\n"):
-                print(f"# {line}", file=file)
+                lines.append(f"# {line}\n")
             output.close()
 
             rd = " ".join([f"{b:02x}" for b in self.report_descriptor.bytes])
             sz = len(self.report_descriptor.bytes)
-            print(f"R: {sz} {rd}", file=file)
-            print(f"N: {self.name}", file=file)
-            print(
-                f"I: {self.bustype:x} {self.vendor_id:04x} {self.product_id:04x}",
-                file=file,
-                flush=True,
+            lines.append(f"R: {sz} {rd}\n")
+            lines.append(f"N: {self.name}\n")
+            lines.append(
+                f"I: {self.bustype:x} {self.vendor_id:04x} {self.product_id:04x}\n"
             )
             self._dump_offset = 0
 
-        for e in self.events[self._dump_offset :]:
-            self._dump_event(e, file, classic)
-        self._dump_offset = len(self.events)
+        # _dump_offset counts the evicted events too
+        evicted = self.events.evicted
+        for e in self.events[max(0, self._dump_offset - evicted) :]:
+            lines.append(self._format_event(e, classic))
+        self._dump_offset = evicted + len(self.events)
+
+        if lines:
+            file.write("".join(lines))
+            self._flush_pending = True
+        if self.flush_interval is not None:
+            now = time.monotonic_ns() // 1000000
+            if now - self._flushed_at >= self.flush_interval:
+                file.flush()
+                self._flushed_at = now
+                self._flush_pending = False
+
+    def flush_timeout(self):
+        """
+        The number of milliseconds until the output written by :meth:`dump`
+        is due to be flushed, or ``None`` if there is no such output. Once
+        the timeout expired, the next call to :meth:`dump` flushes, e.g. ::
+
+            while True:
+                if poll.poll(dev.flush_timeout()):
+                    dev.read_events()
+                dev.dump(sys.stdout)
+        """
+        if not self._flush_pending or self.flush_interval is None:
+            return None
+        now = time.monotonic_ns() // 1000000
+        return max(self._flushed_at + self.flush_interval - now, 0)
 
     def get_feature_report(self, report_ID):
         """
@@ -385,3 +648,90 @@ class HidrawDevice(object):
         sz = _HIDIOCSFEATURE(fd, data)
         if sz != len(data):
             raise OSError("Failed to write data: {data} - bytes written: {sz}")
+
+
+class AsyncHidrawDevice(HidrawDevice):
+    """
+    A :class:`HidrawDevice` for use with :mod:`asyncio`. Iterating over it
+    asynchronously yields each :class:`HidrawEvent` as it arrives, the
+    events are also appended to :attr:`events` as usual. ::
+
+        async def monitor(path):
+            with open(path, 'r+b') as fd:
+                dev = AsyncHidrawDevice(fd)
+                async for event in dev:
+                    print(dev.report_descriptor.format_report(event.bytes))
+
+    The device is set nonblocking and watched with
+    :meth:`asyncio.loop.add_reader` while an iteration is in progress, only
+    one iteration may run at a time. Outside of an iteration the blocking
+    API of :class:`HidrawDevice` works as usual. If
+    :attr:`events` has a capacity and the iteration falls behind by more
+    than that, the evicted events are skipped.
+
+    The iteration ends when the device is closed on the other end, an
+    :class:`OSError` (e.g. when the device is unplugged) is raised by the
+    iteration.
+
+    :meth:`aget_feature_report` and :meth:`aset_feature_report` are
+    coroutines that run the ioctls in the loop's default executor.
+    """
+
+    def __aiter__(self):
+        return self.aiter_events()
+
+    async def aiter_events(self):
+        """
+        Yield each :class:`HidrawEvent` read from the device, starting with
+        the next event to arrive. This is what ``async for`` uses.
+        """
+        loop = asyncio.get_running_loop()
+        fd = self.device.fileno()
+        events = self.events
+        # the number of events appended so far, including the evicted ones
+        position = events.evicted + len(events)
+        blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        readable = asyncio.Event()
+        loop.add_reader(fd, readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                # hidraw returns one report per read, so read until the
+                # device is drained
+                eof = False
+                while not eof:
+                    total = events.evicted + len(events)
+                    try:
+                        self.read_events()
+                    except BlockingIOError:
+                        break
+                    eof = events.evicted + len(events) == total
+
+                for e in events[max(0, position - events.evicted) :]:
+                    yield e
+                position = events.evicted + len(events)
+                if eof:
+                    return
+        finally:
+            loop.remove_reader(fd)
+            os.set_blocking(fd, blocking)
+
+    async def aget_feature_report(self, report_ID):
+        """
+        Fetch the Feature Report with the given report ID without blocking
+        the event loop, see :meth:`HidrawDevice.get_feature_report`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_feature_report, report_ID)
+
+    async def aset_feature_report(self, report_ID, data):
+        """
+        Set the Feature Report with the given report ID without blocking
+        the event loop, see :meth:`HidrawDevice.set_feature_report`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.set_feature_report, report_ID, data
+        )
@@ -18,20 +18,25 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import hashlib
 import os
+import pickle
 from re import Match
-import parse
 import functools
 
 from collections import abc
 from typing import (
     Annotated,
     Any,
+    Callable,
     Dict,
+    Final,
     Hashable,
     Iterator,
+    List,
     NamedTuple,
     Optional,
+    Tuple,
     Type,
     Union,
     cast,
@@ -45,6 +50,10 @@ except ImportError:
 DATA_DIRNAME = "data"
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, DATA_DIRNAME)
+HUT_CACHE = os.path.join(DATA_DIR, "hut.pickle")
+
+# Bump this whenever the layout of the pickled data changes
+_HUT_CACHE_VERSION: Final = 2
 
 
 class ValueRange(NamedTuple):
@@ -92,6 +101,8 @@ class HidUsage(Hashable):
 
     """
 
+    __slots__ = ("usage_page", "usage", "name")
+
     def __init__(
         self: "HidUsage", usage_page: "HidUsagePage", usage: U16, name: str
     ) -> None:
@@ -163,9 +174,41 @@ class HidUsagePage(object):
         The assigned name for this usage Page, e.g. "Generic Desktop"
     """
 
+    # only set on lazy pages that have not been loaded yet, see _lazy()
+    _loader: Callable[["HidUsagePage"], None]
+
     def __init__(self: "HidUsagePage") -> None:
         self._usages: Dict[U16, HidUsage] = {}
 
+    @classmethod
+    def _lazy(
+        cls: Type["HidUsagePage"],
+        page_id: U16,
+        page_name: str,
+        loader: Callable[["HidUsagePage"], None],
+    ) -> "HidUsagePage":
+        """
+        Create a Usage Page that only knows its ID and name. The usages are
+        filled in by ``loader(page)`` when the page's contents are first
+        accessed.
+        """
+        usage_page = cls.__new__(cls)
+        usage_page.page_id = page_id
+        usage_page.page_name = page_name
+        usage_page._loader = loader
+        return usage_page
+
+    def __getattr__(self: "HidUsagePage", attr: str) -> Any:
+        # A lazy page has no _usages until it is first accessed, so loaded
+        # pages don't pay for the check on every lookup
+        if attr == "_usages":
+            loader = self.__dict__.pop("_loader", None)
+            if loader is not None:
+                self._usages = {}
+                loader(self)
+                return self._usages
+        raise AttributeError(attr)
+
     def __setitem__(self: "HidUsagePage", key: U16, value: HidUsage) -> None:
         self._usages[key] = value
 
@@ -274,13 +317,21 @@ class HidUsageTable(object):
 
     def __init__(self: "HidUsageTable") -> None:
         self._pages: Dict[U16, HidUsagePage] = {}
+        self._page_names: Dict[str, HidUsagePage] = {}
+        # {(usage page, usage name): 32-bit usage}, filled on demand by
+        # usage_from_name() so that pages are not loaded before they are
+        # needed
+        self._usage_index: Dict[Tuple[Union[str, U16], str], U32] = {}
 
     def __setitem__(self: "HidUsageTable", key: U16, value: HidUsagePage) -> None:
+        if key in self._pages:
+            del self[key]
         self._pages[key] = value
+        self._page_names[value.page_name] = value
 
     def __getitem__(self: "HidUsageTable", key: Union[str, U16]) -> HidUsagePage:
         if isinstance(key, str):
-            return self.usage_page_names[key]
+            return self._page_names[key]
 
         # shift the usage page bits down if we have a 32-bit usage
         if key & 0xFFFF0000 == key:
@@ -288,7 +339,13 @@ class HidUsageTable(object):
         return self._pages[key]
 
     def __delitem__(self: "HidUsageTable", key) -> None:
-        del self._pages[key]
+        page = self._pages.pop(key)
+        if self._page_names.get(page.page_name) is page:
+            del self._page_names[page.page_name]
+        self._usage_index.clear()
+
+    def __contains__(self: "HidUsageTable", key: object) -> bool:
+        return key in self._pages
 
     def __iter__(self: "HidUsageTable") -> Iterator[HidUsagePage]:
         return iter(self._pages)
@@ -324,7 +381,32 @@ class HidUsageTable(object):
             HUT.usage_page_names['Generic Desktop']
 
         """
-        return {v.page_name: v for _, v in self.items()}
+        return self._page_names
+
+    def usage_from_name(
+        self: "HidUsageTable", usage_page: Union[str, U16], usage_name: str
+    ) -> U32:
+        """
+        Look up the 32-bit usage (Usage Page in the high 16 bits) for the
+        given usage name in the given usage page. ::
+
+            > print(hex(hut.usage_from_name(0x01, 'Y')))
+            0x10031
+            > print(hex(hut.usage_from_name('Generic Desktop', 'Y')))
+            0x10031
+
+        :param usage_page: the numerical page ID or the page name
+        :param str usage_name: the name of the usage, e.g. "X"
+        :raises KeyError: if the page or the usage is unknown
+        """
+        key = (usage_page, usage_name)
+        try:
+            return self._usage_index[key]
+        except KeyError:
+            page = self[usage_page]
+            usage = page.from_name[usage_name].usage
+            self._usage_index[key] = page.page_id << 16 | usage
+            return self._usage_index[key]
 
     def usage_page_from_name(
         self: "HidUsageTable", page_name: str
@@ -363,7 +445,11 @@ class HidUsageTable(object):
             return None
 
     @classmethod
-    def _parse_usages(cls: Type["HidUsageTable"], f: abc.Iterable[str]) -> HidUsagePage:
+    def _parse_usages(
+        cls: Type["HidUsageTable"],
+        f: abc.Iterable[str],
+        usage_page: Optional[HidUsagePage] = None,
+    ) -> HidUsagePage:
         """
         Parse a single HUT file. The file format is a set of lines in three
         formats: ::
@@ -379,8 +465,14 @@ class HidUsageTable(object):
         Usages are parsed into a dictionary[number] = name.
 
         The return value is a single HidUsagePage where page[idx] = idx-name.
+        If ``usage_page`` is given, the usages are added to that page
+        instead of a new one.
         """
-        usage_page = None
+        # parse is slow to import and only needed when the precompiled
+        # cache is unavailable
+        import parse
+
+        header_seen = False
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
@@ -390,16 +482,20 @@ class HidUsageTable(object):
 
             # Usage Page, e.g. '(01)	Generic Desktop'
             if line.startswith("("):
-                assert usage_page is None
+                assert not header_seen
+                header_seen = True
 
                 r = parse.parse("({idx:x})\t{page_name}", line)  # type: ignore
                 assert r is not None
-                usage_page = HidUsagePage()
-                usage_page.page_id = r["idx"]  # type: ignore
-                usage_page.page_name = r["page_name"]
+                if usage_page is None:
+                    usage_page = HidUsagePage()
+                    usage_page.page_id = r["idx"]  # type: ignore
+                    usage_page.page_name = r["page_name"]
+                else:
+                    assert usage_page.page_id == r["idx"]  # type: ignore
                 continue
 
-            assert usage_page is not None
+            assert header_seen and usage_page is not None
 
             # Reserved ranges, e.g  '0B-1F	Reserved'
             r = parse.parse("{:x}-{:x}\t{name}", line)  # type: ignore
@@ -422,17 +518,147 @@ class HidUsageTable(object):
 
             usage_page[u] = usage
 
-        if usage_page is None:
+        if usage_page is None or not header_seen:
             raise Exception
 
         return usage_page
 
+    @classmethod
+    def _read_page_header(cls: Type["HidUsageTable"], path: str) -> Tuple[U16, str]:
+        """
+        Return the Usage Page ID and name from the ``(01)<tab>Usage Page
+        name`` line of the HUT file at ``path`` without parsing the usages.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("("):
+                    idx, page_name = line.split("\t", 1)
+                    return int(idx[1:-1], 16), page_name
+        raise ValueError(f"No Usage Page in {path}")
+
+    @classmethod
+    def _load_hut_file(
+        cls: Type["HidUsageTable"], path: str, usage_page: HidUsagePage
+    ) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                cls._parse_usages(f, usage_page)
+            except:
+                print(os.path.basename(path))
+                raise
+
+    @classmethod
+    def _load_cached_usages(
+        cls: Type["HidUsageTable"], data: bytes, usage_page: HidUsagePage
+    ) -> None:
+        for u, name in pickle.loads(data):
+            usage_page[u] = HidUsage(usage_page, u, name)
+
+    @classmethod
+    def _hut_files(cls: Type["HidUsageTable"]) -> List[str]:
+        """
+        The sorted list of filenames of all ``.hut`` files in the data
+        directory.
+        """
+        return sorted(f for f in os.listdir(DATA_DIR) if f.endswith(".hut"))
+
+    @classmethod
+    def _hut_digest(cls: Type["HidUsageTable"]) -> str:
+        """
+        A digest over the names and contents of all ``.hut`` files, used to
+        detect a precompiled cache that no longer matches the data files.
+        """
+        h = hashlib.sha256()
+        for filename in cls._hut_files():
+            h.update(filename.encode("utf-8") + b"\0")
+            with open(os.path.join(DATA_DIR, filename), "rb") as f:
+                h.update(f.read())
+        return h.hexdigest()
+
+    @classmethod
+    def _from_hut_files(cls: Type["HidUsageTable"]) -> "HidUsageTable":
+        """
+        Load the HID Usage Tables from the ``.hut`` files in the data
+        directory. Only the Usage Page headers are read here, each file is
+        parsed when its Usage Page is first accessed.
+
+        :return: a :class:`hidtools.HidUsageTable` object
+        """
+        hut = HidUsageTable()
+        for filename in cls._hut_files():
+            path = os.path.join(DATA_DIR, filename)
+            page_id, page_name = cls._read_page_header(path)
+            loader = functools.partial(cls._load_hut_file, path)
+            hut[page_id] = HidUsagePage._lazy(page_id, page_name, loader)
+
+        return hut
+
+    @classmethod
+    def _from_cache(
+        cls: Type["HidUsageTable"], path: str = HUT_CACHE
+    ) -> Optional["HidUsageTable"]:
+        """
+        Load the HID Usage Tables from the precompiled cache at ``path``, as
+        written by :meth:`_write_cache`. The usages of each page are
+        stored separately and unpickled when the page is first accessed.
+
+        :return: a :class:`hidtools.HidUsageTable` object or ``None`` if the
+            cache is missing, unreadable or does not match the ``.hut``
+            files.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data["version"] != _HUT_CACHE_VERSION:
+                return None
+            if data["digest"] != cls._hut_digest():
+                return None
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError):
+            return None
+
+        hut = HidUsageTable()
+        for page_id, page_name, usages in data["pages"]:
+            loader = functools.partial(cls._load_cached_usages, usages)
+            hut[page_id] = HidUsagePage._lazy(page_id, page_name, loader)
+
+        return hut
+
+    def _write_cache(self: "HidUsageTable", path: str = HUT_CACHE) -> None:
+        """
+        Write this table to ``path`` in the format read by
+        :meth:`_from_cache`. This is called at build time, see
+        ``hatch_build.py``.
+        """
+        data = {
+            "version": _HUT_CACHE_VERSION,
+            "digest": self._hut_digest(),
+            "pages": [
+                (
+                    page.page_id,
+                    page.page_name,
+                    pickle.dumps(
+                        [(u, usage.name) for u, usage in page.items()], protocol=4
+                    ),
+                )
+                for page in self._pages.values()
+            ],
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=4)
+        os.replace(tmp, path)
+
     @classmethod
     def _from_hut_data(cls: Type["HidUsageTable"]) -> "HidUsageTable":
         """
         Return the HID Usage Tables, the keys are the numeric Usage Page and
         the values are the respective :class:`hidtools.HidUsagePage` object.
 
+        The tables are loaded from the precompiled cache generated at build
+        time where it is up to date, otherwise the ``.hut`` files are
+        parsed.
+
         ::
 
             > usages = hidtools.hut.HUT()
@@ -445,17 +671,9 @@ class HidUsageTable(object):
 
         :return: a :class:`hidtools.HidUsageTable` object
         """
-        hut = HidUsageTable()
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith(".hut"):
-                with open(os.path.join(DATA_DIR, filename), "r", encoding="utf-8") as f:
-                    try:
-                        usage_page = cls._parse_usages(f)
-                        hut[usage_page.page_id] = usage_page
-                    except:
-                        print(filename)
-                        raise
-
+        hut = cls._from_cache()
+        if hut is None:
+            hut = cls._from_hut_files()
         return hut
 
 
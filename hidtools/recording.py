@@ -0,0 +1,428 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import io
+import struct
+import time
+
+from typing import Final
+
+
+# The binary recording format, all integers are little endian:
+#
+#   header: magic, version, number of devices
+#   device: index, bustype, vendor, product, length of the name, length of
+#           the physical path, length of the report descriptor, followed by
+#           the name and physical path (UTF-8) and the report descriptor
+#   event:  timestamp in ns, device index, length, followed by the data
+#
+# hid-recorder only has microsecond timestamps (HidrawEvent.sec/usec), so
+# the timestamps it writes are multiples of 1000. The field is in ns so
+# other writers can store a more precise timestamp.
+_BINARY_MAGIC: Final = b"HIDRECBN"
+_BINARY_VERSION: Final = 1
+_binary_header = struct.Struct("<8sHH")
+_binary_device = struct.Struct("<HIHHHHH")
+_binary_event = struct.Struct("<QHH")
+
+
+def is_binary_recording(data):
+    """
+    :param bytes data: the first bytes of a file
+    :returns: True if ``data`` is the start of a binary recording
+    """
+    return bytes(data[: len(_BINARY_MAGIC)]) == _BINARY_MAGIC
+
+
+def open_recording(file):
+    """
+    Return a :class:`BinaryRecordingReader` or :class:`TextRecordingReader`
+    for the recording in ``file``, depending on its format.
+
+    :param File file: a recording opened in binary mode, it must support
+        ``peek()``, e.g. a file opened with ``open(path, "rb")``
+    """
+    if is_binary_recording(file.peek(len(_BINARY_MAGIC))):
+        return BinaryRecordingReader(file)
+    return TextRecordingReader(io.TextIOWrapper(file))
+
+
+class RecordedDevice(object):
+    """
+    A device in a recording, i.e. the ``R:``, ``N:``, ``I:`` and ``P:``
+    lines of the text format following a ``D:`` line.
+
+    .. attribute:: index
+
+        The device index, as used by the events
+
+    .. attribute:: name
+
+        The device name
+
+    .. attribute:: bustype
+
+        The numerical bus type
+
+    .. attribute:: vendor_id
+
+        16-bit numerical vendor ID
+
+    .. attribute:: product_id
+
+        16-bit numerical product ID
+
+    .. attribute:: phys
+
+        The physical path or an empty string
+
+    .. attribute:: rdesc
+
+        The report descriptor as :class:`bytes`
+    """
+
+    def __init__(
+        self, index, name="", bustype=0, vendor_id=0, product_id=0, phys="", rdesc=b""
+    ):
+        self.index = index
+        self.name = name
+        self.bustype = bustype
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.phys = phys
+        self.rdesc = rdesc
+
+    @classmethod
+    def from_hidraw(cls, index, device):
+        """
+        Create a :class:`RecordedDevice` for the
+        :class:`hidtools.hidraw.HidrawDevice` ``device``.
+        """
+        return cls(
+            index,
+            device.name,
+            device.bustype,
+            device.vendor_id,
+            device.product_id,
+            rdesc=bytes(device.report_descriptor.bytes),
+        )
+
+
+class TextRecordingReader(object):
+    """
+    Reads a recording in the text format written by
+    :meth:`hidtools.hidraw.HidrawDevice.dump`. Iterating over the reader
+    yields a tuple of ``(index, timestamp, data)`` for each ``E:`` line,
+    with the device index, the timestamp in nanoseconds and the data as
+    :class:`bytes`. ::
+
+        with open("recording.hid") as f:
+            recording = TextRecordingReader(f)
+            for index, timestamp, data in recording:
+                print(recording.devices[index].name, timestamp, data.hex())
+
+    All devices must be declared before the first event, a device line
+    after it raises a :class:`ValueError` during the iteration. Comment
+    lines are ignored.
+
+    :param File file: the recording opened in text mode
+
+    .. attribute:: devices
+
+        A dict of device index to :class:`RecordedDevice`, complete once
+        the reader is created
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.devices = {}
+        self._index = 0
+        # the first event line, read while looking for the devices
+        self._pending = None
+        for line in file:
+            if line.startswith("E:"):
+                self._pending = line
+                break
+            self._parse_line(line)
+
+    def _parse_line(self, line):
+        if line.startswith("D:"):
+            self._index = int(line[2:])
+            return
+
+        if line[:2] not in ("R:", "N:", "I:", "P:"):
+            return
+
+        if self._pending is not None:
+            raise ValueError(
+                f"Device {self._index} declared after the first event: {line!r}"
+            )
+        try:
+            device = self.devices[self._index]
+        except KeyError:
+            device = self.devices[self._index] = RecordedDevice(self._index)
+
+        value = line[3:].rstrip("\r\n")
+        if line.startswith("R:"):
+            length, _, rdesc = value.partition(" ")
+            device.rdesc = bytes.fromhex(rdesc)
+            if len(device.rdesc) != int(length):
+                raise ValueError(f"Invalid report descriptor length: {line!r}")
+        elif line.startswith("N:"):
+            device.name = value
+        elif line.startswith("I:"):
+            bustype, vendor_id, product_id = value.split(" ")
+            device.bustype = int(bustype, 16)
+            device.vendor_id = int(vendor_id, 16)
+            device.product_id = int(product_id, 16)
+        elif line.startswith("P:"):
+            device.phys = value
+
+    def _parse_event(self, line):
+        _, timestamp, length, data = line.split(" ", 3)
+        sec, _, usec = timestamp.partition(".")
+        data = bytes.fromhex(data)
+        if len(data) != int(length):
+            raise ValueError(f"Invalid event length: {line!r}")
+        return self._index, int(sec) * 1000000000 + int(usec) * 1000, data
+
+    def __iter__(self):
+        if self._pending is None:
+            return
+        yield self._parse_event(self._pending)
+        for line in self.file:
+            if line.startswith("E:"):
+                yield self._parse_event(line)
+            else:
+                self._parse_line(line)
+
+
+class BinaryRecordingReader(object):
+    """
+    Reads a recording in the binary format written by
+    :class:`BinaryRecordingWriter`. Iterating over the reader yields a
+    tuple of ``(index, timestamp, data)`` for each event, see
+    :class:`TextRecordingReader`.
+
+    :param File file: the recording opened in binary mode
+
+    .. attribute:: devices
+
+        A dict of device index to :class:`RecordedDevice`
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.devices = {}
+        magic, version, count = _binary_header.unpack(self._read(_binary_header.size))
+        if magic != _BINARY_MAGIC:
+            raise ValueError("Not a binary HID recording")
+        if version != _BINARY_VERSION:
+            raise ValueError(f"Unsupported binary recording version {version}")
+
+        for _ in range(count):
+            (
+                index,
+                bustype,
+                vendor_id,
+                product_id,
+                name_length,
+                phys_length,
+                rdesc_length,
+            ) = _binary_device.unpack(self._read(_binary_device.size))
+            name = self._read(name_length).decode("utf-8")
+            phys = self._read(phys_length).decode("utf-8")
+            rdesc = self._read(rdesc_length)
+            self.devices[index] = RecordedDevice(
+                index, name, bustype, vendor_id, product_id, phys, rdesc
+            )
+
+    def _read(self, size):
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated binary recording")
+        return data
+
+    def __iter__(self):
+        read = self.file.read
+        unpack = _binary_event.unpack
+        size = _binary_event.size
+        while True:
+            header = read(size)
+            if not header:
+                return
+            if len(header) != size:
+                raise ValueError("Truncated binary recording")
+            timestamp, index, length = unpack(header)
+            yield index, timestamp, self._read(length)
+
+
+class TextRecordingWriter(object):
+    """
+    Writes a recording in the text format, the same format as
+    :meth:`hidtools.hidraw.HidrawDevice.dump` but without the comments. ::
+
+        writer = TextRecordingWriter(sys.stdout, recording.devices.values())
+        writer.write_events(recording)
+
+    The timestamps are written with microsecond precision.
+
+    :param File file: the output file opened in text mode
+    :param devices: the :class:`RecordedDevice` objects of this recording
+    """
+
+    def __init__(self, file, devices):
+        devices = list(devices)
+        self.file = file
+        # like hid-recorder, only print the device index for multiple devices
+        self._numbered = len(devices) > 1
+        self._index = None
+
+        lines = []
+        for d in devices:
+            if self._numbered:
+                lines.append(f"D: {d.index}\n")
+            lines.append(f"R: {len(d.rdesc)} {d.rdesc.hex(' ')}\n")
+            lines.append(f"N: {d.name}\n")
+            if d.phys:
+                lines.append(f"P: {d.phys}\n")
+            lines.append(f"I: {d.bustype:x} {d.vendor_id:04x} {d.product_id:04x}\n")
+        file.write("".join(lines))
+
+    def write_events(self, events):
+        """
+        Write the ``(index, timestamp, data)`` tuples in ``events``, the
+        timestamp is in nanoseconds.
+        """
+        lines = []
+        for index, timestamp, data in events:
+            if self._numbered and index != self._index:
+                lines.append(f"D: {index}\n")
+                self._index = index
+            sec, usec = divmod(timestamp // 1000, 1000000)
+            lines.append(f"E: {sec:06d}.{usec:06d} {len(data)} {data.hex(' ')}\n")
+        self.file.write("".join(lines))
+
+
+class BinaryRecordingWriter(object):
+    """
+    Writes a recording in the binary format: a header with the devices
+    followed by one fixed-size record header and the data for each event.
+    Compared to the text format this takes roughly a third of the space
+    and needs no hex parsing to read back. The timestamps are stored in
+    nanoseconds, those of a :class:`hidtools.hidraw.HidrawEvent` only have
+    microsecond precision. ::
+
+        with open("recording.hidb", "wb") as f:
+            writer = BinaryRecordingWriter(f, [RecordedDevice.from_hidraw(0, dev)])
+            for e in dev.events:
+                timestamp = e.sec * 1000000000 + e.usec * 1000
+                writer.write_events([(0, timestamp, e.bytes)])
+
+    :param File file: the output file opened in binary mode
+    :param devices: the :class:`RecordedDevice` objects of this recording
+    :param int flush_interval: see :attr:`flush_interval`
+
+    .. attribute:: flush_interval
+
+        How often :meth:`write_events` flushes ``file``, with the same
+        semantics as :attr:`hidtools.hidraw.HidrawDevice.flush_interval`,
+        see :meth:`flush_timeout`
+    """
+
+    def __init__(self, file, devices, flush_interval=None):
+        devices = list(devices)
+        self.file = file
+        self.flush_interval = flush_interval
+        self._flushed_at = 0
+        self._flush_pending = False
+
+        data = bytearray(
+            _binary_header.pack(_BINARY_MAGIC, _BINARY_VERSION, len(devices))
+        )
+        for d in devices:
+            name = d.name.encode("utf-8")
+            phys = d.phys.encode("utf-8")
+            data += _binary_device.pack(
+                d.index,
+                d.bustype,
+                d.vendor_id,
+                d.product_id,
+                len(name),
+                len(phys),
+                len(d.rdesc),
+            )
+            data += name + phys + d.rdesc
+        file.write(data)
+
+    def write_events(self, events):
+        """
+        Write the ``(index, timestamp, data)`` tuples in ``events`` with a
+        single write, the timestamp is in nanoseconds.
+        """
+        data = bytearray()
+        pack = _binary_event.pack
+        for index, timestamp, report in events:
+            data += pack(timestamp, index, len(report))
+            data += report
+        if data:
+            self.file.write(data)
+            self._flush_pending = True
+        if self.flush_interval is not None:
+            now = time.monotonic_ns() // 1000000
+            if now - self._flushed_at >= self.flush_interval:
+                self.file.flush()
+                self._flushed_at = now
+                self._flush_pending = False
+
+    def flush_timeout(self):
+        """
+        The number of milliseconds until the events written by
+        :meth:`write_events` are due to be flushed, or ``None`` if there
+        are no such events. Once the timeout expired, the next call to
+        :meth:`write_events` flushes, even without any events, see
+        :meth:`hidtools.hidraw.HidrawDevice.flush_timeout`.
+        """
+        if not self._flush_pending or self.flush_interval is None:
+            return None
+        now = time.monotonic_ns() // 1000000
+        return max(self._flushed_at + self.flush_interval - now, 0)
+
+
+def convert(recording, file, binary):
+    """
+    Convert the :class:`TextRecordingReader` or
+    :class:`BinaryRecordingReader` ``recording`` to the binary format if
+    ``binary`` is True or to the text format otherwise, and write it to
+    ``file``. Apart from comments and microsecond precision for text
+    output, the conversion is lossless in both directions.
+    """
+    if binary:
+        writer = BinaryRecordingWriter(file, recording.devices.values())
+    else:
+        writer = TextRecordingWriter(file, recording.devices.values())
+
+    # write the events in batches, not all at once
+    batch = []
+    for event in recording:
+        batch.append(event)
+        if len(batch) >= 4096:
+            writer.write_events(batch)
+            batch = []
+    writer.write_events(batch)
@@ -183,9 +183,13 @@ class UHIDDevice(object):
         else:
             if isinstance(rdesc, str):
                 rdesc = f"XXX {rdesc}"
-                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_string(rdesc)
+                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_string(
+                    rdesc, cached=True
+                )
             else:
-                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+                    rdesc, cached=True
+                )
         if self.parsed_rdesc is not None:  # should always be true
             self._rdesc = self.parsed_rdesc.bytes
 
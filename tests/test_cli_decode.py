@@ -18,11 +18,14 @@
 #
 
 from tests_kernel.base import UHIDTestDevice
+import hidtools.hid
 from hidtools.cli.decode import main as decode
 from click.testing import CliRunner
 import logging
+import os
 import pytest
 import re
+import yaml
 
 from typing import List
 
@@ -275,3 +278,34 @@ class TestHidrawSysfsReportDescriptor(BaseTest.HidDecodeBase):
             with open("output.txt") as outfile:
                 lines = self.get_rdesc_dump(outfile.readlines())
                 assert self.rdesc == self.output_to_bytes(lines)
+
+
+class TestCorpus:
+    def test_corpus(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            os.makedirs("corpus/keyboards")
+            with open("corpus/mouse.hid", "w") as f:
+                f.write(TestHidRecording.data)
+            with open("corpus/keyboards/keyboard.bin", "wb") as f:
+                f.write(TestBinDescriptor.data)
+            with open("corpus/notes.txt", "w") as f:
+                f.write("not a descriptor\n")
+            rdesc = hidtools.hid.ReportDescriptor.from_bytes(TestBinDescriptor.data)
+            rdesc.save("corpus/keyboard.snapshot")
+
+            args = ["--corpus", "corpus", "--jobs", "1", "--output", "stats.yaml"]
+            result = runner.invoke(decode, args)
+            assert result.exit_code == 0
+            with open("stats.yaml") as f:
+                stats = yaml.safe_load(f)
+
+        assert stats["files"] == 4
+        assert stats["descriptors"] == 2
+        assert stats["unique layouts"] == 2
+        assert stats["parse failures"] == 1
+        assert list(stats["failures"]) == [os.path.join("corpus", "notes.txt")]
+        assert stats["skipped files"] == 1
+        assert list(stats["skipped"]) == [os.path.join("corpus", "keyboard.snapshot")]
+        assert stats["reports"] == {"input": 5, "output": 2, "feature": 0}
+        assert stats["usage pages"]["Button (0x0009)"] == 16
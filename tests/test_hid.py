@@ -21,8 +21,10 @@
 # This is for generic devices
 
 import hidtools
+import io
 from hidtools.hid import HidUnit, Unit
 import pytest
+import zlib
 import logging
 
 logger = logging.getLogger("hidtools.test.hid")
@@ -887,6 +889,765 @@ class TestReportDescriptor:
             string = hidtools.hut.HUT[0xC][usage].name
             assert string in printout
 
+    # fmt: off
+    unaligned_report_descriptor = [
+        0x05, 0x01,                    # Usage Page (Generic Desktop)        0
+        0x09, 0x02,                    # Usage (Mouse)                       2
+        0xa1, 0x01,                    # Collection (Application)            4
+        0x85, 0x02,                    # .Report ID (2)                      6
+        0x05, 0x09,                    # .Usage Page (Button)                8
+        0x19, 0x01,                    # .Usage Minimum (1)                  10
+        0x29, 0x03,                    # .Usage Maximum (3)                  12
+        0x15, 0x00,                    # .Logical Minimum (0)                14
+        0x25, 0x01,                    # .Logical Maximum (1)                16
+        0x75, 0x01,                    # .Report Size (1)                    18
+        0x95, 0x03,                    # .Report Count (3)                   20
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               22
+        0x05, 0x01,                    # .Usage Page (Generic Desktop)       24
+        0x09, 0x30,                    # .Usage (X)                          26
+        0x09, 0x31,                    # .Usage (Y)                          28
+        0x16, 0x01, 0xf8,              # .Logical Minimum (-2047)            30
+        0x26, 0xff, 0x07,              # .Logical Maximum (2047)             33
+        0x75, 0x0c,                    # .Report Size (12)                   36
+        0x95, 0x02,                    # .Report Count (2)                   38
+        0x81, 0x06,                    # .Input (Data,Var,Rel)               40
+        0x75, 0x05,                    # .Report Size (5)                    42
+        0x95, 0x01,                    # .Report Count (1)                   44
+        0x81, 0x03,                    # .Input (Cnst,Var,Abs)               46
+        0xc0,                          # End Collection                      48
+    ]
+    # fmt: on
+
+    @staticmethod
+    def _reference_values(field, report):
+        # bit-by-bit extraction, independent of the decode plan
+        values = []
+        for idx in range(field.count):
+            start = field.start + field.size * idx
+            if start // 8 >= len(report):
+                values.append("<.>")
+                continue
+            value = 0
+            for bit in range(field.size):
+                byte, offset = divmod(start + bit, 8)
+                if byte < len(report):
+                    value |= ((report[byte] >> offset) & 0x1) << bit
+            if field.logical_min < 0 and field.size > 1:
+                value = hidtools.util.twos_comp(value, field.size)
+            values.append(value)
+        return values
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            [0x02, 0x00, 0x00, 0x00, 0x00],
+            [0x02, 0xFF, 0xFF, 0xFF, 0xFF],
+            [0x02, 0x05, 0x81, 0xFE, 0x7F],
+            [0x02, 0xA9, 0x3C, 0x11, 0xC2],
+            [0x02, 0xA9, 0x3C],
+            [0x02],
+        ],
+    )
+    def test_decode_plan(self, data):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        report = rdesc.input_reports[2]
+        assert [f for f, _ in report.decode_plan] == report.fields
+        for field, plan in report.decode_plan:
+            assert len(plan) == field.count
+            assert field.get_values(data) == self._reference_values(field, data)
+            assert field.get_values(bytes(data)) == field.get_values(data)
+
+    def test_decode_plan_signed(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        report = rdesc.input_reports[2]
+        x, y = [f for f in report if f.usage_name in ("X", "Y")]
+        # buttons are 3 bits, X starts at bit 11 and Y at bit 23
+        assert (x.start, y.start) == (11, 23)
+        data = [0] * report.size
+        data[0] = 0x02
+        x.fill_values(data, [-2047])
+        y.fill_values(data, [2047])
+        assert x.get_values(data) == [-2047]
+        assert y.get_values(data) == [2047]
+        assert "X: -2047 | Y:  2047" in report.format_report(data)
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_decode_many(self, use_numpy, monkeypatch):
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(hidtools.hid, "numpy", None)
+
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        report = rdesc.input_reports[2]
+        reports = [
+            [0x02, 0x05, 0x81, 0xFE, 0x7F],
+            [0x02, 0xA9, 0x3C, 0x11, 0xC2],
+            [0x02, 0xFF, 0xFF, 0xFF, 0xFF],
+        ]
+        buffer = bytes(b for r in reports for b in r)
+        columns = report.decode_many(buffer)
+        assert len(columns) == len(report.fields)
+        for field, field_columns in zip(report.fields, columns):
+            assert len(field_columns) == field.count
+            for i, r in enumerate(reports):
+                values = [int(c[i]) for c in field_columns]
+                assert values == field.get_values(r)
+
+        # reports larger than the descriptor says, extra bytes are ignored
+        padded = bytes(b for r in reports for b in r + [0xAA, 0xAA])
+        assert [
+            [list(map(int, c)) for c in cols]
+            for cols in report.decode_many(padded, len(reports))
+        ] == [[list(map(int, c)) for c in cols] for cols in columns]
+
+        with pytest.raises(ValueError):
+            report.decode_many(buffer, len(reports) + 1)
+
+    # fmt: off
+    aligned_report_descriptor = [
+        0x05, 0x01,                    # Usage Page (Generic Desktop)        0
+        0x09, 0x02,                    # Usage (Mouse)                       2
+        0xa1, 0x01,                    # Collection (Application)            4
+        0x85, 0x01,                    # .Report ID (1)                      6
+        0x05, 0x09,                    # .Usage Page (Button)                8
+        0x19, 0x01,                    # .Usage Minimum (1)                  10
+        0x29, 0x03,                    # .Usage Maximum (3)                  12
+        0x15, 0x00,                    # .Logical Minimum (0)                14
+        0x25, 0x01,                    # .Logical Maximum (1)                16
+        0x75, 0x01,                    # .Report Size (1)                    18
+        0x95, 0x03,                    # .Report Count (3)                   20
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               22
+        0x75, 0x05,                    # .Report Size (5)                    24
+        0x95, 0x01,                    # .Report Count (1)                   26
+        0x81, 0x03,                    # .Input (Cnst,Var,Abs)               28
+        0x05, 0x01,                    # .Usage Page (Generic Desktop)       30
+        0x09, 0x30,                    # .Usage (X)                          32
+        0x09, 0x31,                    # .Usage (Y)                          34
+        0x15, 0x81,                    # .Logical Minimum (-127)             36
+        0x25, 0x7f,                    # .Logical Maximum (127)              38
+        0x75, 0x08,                    # .Report Size (8)                    40
+        0x95, 0x02,                    # .Report Count (2)                   42
+        0x81, 0x06,                    # .Input (Data,Var,Rel)               44
+        0x09, 0x38,                    # .Usage (Wheel)                      46
+        0x15, 0x80,                    # .Logical Minimum (-128)             48
+        0x95, 0x01,                    # .Report Count (1)                   50
+        0x81, 0x06,                    # .Input (Data,Var,Rel)               52
+        0x09, 0x32,                    # .Usage (Z)                          54
+        0x15, 0x00,                    # .Logical Minimum (0)                56
+        0x27, 0xff, 0xff, 0x00, 0x00,  # .Logical Maximum (65535)            58
+        0x75, 0x10,                    # .Report Size (16)                   63
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               65
+        0xc0,                          # End Collection                      67
+    ]
+
+    multitouch_report_descriptor = [
+        0x05, 0x0d,                    # Usage Page (Digitizers)             0
+        0x09, 0x04,                    # Usage (Touch Screen)                2
+        0xa1, 0x01,                    # Collection (Application)            4
+        0x85, 0x01,                    # .Report ID (1)                      6
+        0x09, 0x22,                    # .Usage (Finger)                     8
+        0xa1, 0x02,                    # .Collection (Logical)               10
+        0x09, 0x42,                    # ..Usage (Tip Switch)                12
+        0x15, 0x00,                    # ..Logical Minimum (0)               14
+        0x25, 0x01,                    # ..Logical Maximum (1)               16
+        0x75, 0x01,                    # ..Report Size (1)                   18
+        0x95, 0x01,                    # ..Report Count (1)                  20
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              22
+        0x75, 0x07,                    # ..Report Size (7)                   24
+        0x81, 0x03,                    # ..Input (Cnst,Var,Abs)              26
+        0x09, 0x51,                    # ..Usage (Contact Id)                28
+        0x25, 0x0f,                    # ..Logical Maximum (15)              30
+        0x75, 0x08,                    # ..Report Size (8)                   32
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              34
+        0x05, 0x01,                    # ..Usage Page (Generic Desktop)      36
+        0x09, 0x30,                    # ..Usage (X)                         38
+        0x09, 0x31,                    # ..Usage (Y)                         40
+        0x26, 0x00, 0x10,              # ..Logical Maximum (4096)            42
+        0x75, 0x10,                    # ..Report Size (16)                  45
+        0x95, 0x02,                    # ..Report Count (2)                  47
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              49
+        0xc0,                          # .End Collection                     51
+        0x05, 0x0d,                    # .Usage Page (Digitizers)            52
+        0x09, 0x22,                    # .Usage (Finger)                     54
+        0xa1, 0x02,                    # .Collection (Logical)               56
+        0x09, 0x42,                    # ..Usage (Tip Switch)                58
+        0x15, 0x00,                    # ..Logical Minimum (0)               60
+        0x25, 0x01,                    # ..Logical Maximum (1)               62
+        0x75, 0x01,                    # ..Report Size (1)                   64
+        0x95, 0x01,                    # ..Report Count (1)                  66
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              68
+        0x75, 0x07,                    # ..Report Size (7)                   70
+        0x81, 0x03,                    # ..Input (Cnst,Var,Abs)              72
+        0x09, 0x51,                    # ..Usage (Contact Id)                74
+        0x25, 0x0f,                    # ..Logical Maximum (15)              76
+        0x75, 0x08,                    # ..Report Size (8)                   78
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              80
+        0x05, 0x01,                    # ..Usage Page (Generic Desktop)      82
+        0x09, 0x30,                    # ..Usage (X)                         84
+        0x09, 0x31,                    # ..Usage (Y)                         86
+        0x26, 0x00, 0x10,              # ..Logical Maximum (4096)            88
+        0x75, 0x10,                    # ..Report Size (16)                  91
+        0x95, 0x02,                    # ..Report Count (2)                  93
+        0x81, 0x02,                    # ..Input (Data,Var,Abs)              95
+        0xc0,                          # .End Collection                     97
+        0x05, 0x0d,                    # .Usage Page (Digitizers)            98
+        0x09, 0x54,                    # .Usage (Contact Count)              100
+        0x25, 0x02,                    # .Logical Maximum (2)                102
+        0x75, 0x08,                    # .Report Size (8)                    104
+        0x95, 0x01,                    # .Report Count (1)                   106
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               108
+        0xc0,                          # End Collection                      110
+    ]
+    # fmt: on
+
+    # fmt: off
+    usage_range_report_descriptor = [
+        0x05, 0x0c,                    # Usage Page (Consumer Devices)       0
+        0x09, 0x01,                    # Usage (Consumer Control)            2
+        0xa1, 0x01,                    # Collection (Application)            4
+        0x85, 0x03,                    # .Report ID (3)                      6
+        0x19, 0x00,                    # .Usage Minimum (0)                  8
+        0x2a, 0xff, 0x03,              # .Usage Maximum (1023)               10
+        0x15, 0x00,                    # .Logical Minimum (0)                13
+        0x26, 0xff, 0x03,              # .Logical Maximum (1023)             15
+        0x75, 0x10,                    # .Report Size (16)                   18
+        0x95, 0x02,                    # .Report Count (2)                   20
+        0x81, 0x00,                    # .Input (Data,Arr,Abs)               22
+        0x06, 0x00, 0xff,              # .Usage Page (Vendor Defined Page 1) 24
+        0x19, 0x01,                    # .Usage Minimum (1)                  27
+        0x29, 0x04,                    # .Usage Maximum (4)                  29
+        0x15, 0x00,                    # .Logical Minimum (0)                31
+        0x25, 0x01,                    # .Logical Maximum (1)                33
+        0x75, 0x01,                    # .Report Size (1)                    35
+        0x95, 0x06,                    # .Report Count (6)                   37
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               39
+        0x75, 0x02,                    # .Report Size (2)                    41
+        0x81, 0x03,                    # .Input (Cnst,Var,Abs)               43
+        0xc0,                          # End Collection                      45
+    ]
+    # fmt: on
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            [0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
+            [0x01, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF],
+            [0x01, 0x05, 0x81, 0x7F, 0x80, 0x34, 0x12],
+            [0x01, 0x05, 0x81],
+        ],
+    )
+    @pytest.mark.parametrize("descriptor", ["aligned", "unaligned"])
+    def test_compile(self, descriptor, data):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            getattr(self, f"{descriptor}_report_descriptor")
+        )
+        report = next(iter(rdesc.input_reports.values()))
+        data = [report.report_ID] + data[1:]
+        expected = report.decode(data)
+        assert expected == [f.get_values(data) for f in report.fields]
+        formatted = report.format_report(data)
+
+        report.compile()
+        assert report.compiled
+        assert report.decode(data) == expected
+        assert report.decode(bytes(data)) == expected
+        assert report.format_report(data) == formatted
+
+        if len(data) == report.size:
+            values = [None if f.is_const else v for f, v in zip(report, expected)]
+            assert report.encode(values) == report._encode_generic(values)
+            decoded = report.decode(report.encode(values))
+            for v, d in zip(values, decoded):
+                assert v is None or v == d
+
+    def test_compile_encode_errors(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(self.aligned_report_descriptor)
+        report = rdesc.input_reports[1]
+        report.compile()
+        assert "_struct.unpack_from(buf)" in hidtools.hid._ReportCodec.decode_source(
+            report
+        )
+
+        b1, b2, b3, _, x, y, wheel, z = report.fields
+        values = [[1], [0], [1], None, [-127], [127], [-128], [0x1234]]
+        assert report.encode(values) == [0x01, 0x05, 0x81, 0x7F, 0x80, 0x34, 0x12]
+
+        for field, value in ((x, -128), (wheel, 128), (z, 0x10000), (b2, 2)):
+            invalid = list(values)
+            invalid[report.fields.index(field)] = [value]
+            with pytest.raises(hidtools.hid.RangeError) as e:
+                report.encode(invalid)
+            assert e.value.field is field
+
+        with pytest.raises(Exception):
+            report.encode(values[:-1])
+        with pytest.raises(Exception):
+            report.encode(values[:-1] + [[1, 2]])
+
+    def test_create_report(self):
+        class Touch(object):
+            def __init__(self, contactid, x, y):
+                self.tipswitch = 1
+                self.contactid = contactid
+                self.x = x
+                self.y = y
+
+        class Data(object):
+            contactcount = 3
+
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.multitouch_report_descriptor
+        )
+        report = rdesc.input_reports[1]
+        assert report.attributes == ["tipswitch", "contactid", "x", "y"] * 2 + [
+            "contactcount"
+        ]
+
+        # one data object is consumed per contact
+        slots = [Touch(1, 0x102, 0x304), Touch(2, 5, 6), Touch(3, 7, 8)]
+        r = report.create_report(slots, Data())
+        assert r == [1, 1, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 3]
+        assert len(slots) == 1
+        r = report.create_report(slots, Data())
+        assert r == [1, 1, 3, 7, 0, 8, 0, 0, 0, 0, 0, 0, 0, 3]
+        assert slots == []
+
+        # dicts work the same way and fields fall back to global_data
+        touches = [{"tipswitch": 1, "contactid": 1, "x": 0x102, "y": 0x304}, {}]
+        r = report.create_report(touches, {"contactcount": 1, "contactid": 9})
+        assert r == [1, 1, 1, 2, 1, 4, 3, 0, 9, 0, 0, 0, 0, 1]
+        values = (1, 1, 0x102, 0x304, 0, 9, 0, 0, 1)
+        assert report.create_report_from_values(values) == r
+
+        with pytest.raises(hidtools.hid.RangeError):
+            report.create_report([Touch(1, 1, 1), Touch(2, 4097, 1)], None)
+        with pytest.raises(Exception):
+            report.create_report_from_values((1, 1, 0x102, 0x304))
+
+    def test_usage_ranges(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.usage_range_report_descriptor
+        )
+        report = rdesc.input_reports[3]
+        keys = report.fields[0]
+        assert keys.usages == range(0x000C0000, 0x000C0400)
+        assert keys.get_usage_name(0xE9) == "Volume Up"
+        assert keys.copy().usages == keys.usages
+
+        # variable runs get one field per value, repeating the last usage
+        bits = report.fields[1:7]
+        assert [f.usage & 0xFFFF for f in bits] == [1, 2, 3, 4, 4, 4]
+        assert len({id(f) for f in bits}) == 6
+
+        data = [0] * report.size
+        keys.fill_values_array(data, ["Volume Up", "Mute"])
+        assert keys.get_values(data) == [0xE9, 0xE2]
+        keys.usages = [0x000C00E2, 0x000C00E9]
+        keys.fill_values_array(data, ["Volume Up", "Mute"])
+        assert keys.get_values(data) == [1, 0]
+
+    def test_format_report(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.multitouch_report_descriptor
+        )
+        report = rdesc.input_reports[1]
+        data = [1, 1, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 3]
+        expected = (
+            "ReportID: 1 / Tip Switch: 1 | # | Contact Id:    1 | X:    258 "
+            "| Y:    772 \n| Tip Switch: 1 | # | Contact Id:    2 | X:      5 "
+            "| Y:      6 | Contact Count:    3 "
+        )
+        assert report.format_report(data) == expected
+        assert report.format_report(data) == expected
+        assert report.format_report(data, False) == expected.replace("\n", "")
+        # values beyond the end of a short report
+        assert report.format_report(data[:8]).endswith("| Contact Count: <.> ")
+
+        # the templates are recomputed when fields are added
+        report.append(report.fields[-1].copy())
+        assert report.format_report(data + [0]).endswith(
+            "| Contact Count:    3 ,    0 "
+        )
+
+    def test_report_lookup(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        report = rdesc.input_reports[2]
+        assert rdesc.get(2, 5) is report
+        assert rdesc.get(2, 4) is None
+        assert rdesc.get(1, 5) is None
+        assert rdesc.get(256, 5) is None
+
+        assert rdesc.get_report_from_application("Mouse") is report
+        assert rdesc.get_report_from_application(0x00010002) is report
+        assert rdesc.get_report_from_application("Keyboard") is None
+        Type = hidtools.hid.HidReport.Type
+        assert rdesc.get_report_from_application("Mouse", Type.FEATURE) is None
+
+        # without a Report ID, every ID maps to the one report
+        descriptor = self.unaligned_report_descriptor
+        unnumbered = descriptor[:6] + descriptor[8:]
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(unnumbered)
+        report = rdesc.input_reports[-1]
+        assert rdesc.get(0, 4) is rdesc.get(255, 4) is report
+        assert rdesc.get(-1, 4) is report
+
+    def test_fill_values(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        report = rdesc.input_reports[2]
+        b1, b2, b3, x, y, _ = report.fields
+
+        # bits outside of the field are left untouched
+        data = [0x02, 0xFF, 0xFF, 0xFF, 0xFF]
+        x.fill_values(data, [-2])
+        assert data == [0x02, 0xF7, 0xFF, 0xFF, 0xFF]
+        assert x.get_values(data) == [-2]
+        b2.fill_values(data, [0])
+        assert data == [0x02, 0xF5, 0xFF, 0xFF, 0xFF]
+        assert [f.get_values(data) for f in report] == report.decode(data)
+
+        with pytest.raises(hidtools.hid.RangeError):
+            y.fill_values(data, [2048])
+        with pytest.raises(IndexError):
+            y.fill_values(data[:3], [1])
+        assert data == [0x02, 0xF5, 0xFF, 0xFF, 0xFF]
+
+        values = [[1], [0], [1], [-2047], [2047], None]
+        assert report.encode(values) == [0x02, 0x0D, 0xC0, 0xFF, 0x03]
+        assert report.decode(report.encode(values))[:5] == values[:5]
+
+    def test_iter_bytes(self):
+        rdesc = self.unaligned_report_descriptor
+        items = hidtools.hid._HidRDescItem.iter_bytes(rdesc)
+        first = next(items)
+        assert (first.index_in_report, first.item, first.value) == (0, "Usage Page", 1)
+
+        items = hidtools.hid._HidRDescItem.from_bytes(rdesc)
+        assert [i.index_in_report for i in items][:4] == [0, 2, 4, 6]
+        assert [b for i in items for b in i.bytes] == rdesc
+        for source in (bytes(rdesc), bytearray(rdesc), memoryview(bytes(rdesc))):
+            other = hidtools.hid._HidRDescItem.from_bytes(source)
+            assert [i.bytes for i in other] == [i.bytes for i in items]
+
+        logical_min = [i for i in items if i.item == "Logical Minimum"][1]
+        assert logical_min.value == -2047
+        assert logical_min.raw_value == [0x01, 0xF8]
+
+        # trailing zero byte is ignored
+        assert len(hidtools.hid._HidRDescItem.from_bytes(rdesc + [0])) == len(items)
+
+        with pytest.raises(hidtools.hid.ParseError):
+            hidtools.hid._HidRDescItem.from_bytes(rdesc[:-1] + [0x26, 0xFF])
+
+    def test_item_handlers(self):
+        seen = []
+
+        class VendorReportDescriptor(hidtools.hid.ReportDescriptor):
+            pass
+
+        def handle_vendor_item(rdesc, item):
+            seen.append((item.item, item.value))
+
+        def handle_report_size(rdesc, item):
+            seen.append((item.item, item.value))
+            hidtools.hid.ReportDescriptor._parse_report_size(rdesc, item)
+
+        VendorReportDescriptor.register_item_handler(
+            0xD0, handle_vendor_item, name="Vendor Item"
+        )
+        VendorReportDescriptor.register_item_handler(0x74, handle_report_size)
+        assert 0xD0 not in hidtools.hid.ReportDescriptor.item_handlers
+
+        # Vendor Item (0x42) right before End Collection
+        rdesc = self.unaligned_report_descriptor[:-1] + [0xD1, 0x42, 0xC0]
+        parsed = VendorReportDescriptor.from_bytes(rdesc)
+        assert isinstance(parsed, VendorReportDescriptor)
+        assert seen == [
+            ("Report Size", 1),
+            ("Report Size", 12),
+            ("Report Size", 5),
+            ("Vendor Item", 0x42),
+        ]
+        assert parsed.bytes == rdesc
+        original = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        assert parsed.input_reports[2].size == original.input_reports[2].size
+
+        # the name is only known to the subclass
+        assert 0xD0 not in hidtools.hid.inv_hid
+        with pytest.raises(KeyError):
+            hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+
+        with pytest.raises(ValueError):
+            VendorReportDescriptor.register_item_handler(0xE0, handle_vendor_item)
+        with pytest.raises(ValueError):
+            VendorReportDescriptor.register_item_handler(0xD1, handle_vendor_item)
+
+    def test_field_names(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        b1, b2, b3, x, y, _ = rdesc.input_reports[2]
+        assert (b1.usage_name, b3.usage_name) == ("B1", "B3")
+        assert (x.usage_name, y.usage_name) == ("X", "Y")
+        assert x.usage_page_name == "Generic Desktop"
+        assert x.logical_name is None
+        assert x.physical_name is None
+
+        # names follow reassigned usages
+        x.usage = y.usage
+        assert x.usage_name == "Y"
+        b1.usages = [0x00090004]
+        assert b1.get_usage_name(0) == "B4"
+        x.physical = 0x00010001
+        assert x.physical_name == "Pointer"
+        x.physical = 0x00010002
+        assert x.physical_name == "Mouse"
+
+    def test_field_copy(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.unaligned_report_descriptor
+        )
+        field = rdesc.input_reports[2].fields[0]
+        field.usages = [0x00090001, 0x00090002]
+        c = field.copy()
+        assert not hasattr(c, "__dict__")
+        for attr in hidtools.hid.HidField.__slots__:
+            assert getattr(c, attr) == getattr(field, attr)
+        assert c.usages is not field.usages
+
+    def test_cache(self, monkeypatch):
+        cache = hidtools.hid.ReportDescriptorCache(maxsize=2)
+        monkeypatch.setattr(hidtools.hid, "rdesc_cache", cache)
+
+        rdesc = self.unaligned_report_descriptor
+        first = hidtools.hid.ReportDescriptor.from_bytes(rdesc, cached=True)
+        assert (cache.hits, cache.misses) == (0, 1)
+        cached = hidtools.hid.ReportDescriptor.from_bytes(bytes(rdesc), cached=True)
+        assert cached is first
+        rdesc_str = " ".join(f"{x:02x}" for x in [len(rdesc)] + rdesc)
+        cached = hidtools.hid.ReportDescriptor.from_string(rdesc_str, cached=True)
+        assert cached is first
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert hidtools.hid.ReportDescriptor.from_bytes(rdesc) is not first
+
+        # the key includes the class, subclasses get their own instance
+        class OtherReportDescriptor(hidtools.hid.ReportDescriptor):
+            pass
+
+        other = OtherReportDescriptor.from_bytes(rdesc, cached=True)
+        assert isinstance(other, OtherReportDescriptor)
+        assert len(cache) == 2
+
+        # least recently used entry is evicted first
+        hidtools.hid.ReportDescriptor.from_bytes(rdesc, cached=True)
+        # Report ID (3) instead of Report ID (2)
+        hidtools.hid.ReportDescriptor.from_bytes(
+            rdesc[:7] + [0x03] + rdesc[8:], cached=True
+        )
+        assert len(cache) == 2
+        assert OtherReportDescriptor.from_bytes(rdesc, cached=True) is not other
+        assert cache.misses == 4
+
+        cache.clear()
+        assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+    def test_cache_shared(self, monkeypatch):
+        monkeypatch.setattr(
+            hidtools.hid, "rdesc_cache", hidtools.hid.ReportDescriptorCache()
+        )
+        rdesc = self.multitouch_report_descriptor
+        # two devices with the same descriptor share one instance
+        first = hidtools.hid.ReportDescriptor.from_bytes(rdesc, cached=True)
+        second = hidtools.hid.ReportDescriptor.from_bytes(rdesc, cached=True)
+        assert first is second
+        fresh = hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+
+        reports = [
+            [1, 1, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 2],
+            [1, 1, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+            [1, 0, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 2],
+        ]
+        expected = [
+            (fresh.format_report(r), fresh.format_report(r, split_lines=False))
+            for r in reports
+        ]
+        # interleave the reports of both devices, starting with split lines
+        # on one and without on the other while neither has a template yet
+        for r, (split, unsplit) in zip(reports, expected):
+            assert first.format_report(r) == split
+            assert second.format_report(r, split_lines=False) == unsplit
+            assert second.format_report(r) == split
+            assert first.format_report(r, split_lines=False) == unsplit
+
+        touch = hidtools.hid.ReportDescriptor.from_bytes(rdesc, cached=True)
+        assert touch.input_reports[1].attributes == fresh.input_reports[1].attributes
+
+    def test_delta_decoder(self):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.multitouch_report_descriptor
+        )
+        report = rdesc.input_reports[1]
+        tip1, _, cid1, x1, y1, tip2, _, cid2, x2, y2, count = report.fields
+        decoder = hidtools.hid.DeltaDecoder(report)
+
+        data = [1, 1, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 2]
+        changes = decoder.decode(data)
+        assert [f for f, _, _ in changes] == report.fields
+        assert all(old is None for _, old, _ in changes)
+        assert [new for _, _, new in changes] == report.decode(data)
+
+        assert decoder.decode(data) == []
+        # X of the first contact
+        data[3] = 3
+        assert decoder.decode(bytes(data)) == [(x1, [258], [259])]
+        # both tip switches and the contact count
+        data[1] = data[7] = 0
+        data[13] = 1
+        assert decoder.decode(data) == [
+            (tip1, [1], [0]),
+            (tip2, [1], [0]),
+            (count, [2], [1]),
+        ]
+        # the fields beyond the end of a short report
+        assert decoder.decode(data[:11]) == [
+            (y2, [6], ["<.>"]),
+            (count, [1], ["<.>"]),
+        ]
+
+        decoder.reset()
+        assert len(decoder.decode(data)) == len(report.fields)
+
+    def test_fingerprint(self, tmp_path):
+        rdesc = self.unaligned_report_descriptor
+        fingerprint = hidtools.hid.ReportDescriptor.from_bytes(rdesc).fingerprint()
+        assert len(fingerprint) == 64
+
+        # Usage (B1), Usage (B2), Usage (B3) instead of Usage Minimum/Maximum
+        usages = [0x09, 0x01, 0x09, 0x02, 0x09, 0x03]
+        # a redundant Logical Minimum (0) before the padding
+        redundant = [0x15, 0x00]
+        # Logical Maximum (1023) instead of Logical Maximum (2047)
+        logical_max = [0x26, 0xFF, 0x03]
+        same = [
+            rdesc[:10] + usages + rdesc[14:],
+            rdesc[:42] + redundant + rdesc[42:],
+        ]
+        different = [
+            rdesc[:33] + logical_max + rdesc[36:],
+            # Report ID (3)
+            rdesc[:7] + [0x03] + rdesc[8:],
+        ]
+        for data in same:
+            r = hidtools.hid.ReportDescriptor.from_bytes(data)
+            assert r.fingerprint() == fingerprint
+        for data in different:
+            r = hidtools.hid.ReportDescriptor.from_bytes(data)
+            assert r.fingerprint() != fingerprint
+
+        index = hidtools.hid.FingerprintIndex()
+        mouse = hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+        assert mouse not in index
+        assert index.add(mouse, "mouse") == fingerprint
+        index.add(fingerprint, "other mouse")
+        index.add(mouse, "mouse")
+        path = tmp_path / "index.json"
+        index.save(path)
+
+        index = hidtools.hid.FingerprintIndex.load(path)
+        assert len(index) == 1
+        assert mouse in index
+        assert index.lookup(mouse) == ["mouse", "other mouse"]
+        assert index.lookup("0" * 64) == []
+
+        path.write_text('{"version": 0, "fingerprints": {}}')
+        with pytest.raises(ValueError):
+            hidtools.hid.FingerprintIndex.load(path)
+
+    def test_known_devices(self):
+        class Mouse:
+            report_descriptor = self.multitouch_report_descriptor
+
+        class SameMouse(Mouse):
+            pass
+
+        mouse = hidtools.hid.ReportDescriptor.from_bytes(Mouse.report_descriptor)
+        known = hidtools.hid.FingerprintIndex.known_devices()
+        assert len(known) > 0
+        assert mouse not in known
+
+        try:
+            from hidtools.cli.known_devices import build_index
+        except (ImportError, OSError) as e:
+            pytest.skip(f"Device models not available: {e}")
+
+        index = build_index([Mouse, SameMouse])
+        assert len(index) == 1
+        assert index.lookup(mouse) == [f"{__name__}.{Mouse.__qualname__}"]
+        # the shipped index is up to date
+        assert build_index()._entries == known._entries
+
+    def test_snapshot(self, tmp_path, monkeypatch):
+        rdesc = hidtools.hid.ReportDescriptor.from_bytes(
+            self.multitouch_report_descriptor
+        )
+        rdesc.compile()
+        path = tmp_path / "multitouch.snapshot"
+        rdesc.save(path)
+        report = [1, 1, 1, 2, 1, 4, 3, 1, 2, 5, 0, 6, 0, 2]
+        expected = rdesc.format_report(report)
+        data = path.read_bytes()
+        assert hidtools.hid.ReportDescriptor.is_snapshot(data)
+        assert not hidtools.hid.ReportDescriptor.is_snapshot(bytes(rdesc.bytes))
+
+        # the names were resolved before saving, the HUT is not needed
+        monkeypatch.setattr(hidtools.hid, "HUT", {})
+        loaded = hidtools.hid.ReportDescriptor.load(path)
+        assert loaded.bytes == rdesc.bytes
+        assert loaded.get(1, len(report)).compiled
+        assert loaded.format_report(report) == expected
+        assert loaded.get_report_from_application("Touch Screen").report_ID == 1
+        names = ("usage_name", "usage_page_name", "logical_name", "physical_name")
+        for f1, f2 in zip(rdesc.input_reports[1], loaded.input_reports[1]):
+            for attr in hidtools.hid.HidField.__slots__ + names:
+                if attr not in ("_usage_names", "_names", "_usage_indexes"):
+                    assert getattr(f1, attr) == getattr(f2, attr)
+
+        monkeypatch.undo()
+        with io.StringIO() as f1, io.StringIO() as f2:
+            rdesc.dump(f1)
+            loaded.dump(f2)
+            assert f1.getvalue() == f2.getvalue()
+
+        def load(data):
+            return hidtools.hid.ReportDescriptor.load(io.BytesIO(data))
+
+        with pytest.raises(ValueError):
+            load(bytes(rdesc.bytes))
+        with pytest.raises(ValueError):
+            # snapshot format version 0
+            load(data[:8] + b"\0\0" + data[10:])
+        with pytest.raises(ValueError):
+            load(data[:-10])
+        with pytest.raises(ValueError):
+            length = data[10]
+            load(data[: 11 + length] + zlib.compress(b'{"rdesc": "0501"}'))
+        with pytest.raises(ValueError):
+            # written by another version of hid-tools
+            monkeypatch.setattr(hidtools._version, "__version__", "0.0")
+            load(data)
+
 
 class TestHidUnit:
     def test_unit_none(self):
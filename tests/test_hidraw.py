@@ -0,0 +1,349 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import array
+import asyncio
+import datetime
+import hidtools.hidraw
+import io
+import logging
+import os
+import pytest
+import socket
+import threading
+import time
+
+logger = logging.getLogger("hidtools.test.hidraw")
+
+
+class TestHidrawDevice(object):
+    # fmt: off
+    report_descriptor = [
+        0x05, 0x01,                    # Usage Page (Generic Desktop)        0
+        0x09, 0x02,                    # Usage (Mouse)                       2
+        0xa1, 0x01,                    # Collection (Application)            4
+        0x05, 0x09,                    # .Usage Page (Button)                6
+        0x19, 0x01,                    # .Usage Minimum (1)                  8
+        0x29, 0x03,                    # .Usage Maximum (3)                  10
+        0x15, 0x00,                    # .Logical Minimum (0)                12
+        0x25, 0x01,                    # .Logical Maximum (1)                14
+        0x75, 0x01,                    # .Report Size (1)                    16
+        0x95, 0x03,                    # .Report Count (3)                   18
+        0x81, 0x02,                    # .Input (Data,Var,Abs)               20
+        0x75, 0x05,                    # .Report Size (5)                    22
+        0x95, 0x01,                    # .Report Count (1)                   24
+        0x81, 0x03,                    # .Input (Cnst,Var,Abs)               26
+        0x05, 0x01,                    # .Usage Page (Generic Desktop)       28
+        0x09, 0x30,                    # .Usage (X)                          30
+        0x09, 0x31,                    # .Usage (Y)                          32
+        0x15, 0x81,                    # .Logical Minimum (-127)             34
+        0x25, 0x7f,                    # .Logical Maximum (127)              36
+        0x75, 0x08,                    # .Report Size (8)                    38
+        0x95, 0x02,                    # .Report Count (2)                   40
+        0x81, 0x06,                    # .Input (Data,Var,Rel)               42
+        0xc0,                          # End Collection                      44
+    ]
+    # fmt: on
+
+    @pytest.fixture
+    def sockets(self, monkeypatch):
+        # a SOCK_SEQPACKET socket keeps the report boundaries like hidraw
+        # does, the ioctls are replaced
+        rdesc = self.report_descriptor
+        monkeypatch.setattr(hidtools.hidraw, "_HIDIOCGRAWNAME", lambda fd: "Mouse")
+        monkeypatch.setattr(
+            hidtools.hidraw, "_HIDIOCGRAWINFO", lambda fd: (3, 0x1234, 0x5678)
+        )
+        monkeypatch.setattr(hidtools.hidraw, "_HIDIOCGRDESCSIZE", lambda fd: len(rdesc))
+        monkeypatch.setattr(
+            hidtools.hidraw,
+            "_HIDIOCGRDESC",
+            lambda fd, size: (size, array.array("B", rdesc)),
+        )
+        kernel, user = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        with kernel, user:
+            yield kernel, user
+
+    @pytest.fixture
+    def device(self, sockets):
+        kernel, user = sockets
+        return kernel, hidtools.hidraw.HidrawDevice(user)
+
+    def test_read_events(self, device):
+        kernel, dev = device
+        assert (dev.name, dev.vendor_id, dev.product_id) == ("Mouse", 0x1234, 0x5678)
+
+        kernel.send(bytes([0x01, 0x05, 0xFB]))
+        kernel.send(bytes([0x00, 0x00, 0x01]))
+        assert dev.read_events() == (0, 1)
+        dev.read_events()
+        first, second = dev.events
+        assert isinstance(first.bytes, bytes)
+        assert first.bytes == bytes([0x01, 0x05, 0xFB])
+        assert second.bytes == bytes([0x00, 0x00, 0x01])
+        assert (first.sec, first.usec) == (0, 0)
+        assert isinstance(dev.time_offset, int)
+        assert dev.report_descriptor.format_report(first.bytes) == (
+            " Button: 1  0  0 | # | X:    5 | Y:   -5 "
+        )
+
+    def test_event_types(self, sockets):
+        kernel, user = sockets
+        # both ends of the socket pair are a device reading the other end
+        first = hidtools.hidraw.HidrawDevice(user)
+        second = hidtools.hidraw.HidrawDevice(kernel)
+        before = time.monotonic_ns()
+        kernel.send(bytes([0x01, 0x02, 0x03]))
+        first.read_events()
+        event = first.events[0]
+        # the event data is bytes, the time offset a monotonic_ns() value
+        assert type(event.bytes) is bytes
+        assert event.bytes == b"\x01\x02\x03"
+        assert list(event.bytes) == [0x01, 0x02, 0x03]
+        assert type(first.time_offset) is int
+        assert before <= first.time_offset <= time.monotonic_ns()
+
+        # synchronizing devices still works by copying the offset
+        second.time_offset = first.time_offset - 2 * 10**9
+        user.send(bytes([0x00, 0x00, 0x01]))
+        second.read_events()
+        assert second.events[0].sec >= 2
+
+        second.time_offset = datetime.datetime.now()
+        with pytest.raises(TypeError):
+            second.read_events()
+
+        # events appended with a list of ints are returned as bytes too
+        events = hidtools.hidraw.HidrawEventStore()
+        events.append(hidtools.hidraw.HidrawEvent(0, 1, [0x01, 0x02]))
+        assert events[0].bytes == b"\x01\x02"
+
+    def test_event_store(self):
+        events = hidtools.hidraw.HidrawEventStore()
+        for i in range(5):
+            events.append(hidtools.hidraw.HidrawEvent(i, 999999, bytes(range(i))))
+        assert len(events) == 5
+        assert (events[2].sec, events[2].usec, events[2].bytes) == (2, 999999, b"\0\1")
+        assert events[-1].bytes == bytes(range(4))
+        assert [e.bytes for e in events[3:]] == [b"\0\1\2", b"\0\1\2\3"]
+        assert [e.sec for e in events] == [0, 1, 2, 3, 4]
+        with pytest.raises(IndexError):
+            events[5]
+
+        # the oldest events are evicted once the capacity is reached
+        events = hidtools.hidraw.HidrawEventStore(capacity=3)
+        for i in range(10):
+            events.append(hidtools.hidraw.HidrawEvent(0, i, bytes([i] * i)))
+            assert len(events) == min(i + 1, 3)
+        assert events.evicted == 7
+        assert [(e.usec, e.bytes) for e in events] == [
+            (7, bytes([7] * 7)),
+            (8, bytes([8] * 8)),
+            (9, bytes([9] * 9)),
+        ]
+        events.clear()
+        assert (len(events), events.evicted) == (0, 0)
+
+    def test_event_store_list_api(self):
+        def event(i):
+            return hidtools.hidraw.HidrawEvent(i, i, bytes([i] * (i % 4)))
+
+        # the store behaves like a list of the same events
+        expected = [event(i) for i in range(8)]
+        events = hidtools.hidraw.HidrawEventStore()
+        events.extend(expected)
+        assert events == expected
+        assert events != expected[1:]
+        assert events != "not a list"
+        assert event(3) in events
+        assert event(20) not in events
+        assert events.index(event(5)) == 5
+
+        def check(op):
+            op(expected)
+            op(events)
+            assert events == expected
+            assert list(events) == expected
+
+        check(lambda e: e.__setitem__(2, event(30)))
+        check(lambda e: e.__setitem__(slice(4, 6), [event(40)]))
+        check(lambda e: e.insert(1, event(10)))
+        check(lambda e: e.insert(100, event(11)))
+        check(lambda e: e.__delitem__(slice(1, 6, 2)))
+        check(lambda e: e.__delitem__(-1))
+        check(lambda e: e.remove(event(3)))
+        check(lambda e: e.reverse())
+        check(lambda e: e.extend([event(50), event(51)]))
+        assert events.pop() == expected.pop()
+
+        # deleting from the front counts as evicted
+        evicted = events.evicted
+        check(lambda e: e.__delitem__(slice(None, 2)))
+        assert events.evicted == evicted + 2
+        check(lambda e: e.__delitem__(slice(None)))
+        assert events == []
+        events.append(event(1))
+        assert events == [event(1)]
+
+        with pytest.raises(IndexError):
+            del events[5]
+        with pytest.raises(IndexError):
+            events[5] = event(1)
+
+    def test_dump_window(self, device):
+        kernel, dev = device
+        dev.events = hidtools.hidraw.HidrawEventStore(capacity=2)
+        for i in range(3):
+            kernel.send(bytes([i, 0, 0]))
+            dev.read_events()
+        assert dev.events.evicted == 1
+
+        def dumped_events():
+            output = io.StringIO()
+            dev.dump(output, from_the_beginning=True)
+            return [
+                line.split(" ", 2)[2]
+                for line in output.getvalue().splitlines()
+                if line.startswith("E: ")
+            ]
+
+        assert dumped_events() == ["3 01 00 00", "3 02 00 00"]
+        kernel.send(bytes([3, 0, 0]))
+        dev.read_events()
+        output = io.StringIO()
+        dev.dump(output)
+        assert output.getvalue().endswith(" 3 03 00 00\n")
+        assert dumped_events() == ["3 02 00 00", "3 03 00 00"]
+
+    def test_async_device(self, sockets, monkeypatch):
+        kernel, user = sockets
+
+        # the feature report ioctls must not run in the event loop thread
+        def feature_report(self, report_ID, data=None):
+            return threading.get_ident()
+
+        for name in ("get_feature_report", "set_feature_report"):
+            monkeypatch.setattr(hidtools.hidraw.HidrawDevice, name, feature_report)
+        dev = hidtools.hidraw.AsyncHidrawDevice(user)
+
+        async def receive():
+            received = []
+            async for event in dev:
+                received.append(event.bytes)
+                if len(received) == 2:
+                    kernel.send(bytes([0x00, 0x03, 0x04]))
+                elif len(received) == 3:
+                    kernel.shutdown(socket.SHUT_WR)
+            return received
+
+        async def main():
+            task = asyncio.create_task(receive())
+            await asyncio.sleep(0)
+            kernel.send(bytes([0x01, 0x05, 0xFB]))
+            kernel.send(bytes([0x00, 0x00, 0x01]))
+            received = await asyncio.wait_for(task, timeout=5)
+            threads = (
+                await dev.aget_feature_report(1),
+                await dev.aset_feature_report(1, [0x01]),
+            )
+            return received, threads
+
+        received, threads = asyncio.run(main())
+        assert received == [
+            bytes([0x01, 0x05, 0xFB]),
+            bytes([0x00, 0x00, 0x01]),
+            bytes([0x00, 0x03, 0x04]),
+        ]
+        assert [e.bytes for e in dev.events] == received
+        assert threading.get_ident() not in threads
+
+    def test_async_device_sync_api(self, sockets):
+        kernel, user = sockets
+        dev = hidtools.hidraw.AsyncHidrawDevice(user)
+        assert os.get_blocking(user.fileno())
+
+        async def receive():
+            async for event in dev:
+                return event.bytes
+
+        async def main():
+            task = asyncio.create_task(receive())
+            await asyncio.sleep(0)
+            kernel.send(bytes([0x01, 0x05, 0xFB]))
+            return await asyncio.wait_for(task, timeout=5)
+
+        assert asyncio.run(main()) == bytes([0x01, 0x05, 0xFB])
+        # the device is blocking again once the iteration is done
+        assert os.get_blocking(user.fileno())
+
+        kernel.send(bytes([0x00, 0x03, 0x04]))
+        dev.read_events()
+        assert [e.bytes for e in dev.events] == [
+            bytes([0x01, 0x05, 0xFB]),
+            bytes([0x00, 0x03, 0x04]),
+        ]
+        output = io.StringIO()
+        dev.dump(output, from_the_beginning=True)
+        assert output.getvalue().endswith(" 3 00 03 04\n")
+
+    def test_dump_batch(self, device, monkeypatch):
+        kernel, dev = device
+
+        class Output(io.StringIO):
+            writes = 0
+            flushes = 0
+
+            def write(self, s):
+                self.writes += 1
+                return super().write(s)
+
+            def flush(self):
+                self.flushes += 1
+
+        def dump(count):
+            for i in range(count):
+                kernel.send(bytes([i, 0, 0]))
+                dev.read_events()
+            output = Output()
+            dev.dump(output)
+            return output
+
+        # the header and all new events are written at once
+        output = dump(3)
+        assert (output.writes, output.flushes) == (1, 1)
+        assert output.getvalue().count("\nE: ") == 3
+
+        now = time.monotonic_ns() + 10**9
+        monkeypatch.setattr(time, "monotonic_ns", lambda: now)
+        dev.flush_interval = 5
+        assert dump(2).flushes == 1
+        assert dev.flush_timeout() is None
+        # less than 5ms since the last flush
+        now += 4 * 10**6
+        assert (dump(2).writes, dump(0).flushes) == (1, 0)
+        assert dev.flush_timeout() == 1
+        now += 10**6
+        assert dev.flush_timeout() == 0
+        assert dump(0).flushes == 1
+        assert dev.flush_timeout() is None
+
+        dev.flush_interval = None
+        now += 10**9
+        assert dump(1).flushes == 0
+        assert dev.flush_timeout() is None
@@ -17,7 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from hidtools.hut import HUT
+from hidtools.hut import HUT, HidUsageTable
 
 import logging
 import pytest
@@ -293,3 +293,70 @@ class TestHUT(object):
     def test_up84_power_device(self):
         assert HUT[0x84].page_name == "Power Device"
         assert HUT[0x84][0x06].name == "Peripheral Device"
+
+    def test_hut_cache(self, tmp_path):
+        path = str(tmp_path / "hut.pickle")
+        hut = HidUsageTable._from_hut_files()
+        hut._write_cache(path)
+
+        cached = HidUsageTable._from_cache(path)
+        assert cached is not None
+        assert sorted(cached) == sorted(hut)
+        for page_id, page in hut.items():
+            cached_page = cached[page_id]
+            assert cached_page.page_name == page.page_name
+            assert dict(cached_page.items()) == dict(page.items())
+            for _, usage in cached_page.items():
+                assert usage.usage_page is cached_page
+
+    def test_hut_cache_fallback(self, tmp_path, monkeypatch):
+        path = tmp_path / "hut.pickle"
+        assert HidUsageTable._from_cache(str(path)) is None
+
+        path.write_bytes(b"garbage")
+        assert HidUsageTable._from_cache(str(path)) is None
+
+        HidUsageTable._from_hut_files()._write_cache(str(path))
+        monkeypatch.setattr(HidUsageTable, "_hut_digest", classmethod(lambda c: ""))
+        assert HidUsageTable._from_cache(str(path)) is None
+
+    def test_hut_lazy_pages(self):
+        def loaded(hut):
+            return [p for p, page in hut.items() if "_usages" in page.__dict__]
+
+        hut = HidUsageTable._from_hut_files()
+        assert len(hut) == len(HUT)
+        assert sorted(hut.usage_page_names) == sorted(self.pages.values())
+        assert 0x0D in hut
+        assert hut[0x0D].page_name == "Digitizers"
+        assert loaded(hut) == []
+
+        assert hut["Generic Desktop"][0x30].name == "X"
+        assert loaded(hut) == [0x01]
+        assert hut[0x01][0x30].usage_page is hut[0x01]
+        assert dict(hut[0x01].items()) == dict(HUT[0x01].items())
+
+    def test_usage_from_name(self):
+        assert HUT.usage_from_name(0x01, "Y") == 0x00010031
+        assert HUT.usage_from_name("Digitizers", "Tip Switch") == 0x000D0042
+        assert HUT.usage_from_name(0x01 << 16, "X") == 0x00010030
+        with pytest.raises(KeyError):
+            HUT.usage_from_name(0x01, "Tip Switch")
+        with pytest.raises(KeyError):
+            HUT.usage_from_name("No Such Page", "X")
+
+    def test_page_name_index(self):
+        hut = HidUsageTable._from_hut_files()
+        gd = hut[0x01]
+        assert hut.usage_from_name("Generic Desktop", "X") == 0x00010030
+
+        del hut[0x01]
+        assert 0x01 not in hut
+        assert "Generic Desktop" not in hut.usage_page_names
+        assert hut.usage_page_from_name("Generic Desktop") is None
+        with pytest.raises(KeyError):
+            hut.usage_from_name("Generic Desktop", "X")
+
+        hut[0x01] = gd
+        assert hut["Generic Desktop"] is gd
+        assert hut.usage_from_name(0x01, "X") == 0x00010030
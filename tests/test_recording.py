@@ -0,0 +1,183 @@
+#!/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import click.testing
+import hidtools.cli.parse_hid
+import hidtools.cli.record
+import hidtools.recording
+import io
+import logging
+import pytest
+import tests.test_hidraw
+from hidtools.cli.parse_hid import parse_binary_hid, parse_hid
+
+logger = logging.getLogger("hidtools.test.recording")
+
+
+class TestRecording(object):
+    recording = (
+        "# Mouse\n"
+        "D: 0\n"
+        "R: 8 05 01 09 02 a1 01 09 01\n"
+        "N: Mouse\n"
+        "P: usb-0000:00:14.0-1/input0\n"
+        "I: 3 1234 5678\n"
+        "D: 1\n"
+        "R: 4 05 01 09 06\n"
+        "N: Keyboard\n"
+        "I: 5 0001 0002\n"
+        "D: 0\n"
+        "# Button: 1\n"
+        "E: 000000.000000 3 01 05 fb\n"
+        "E: 000000.008012 3 00 00 01\n"
+        "D: 1\n"
+        "E: 000001.000002 4 00 00 04 00\n"
+    )
+    events = [
+        (0, 0, b"\x01\x05\xfb"),
+        (0, 8012000, b"\x00\x00\x01"),
+        (1, 1000002000, b"\x00\x00\x04\x00"),
+    ]
+
+    def open(self, data):
+        return hidtools.recording.open_recording(io.BufferedReader(io.BytesIO(data)))
+
+    def test_text(self):
+        recording = self.open(self.recording.encode("utf-8"))
+        assert isinstance(recording, hidtools.recording.TextRecordingReader)
+        mouse, keyboard = recording.devices[0], recording.devices[1]
+        assert (mouse.name, mouse.bustype, mouse.vendor_id, mouse.product_id) == (
+            "Mouse",
+            3,
+            0x1234,
+            0x5678,
+        )
+        assert mouse.phys == "usb-0000:00:14.0-1/input0"
+        assert mouse.rdesc == bytes([0x05, 0x01, 0x09, 0x02, 0xA1, 0x01, 0x09, 0x01])
+        assert (keyboard.name, keyboard.phys, keyboard.rdesc) == (
+            "Keyboard",
+            "",
+            b"\x05\x01\x09\x06",
+        )
+        assert list(recording) == self.events
+
+    def test_convert(self):
+        binary = io.BytesIO()
+        hidtools.recording.convert(
+            self.open(self.recording.encode("utf-8")), binary, binary=True
+        )
+        assert hidtools.recording.is_binary_recording(binary.getvalue())
+
+        recording = self.open(binary.getvalue())
+        assert isinstance(recording, hidtools.recording.BinaryRecordingReader)
+        assert [d.name for d in recording.devices.values()] == ["Mouse", "Keyboard"]
+        assert recording.devices[0].phys == "usb-0000:00:14.0-1/input0"
+        assert list(recording) == self.events
+
+        # back to text, only the comments are lost
+        text = io.StringIO()
+        hidtools.recording.convert(self.open(binary.getvalue()), text, binary=False)
+        lines = [line for line in self.recording.splitlines() if line[0] != "#"]
+        assert text.getvalue().splitlines() == lines
+
+    def test_flush_timeout(self, monkeypatch):
+        class Output(io.BytesIO):
+            flushes = 0
+
+            def flush(self):
+                self.flushes += 1
+
+        now = 10**9
+        monkeypatch.setattr(hidtools.recording.time, "monotonic_ns", lambda: now)
+        output = Output()
+        writer = hidtools.recording.BinaryRecordingWriter(output, [], 5)
+        assert writer.flush_timeout() is None
+        writer.write_events(self.events)
+        assert (output.flushes, writer.flush_timeout()) == (1, None)
+
+        now += 2 * 10**6
+        writer.write_events(self.events)
+        assert (output.flushes, writer.flush_timeout()) == (1, 3)
+        now += 3 * 10**6
+        assert writer.flush_timeout() == 0
+        writer.write_events([])
+        assert (output.flushes, writer.flush_timeout()) == (2, None)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            list(self.open(self.recording.replace("3 01 05", "4 01 05").encode()))
+        with pytest.raises(ValueError):
+            list(self.open((self.recording + "N: Late\n").encode()))
+
+        binary = io.BytesIO()
+        hidtools.recording.convert(
+            self.open(self.recording.encode("utf-8")), binary, binary=True
+        )
+        with pytest.raises(ValueError):
+            list(self.open(binary.getvalue()[:-1]))
+        with pytest.raises(ValueError):
+            self.open(binary.getvalue()[:20])
+        with pytest.raises(ValueError):
+            data = bytearray(binary.getvalue())
+            data[8] = 2
+            self.open(bytes(data))
+
+    def test_parse_hid(self):
+        rdesc = bytes(tests.test_hidraw.TestHidrawDevice.report_descriptor)
+        text = (
+            f"R: {len(rdesc)} {rdesc.hex(' ')}\n"
+            "N: Mouse\n"
+            "I: 3 1234 5678\n"
+            "E: 000000.000000 3 01 05 fb\n"
+            "E: 000000.008012 3 01 00 01\n"
+        )
+        binary = io.BytesIO()
+        hidtools.recording.convert(self.open(text.encode("utf-8")), binary, binary=True)
+
+        for changes_only in (False, True):
+            expected = io.StringIO()
+            parse_hid(io.StringIO(text), expected, changes_only=changes_only)
+            output = io.StringIO()
+            parse_binary_hid(
+                self.open(binary.getvalue()), output, changes_only=changes_only
+            )
+            assert output.getvalue() == expected.getvalue()
+            assert "000000.008012" in output.getvalue()
+
+    def test_cli(self, tmp_path):
+        runner = click.testing.CliRunner()
+        path = tmp_path / "recording.hid"
+        path.write_text(self.recording)
+
+        # the binary format has no comments that --strip-desc could strip
+        for args in (["--format=binary"], [f"--convert={path}"]):
+            result = runner.invoke(hidtools.cli.record.main, ["-s"] + args)
+            assert result.exit_code == 2
+            assert "--strip-desc" in result.output
+
+        rdesc = bytes(tests.test_hidraw.TestHidrawDevice.report_descriptor)
+        path.write_text(
+            f"R: {len(rdesc)} {rdesc.hex(' ')}\nE: 000000.000000 3 01 05 fb\n"
+        )
+        result = runner.invoke(hidtools.cli.parse_hid.main, [str(path)])
+        assert result.exit_code == 0
+        assert "000000.000000" in result.output
+        path.write_bytes(b"HIDRECBN")
+        result = runner.invoke(hidtools.cli.parse_hid.main, [str(path)])
+        assert result.exit_code == 1